@@ -47,28 +47,47 @@ Wymagane sekrety w Google Cloud Secret Manager dla OFF PEAK CHARGE API:
 """
 
 import os
+import io
+import re
 import json
+import math
 import time
+import socket
 import logging
 import hashlib
+import functools
+import bisect
+import random
+import subprocess
+import traceback
 from datetime import datetime, timedelta, timezone
 import uuid
-from typing import Dict, List, Optional, Any
+import ipaddress
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
-import asyncio
+from types import SimpleNamespace
+from collections import OrderedDict, deque
+import atexit
+import signal
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import schedule
 import threading
 from http.server import HTTPServer, BaseHTTPRequestHandler
-import pytz
+from zoneinfo import ZoneInfo
 import requests
-from google.cloud import logging as cloud_logging
-from google.cloud import storage
-from google.cloud import firestore
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry as UrllibRetry
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from google.api_core.retry import Retry
+from google.api_core import exceptions as gcp_exceptions
 from dotenv import load_dotenv
-from tesla_controller import TeslaController, ChargeSchedule
+from tesla_controller import TeslaController, ChargeSchedule, VEHICLE_STATUS_ENDPOINTS, ALL_DAYS
 from tesla_fleet_api_client import TeslaAuthenticationError
-from google.cloud import secretmanager
 # BEZPIECZEŃSTWO: Wyłączenie ostrzeżeń SSL dla Tesla HTTP Proxy
 # Tesla HTTP Proxy (localhost) używa self-signed certyfikatów SSL
 # To jest bezpieczne ponieważ:
@@ -79,18 +98,113 @@ from google.cloud import secretmanager
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# OPTYMALIZACJA: orjson (C) do serializacji stanu - opcjonalny, fallback na stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# psutil (diagnostyka pamięci/wątków przy zatrzymaniu) - opcjonalny
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# OPTYMALIZACJA: strefy czasowe tworzone raz (ZoneInfo jest cache'owany, pytz.timezone parsował dane strefy)
+_WARSAW_TZ = ZoneInfo("Europe/Warsaw")
+_UTC = timezone.utc
+
+
+def _env_float(name: str, default: float) -> float:
+    """Zmienna środowiskowa jako float - błędna wartość nie przerywa importu modułu (fallback z ostrzeżeniem)"""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logging.getLogger(__name__).warning(f"⚠️ Nieprawidłowa wartość {name}={raw!r} - używam domyślnej {default}")
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Zmienna środowiskowa jako int - błędna wartość (np. '10m') nie przerywa importu modułu (fallback z ostrzeżeniem)"""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logging.getLogger(__name__).warning(f"⚠️ Nieprawidłowa wartość {name}={raw!r} - używam domyślnej {default}")
+        return default
+
+
+# OPTYMALIZACJA: jednorazowa migawka zmiennych środowiskowych Tesla/GCP
+# (zamiast wielokrotnych os.getenv w __init__ i /debug-env; odporna na mutacje env w trakcie procesu)
+load_dotenv()
+ENV = SimpleNamespace(
+    smart_proxy_mode_raw=os.getenv('TESLA_SMART_PROXY_MODE'),
+    proxy_available_raw=os.getenv('TESLA_PROXY_AVAILABLE'),
+    smart_proxy_mode=os.getenv('TESLA_SMART_PROXY_MODE') == 'true',
+    proxy_available=os.getenv('TESLA_PROXY_AVAILABLE') == 'true',
+    proxy_host=os.getenv('TESLA_HTTP_PROXY_HOST'),
+    proxy_port=os.getenv('TESLA_HTTP_PROXY_PORT'),
+    private_key_ready=os.getenv('TESLA_PRIVATE_KEY_READY', 'false').lower() == 'true',
+    gcp_project=os.getenv('GOOGLE_CLOUD_PROJECT'),
+    bucket=os.getenv('GOOGLE_CLOUD_STORAGE_BUCKET', 'tesla-monitor-data'),
+    case_b_backoff_base=_env_int('CASE_B_BACKOFF_BASE_SECONDS', 60),
+    case_b_backoff_max=_env_int('CASE_B_BACKOFF_MAX_SECONDS', 3600),
+    vehicle_data_daily_budget=_env_int('TESLA_VEHICLE_DATA_DAILY_BUDGET', 200),
+    sleep_respect=os.getenv('TESLA_SLEEP_RESPECT', 'false').lower() == 'true',
+    proxy_idle_ttl=_env_int('TESLA_PROXY_IDLE_TTL_SECONDS', 60),
+    home_latitude=_env_float('HOME_LATITUDE', 52.334215),
+    home_longitude=_env_float('HOME_LONGITUDE', 20.937516),
+)
+
 # Konfiguracja Google Cloud Logging
-if os.getenv('GOOGLE_CLOUD_PROJECT'):
+# OPTYMALIZACJA: import google.cloud.logging (~0.2 s) tylko gdy jest używany -
+# krótszy cold start lokalnie i w testach
+# %(warsaw_time)s ustawia _WarsawTimeFilter dla tlogger; pozostałe rekordy dostają pusty prefiks
+_WARSAW_TIME_DEFAULTS = {'warsaw_time': ''}
+
+if ENV.gcp_project:
+    from google.cloud import logging as cloud_logging
+    from google.cloud.logging.handlers import setup_logging as setup_cloud_logging
     client = cloud_logging.Client()
-    client.setup_logging()
+    # NAPRAWKA: handler Cloud Logging siedzi na root loggerze, więc basicConfig poniżej nic nie zmienia -
+    # prefiks [HH:MM] musi być w formatterze handlera, który faktycznie emituje (formatuje przez handler.format)
+    _cloud_handler = client.get_default_handler()
+    _cloud_handler.setFormatter(logging.Formatter('%(warsaw_time)s%(message)s', defaults=_WARSAW_TIME_DEFAULTS))
+    setup_cloud_logging(_cloud_handler)
 
 # Standardowe logowanie
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(warsaw_time)s%(message)s',
+    defaults=_WARSAW_TIME_DEFAULTS
+))
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    handlers=[_log_handler]
 )
 logger = logging.getLogger(__name__)
 
+
+class _WarsawTimeFilter(logging.Filter):
+    """Ustawia atrybut rekordu warsaw_time = '[HH:MM] ' (czas warszawski) - treść wiadomości pozostaje nietknięta"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.warsaw_time = f"{datetime.now(_WARSAW_TZ):[%H:%M]} "
+        return True
+
+
+# Logger z automatycznym prefiksem czasu warszawskiego - używać z leniwym
+# formatowaniem %-style, żeby argumenty formatowały się tylko gdy rekord jest emitowany
+tlogger = logging.getLogger(f"{__name__}.czas")
+tlogger.addFilter(_WarsawTimeFilter())
+
 # BEZPIECZEŃSTWO: Informacje o konfiguracji SSL
 logger.info("🔒 BEZPIECZEŃSTWO: Wyłączono ostrzeżenia SSL urllib3 dla Tesla HTTP Proxy")
 logger.info("🔒 Dotyczy tylko localhost z self-signed certyfikatami - bezpieczeństwo zachowane")
@@ -107,6 +221,8 @@ def get_secret(secret_name: str, project_id: str) -> Optional[str]:
         Wartość sekretu lub None jeśli błąd
     """
     try:
+        # Import leniwy - Secret Manager potrzebny tylko przy odczycie sekretów
+        from google.cloud import secretmanager
         client = secretmanager.SecretManagerServiceClient()
         name = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
         response = client.access_secret_version(request={"name": name})
@@ -115,6 +231,89 @@ def get_secret(secret_name: str, project_id: str) -> Optional[str]:
         logger.warning(f"Nie można odczytać sekretu {secret_name}: {e}")
         return None
 
+def _json_dumps_bytes(obj: Any) -> bytes:
+    """Serializuje obiekt do bajtów JSON (orjson jeśli dostępny)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+def _json_loads_bytes(data: bytes) -> Any:
+    """Parsuje bajty JSON (orjson jeśli dostępny)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _extract_state(state: Dict[str, Any]) -> tuple:
+    """
+    Zwraca krotkę stanu pojazdu (gotowy_do_ładowania, w_domu, online).
+
+    Porównanie krotek zastępuje łańcuchy .get() przy detekcji zmian stanu.
+    Dla zapisanego stanu używa krotki wyliczonej przy zapisie ('_state_tuple').
+    """
+    cached = state.get('_state_tuple')
+    if cached is not None:
+        return tuple(cached)
+    return (state.get('is_charging_ready', False),
+            state.get('location_status') == 'HOME',
+            state.get('online', False))
+
+def _schedule_segments(s: ChargeSchedule) -> List[Tuple[int, int]]:
+    """
+    Dzieli okno harmonogramu na półotwarte segmenty [start, end) w obrębie doby.
+
+    Okno przez północ daje dwa segmenty; okno zerowej długości - żadnego.
+    end_time > 1440 (stary format konwertera) jest sprowadzany do doby.
+    """
+    start = s.start_time % 1440
+    end = s.end_time - 1440 if s.end_time > 1440 else s.end_time
+    end = end % 1440 if end != 1440 else 0
+    if start < end:
+        return [(start, end)]
+    if start == end:
+        return []  # okno zerowej długości
+    return [(start, 1440), (0, end)]  # przez północ
+
+def _generate_proxy_tls_cert(key_path: str = 'tls-key.pem', cert_path: str = 'tls-cert.pem') -> None:
+    """
+    Generuje self-signed certyfikat TLS dla lokalnego Tesla HTTP Proxy (localhost, 365 dni).
+
+    OPTYMALIZACJA: w procesie przez cryptography z kluczem EC (jak w instrukcji
+    tesla-http-proxy) zamiast podprocesu openssl z RSA 4096 (~1-3 s).
+
+    Args:
+        key_path: Ścieżka klucza prywatnego (PEM, PKCS8)
+        cert_path: Ścieżka certyfikatu (PEM)
+    """
+    key = ec.generate_private_key(ec.SECP384R1())
+    name = x509.Name([
+        x509.NameAttribute(NameOID.COUNTRY_NAME, 'PL'),
+        x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, 'Mazowieckie'),
+        x509.NameAttribute(NameOID.LOCALITY_NAME, 'Warsaw'),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, 'Tesla Monitor'),
+        x509.NameAttribute(NameOID.COMMON_NAME, 'localhost'),
+    ])
+    now = datetime.now(_UTC)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=365))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName('localhost'),
+            x509.IPAddress(ipaddress.ip_address('127.0.0.1')),
+        ]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    key_fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(key_fd, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+
 def _log_simple_status(status: Dict[str, Any], action: str = "") -> None:
     """
     Loguje prosty status pojazdu w formacie: [HH:MM] ✅ VIN=xxx, bateria=xx%, ładowanie=xxx, lokalizacja=xxx
@@ -124,11 +323,6 @@ def _log_simple_status(status: Dict[str, Any], action: str = "") -> None:
         action: Opcjonalny opis akcji (np. "wake-up", "check")
     """
     try:
-        # Czas warszawski w formacie [HH:MM]
-        warsaw_tz = pytz.timezone('Europe/Warsaw')
-        now = datetime.now(warsaw_tz)
-        time_str = now.strftime("[%H:%M]")
-        
         # Podstawowe dane pojazdu
         vin = status.get('vin', 'Unknown')
         vin_short = vin[-4:] if len(vin) > 4 else vin
@@ -143,17 +337,53 @@ def _log_simple_status(status: Dict[str, Any], action: str = "") -> None:
         # Emoji w zależności od stanu online
         emoji = "✅" if is_online else "❌"
         
-        # Formatowanie loga
+        # Czas warszawski [HH:MM] dopisuje tlogger
         if action:
-            log_msg = f"{time_str} {emoji} {action} - VIN={vin_short}, bateria={battery}%, ładowanie={charging_status}, lokalizacja={location}"
+            tlogger.info("%s %s - VIN=%s, bateria=%s%%, ładowanie=%s, lokalizacja=%s",
+                         emoji, action, vin_short, battery, charging_status, location)
         else:
-            log_msg = f"{time_str} {emoji} VIN={vin_short}, bateria={battery}%, ładowanie={charging_status}, lokalizacja={location}"
-        
-        logger.info(log_msg)
+            tlogger.info("%s VIN=%s, bateria=%s%%, ładowanie=%s, lokalizacja=%s",
+                         emoji, vin_short, battery, charging_status, location)
         
     except Exception as e:
         logger.error(f"Błąd logowania prostego statusu: {e}")
 
+# OPTYMALIZACJA: interwał monitorowania jako tablica godzina -> minuty (CZAS WARSZAWSKI)
+# 00:00-07:00 (0-6): co 60 minut, 07:00-23:00 (7-22): co 15 minut, 23:00-24:00: co 60 minut
+_INTERVAL_BY_HOUR = (60,) * 7 + (15,) * 16 + (60,)
+
+# OPTYMALIZACJA: stałe formaty logów pętli harmonogramów (%-style) - logging formatuje
+# je leniwie, tylko gdy rekord faktycznie zostanie wyemitowany
+_FMT_SLOT_SKIPPED = "%s Harmonogram #%d: %s %02d:%02d-%s %02d:%02d - POMINIĘTY (%s)"
+_FMT_SLOT_CONVERTED = "📅 Harmonogram #%d: %02d:%02d-%02d:%02d (%d-%d min), %s kWh"
+_FMT_SLOT_NORMALIZED = "📅 Harmonogram #%d: %02d:%02d-%02d:%02d (%d-%d min → normalizacja: %d min), %s kWh"
+_FMT_SCHEDULE_ADD = "%s #%d: %s-%s"
+
+# OPTYMALIZACJA: klasyfikacja błędu komendy jednym przebiegiem skompilowanego wzorca
+# (zamiast łańcucha `"x" in str(e).lower()` tworzącego nowe napisy w każdej gałęzi)
+_COMMAND_ERROR_PATTERN = re.compile(r'401|unauthorized|412|not supported|timeout', re.IGNORECASE)
+_HINT_AUTH = "🚫 Błąd autoryzacji - sprawdź tokeny Tesla"
+_HINT_UNSUPPORTED = "🚫 Komenda nie obsługiwana - sprawdź czy Tesla HTTP Proxy działa"
+# Kolejność wpisów = priorytet przy kilku dopasowaniach (autoryzacja > 412 > timeout)
+_COMMAND_ERROR_HINTS = {
+    '401': _HINT_AUTH,
+    'unauthorized': _HINT_AUTH,
+    '412': _HINT_UNSUPPORTED,
+    'not supported': _HINT_UNSUPPORTED,
+    'timeout': "⏰ Timeout - Tesla API może być przeciążone",
+}
+
+
+def _command_error_hint(error: Exception) -> Optional[str]:
+    """
+    Wskazówka diagnostyczna dla błędu komendy pojazdu (None - błąd nierozpoznany).
+
+    Przy kilku słowach kluczowych wygrywa priorytet z _COMMAND_ERROR_HINTS,
+    a nie pozycja dopasowania w komunikacie.
+    """
+    found = {keyword.lower() for keyword in _COMMAND_ERROR_PATTERN.findall(str(error))}
+    return next((hint for keyword, hint in _COMMAND_ERROR_HINTS.items() if keyword in found), None)
+
 class HealthCheckHandler(BaseHTTPRequestHandler):
     """Handler dla endpoint'ów aplikacji"""
     
@@ -195,9 +425,11 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
             # Sprawdź aktywne przypadki monitorowania
             active_cases_count = len(self.monitor.active_cases)
             
+            # Health check NIE wymusza inicjalizacji - odpowiada od razu po cold-starcie
             response = {
                 'status': 'healthy',
                 'is_running': True,
+                'initialized': self.monitor._initialized,
                 'active_cases': active_cases_count,
                 'timestamp': warsaw_time.isoformat(),
                 'timezone': 'Europe/Warsaw',
@@ -233,10 +465,10 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                 'timestamp': warsaw_time.isoformat(),
                 'timezone': 'Europe/Warsaw',
                 'environment_variables': {
-                    'TESLA_SMART_PROXY_MODE': os.getenv('TESLA_SMART_PROXY_MODE'),
-                    'TESLA_PROXY_AVAILABLE': os.getenv('TESLA_PROXY_AVAILABLE'),
-                    'TESLA_HTTP_PROXY_HOST': os.getenv('TESLA_HTTP_PROXY_HOST'),
-                    'TESLA_HTTP_PROXY_PORT': os.getenv('TESLA_HTTP_PROXY_PORT')
+                    'TESLA_SMART_PROXY_MODE': ENV.smart_proxy_mode_raw,
+                    'TESLA_PROXY_AVAILABLE': ENV.proxy_available_raw,
+                    'TESLA_HTTP_PROXY_HOST': ENV.proxy_host,
+                    'TESLA_HTTP_PROXY_PORT': ENV.proxy_port
                 },
                 'monitor_state': {
                     'smart_proxy_mode': self.monitor.smart_proxy_mode,
@@ -244,8 +476,8 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                     'proxy_running': self.monitor.proxy_running
                 },
                 'debug_info': {
-                    'smart_proxy_check': os.getenv('TESLA_SMART_PROXY_MODE') == 'true',
-                    'proxy_available_check': os.getenv('TESLA_PROXY_AVAILABLE') == 'true'
+                    'smart_proxy_check': ENV.smart_proxy_mode,
+                    'proxy_available_check': ENV.proxy_available
                 }
             }
             
@@ -346,9 +578,8 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
         """Obsługuje wywołanie cyklu monitorowania przez Cloud Scheduler"""
         try:
             warsaw_time = self.monitor._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
             
-            logger.info(f"{time_str} 📅 Cloud Scheduler: Rozpoczęcie cyklu monitorowania")
+            tlogger.info("📅 Cloud Scheduler: Rozpoczęcie cyklu monitorowania")
             
             # Wykonaj cykl monitorowania
             cycle_result = self.monitor.run_monitoring_cycle()
@@ -368,15 +599,14 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                 'trigger': 'cloud_scheduler'
             }
             
-            logger.info(f"{time_str} ✅ Cloud Scheduler: Cykl monitorowania zakończony")
+            tlogger.info("✅ Cloud Scheduler: Cykl monitorowania zakończony")
             
             self.wfile.write(json.dumps(response, ensure_ascii=False, indent=2).encode('utf-8'))
             
         except Exception as e:
             warsaw_time = self.monitor._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
             
-            logger.error(f"{time_str} ❌ Cloud Scheduler: Błąd cyklu monitorowania: {e}")
+            tlogger.error(f"❌ Cloud Scheduler: Błąd cyklu monitorowania: {e}")
             
             self.send_response(500)
             self.send_header('Content-type', 'application/json')
@@ -396,9 +626,8 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
         """Obsługuje nocne wybudzenie pojazdu przez Cloud Scheduler"""
         try:
             warsaw_time = self.monitor._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
             
-            logger.info(f"{time_str} 🌙 Cloud Scheduler: Rozpoczęcie nocnego wybudzenia")
+            tlogger.info("🌙 Cloud Scheduler: Rozpoczęcie nocnego wybudzenia")
             
             # Wykonaj nocne wybudzenie
             self.monitor.run_midnight_wake_check()
@@ -415,15 +644,14 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                 'trigger': 'cloud_scheduler'
             }
             
-            logger.info(f"{time_str} ✅ Cloud Scheduler: Nocne wybudzenie zakończone")
+            tlogger.info("✅ Cloud Scheduler: Nocne wybudzenie zakończone")
             
             self.wfile.write(json.dumps(response, ensure_ascii=False, indent=2).encode('utf-8'))
             
         except Exception as e:
             warsaw_time = self.monitor._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
             
-            logger.error(f"{time_str} ❌ Cloud Scheduler: Błąd nocnego wybudzenia: {e}")
+            tlogger.error(f"❌ Cloud Scheduler: Błąd nocnego wybudzenia: {e}")
             
             self.send_response(500)
             self.send_header('Content-type', 'application/json')
@@ -443,13 +671,34 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
         """Wyłącz standardowe logowanie HTTP serwera"""
         pass
 
+class BoundedVinCache(OrderedDict):
+    """
+    Słownik VIN -> dane z limitem rozmiaru (LRU).
+
+    Chroni cache per VIN przed nieograniczonym wzrostem w długo żyjącej
+    instancji (wiele pojazdów, testy) - po przekroczeniu limitu usuwany
+    jest najdawniej aktualizowany VIN.
+    """
+
+    MAX_VINS = 16
+
+    def __init__(self, *args, maxsize: int = MAX_VINS, **kwargs):
+        self.maxsize = maxsize
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
 class MonitoringState(Enum):
     """Stany monitorowania pojazdu"""
     IDLE = "idle"
     WAITING_FOR_OFFLINE = "waiting_for_offline"
     VEHICLE_AWOKEN = "vehicle_awoken"
 
-@dataclass
+@dataclass(slots=True)
 class VehicleMonitoringCase:
     """Reprezentuje aktywny przypadek monitorowania pojazdu"""
     case_id: str
@@ -458,6 +707,9 @@ class VehicleMonitoringCase:
     state: MonitoringState
     last_battery_level: Optional[int] = None
     last_check_time: Optional[datetime] = None
+    # Adaptacyjny backoff: liczba kolejnych odczytów bez zmiany i termin następnego odpytania
+    consecutive_no_change: int = 0
+    next_poll_at: Optional[datetime] = None
     
     def to_dict(self) -> Dict:
         """Konwertuje do słownika dla serializacji"""
@@ -467,7 +719,9 @@ class VehicleMonitoringCase:
             'start_time': self.start_time.isoformat(),
             'state': self.state.value,
             'last_battery_level': self.last_battery_level,
-            'last_check_time': self.last_check_time.isoformat() if self.last_check_time else None
+            'last_check_time': self.last_check_time.isoformat() if self.last_check_time else None,
+            'consecutive_no_change': self.consecutive_no_change,
+            'next_poll_at': self.next_poll_at.isoformat() if self.next_poll_at else None
         }
     
     @classmethod
@@ -479,38 +733,72 @@ class VehicleMonitoringCase:
             start_time=datetime.fromisoformat(data['start_time']),
             state=MonitoringState(data['state']),
             last_battery_level=data.get('last_battery_level'),
-            last_check_time=datetime.fromisoformat(data['last_check_time']) if data.get('last_check_time') else None
+            last_check_time=datetime.fromisoformat(data['last_check_time']) if data.get('last_check_time') else None,
+            consecutive_no_change=data.get('consecutive_no_change', 0),
+            next_poll_at=datetime.fromisoformat(data['next_poll_at']) if data.get('next_poll_at') else None
         )
 
+# Monitory do zrzutu przy wyjściu procesu - jedna rejestracja atexit na proces
+# zamiast dwóch na instancję (WeakSet nie przedłuża życia instancji)
+_EXIT_FLUSH_MONITORS: "weakref.WeakSet[CloudTeslaMonitor]" = weakref.WeakSet()
+
+
+def _flush_monitors_at_exit():
+    """
+    Zrzuca bufor zdarzeń wszystkich żyjących monitorów.
+
+    Bez zapisu stanu: zaległy stan zapisuje stop_monitoring z limitem czasu
+    (STATE_SHUTDOWN_FLUSH_TIMEOUT_SECONDS) - drugi, nieograniczony upload tutaj
+    szedłby równolegle z wątkiem 'state-flush' na tej samej generacji.
+    """
+    for monitor in list(_EXIT_FLUSH_MONITORS):
+        try:
+            monitor._flush_log_buffer()
+        except Exception as e:
+            logger.debug(f"Błąd zrzutu przy wyjściu procesu: {e}")
+
+
+atexit.register(_flush_monitors_at_exit)
+
+
 class CloudTeslaMonitor:
     """Główna klasa monitorowania Tesla w Google Cloud"""
+
+    # OPTYMALIZACJA: domyślne wartości na poziomie klasy dla leniwej inicjalizacji
+    # (TeslaController i stan z GCS tworzone dopiero przy pierwszym użyciu)
+    _initialized = False
+    _tesla_controller = None
+    # Ostatni (odcisk planu, hash) - patrz _generate_schedule_hash
+    _schedule_hash_memo: Tuple[tuple, str] = ((), "")
+
+    # Konfiguracja strefy czasowej - CZAS WARSZAWSKI
+    timezone = _WARSAW_TZ
     
     def __init__(self):
-        """Inicjalizacja monitora"""
-        load_dotenv()
-        
-        # Konfiguracja strefy czasowej - CZAS WARSZAWSKI
-        self.timezone = pytz.timezone('Europe/Warsaw')
+        """
+        Inicjalizacja monitora - tylko lekkie ustawienia domyślne.
+
+        Ciężka inicjalizacja (TeslaController, test proxy, stan z Cloud Storage)
+        odbywa się leniwie w _ensure_initialized(), żeby /health odpowiadał
+        od razu po cold-starcie Cloud Run.
+        """
         logger.info(f"Monitor skonfigurowany dla strefy czasowej: {self.timezone}")
         
-        # Konfiguracja Tesla z diagnostyką połączenia
-        logger.info("🔧 Inicjalizacja TeslaController...")
-        
         # Sprawdź konfigurację Smart Tesla HTTP Proxy
-        self.smart_proxy_mode = os.getenv('TESLA_SMART_PROXY_MODE') == 'true'
-        self.proxy_available = os.getenv('TESLA_PROXY_AVAILABLE') == 'true'
-        proxy_host = os.getenv('TESLA_HTTP_PROXY_HOST')
-        proxy_port = os.getenv('TESLA_HTTP_PROXY_PORT')
+        self.smart_proxy_mode = ENV.smart_proxy_mode
+        self.proxy_available = ENV.proxy_available
+        self.proxy_host = ENV.proxy_host
+        self.proxy_port = ENV.proxy_port
         
         if self.smart_proxy_mode:
             logger.info("🔧 Smart Proxy Mode włączony")
             if self.proxy_available:
-                logger.info(f"✅ Tesla HTTP Proxy dostępny: {proxy_host}:{proxy_port}")
+                logger.info(f"✅ Tesla HTTP Proxy dostępny: {self.proxy_host}:{self.proxy_port}")
                 logger.info("🔧 Proxy uruchamiany on-demand dla komend")
             else:
                 logger.warning("⚠️ Tesla HTTP Proxy niedostępny - tylko monitoring")
-        elif proxy_host and proxy_port:
-            logger.info(f"🔗 Tesla HTTP Proxy skonfigurowane: {proxy_host}:{proxy_port}")
+        elif self.proxy_host and self.proxy_port:
+            logger.info(f"🔗 Tesla HTTP Proxy skonfigurowane: {self.proxy_host}:{self.proxy_port}")
         else:
             logger.warning("⚠️ Tesla HTTP Proxy NIE jest skonfigurowane - używam bezpośrednio Fleet API")
             logger.warning("⚠️ Usuwanie harmonogramów może nie działać bez Tesla HTTP Proxy")
@@ -519,33 +807,17 @@ class CloudTeslaMonitor:
         self.proxy_process = None
         self.proxy_running = False
         
-        self.tesla_controller = TeslaController()
-        
-        # NAPRAWKA: Test połączenia z Tesla HTTP Proxy TYLKO jeśli jest skonfigurowany i private key gotowy
-        if proxy_host and proxy_port and not self.smart_proxy_mode:
-            # Tylko dla non-smart proxy mode - test połączenia podczas startup
-            private_key_ready = os.getenv('TESLA_PRIVATE_KEY_READY', 'false').lower() == 'true'
-            if private_key_ready or os.path.exists('private-key.pem'):
-                self._test_tesla_proxy_connection(proxy_host, proxy_port)
-            else:
-                logger.warning("⚠️ Private key niegotowy - pomijam test Tesla HTTP Proxy")
-        elif self.smart_proxy_mode:
-            logger.info("💡 Smart Proxy Mode - proxy będzie testowany on-demand")
-        
-        # Konfiguracja Google Cloud
-        self.project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
-        self.bucket_name = os.getenv('GOOGLE_CLOUD_STORAGE_BUCKET', 'tesla-monitor-data')
-        
-        # Inicjalizacja klientów Google Cloud
-        self.storage_client = storage.Client() if self.project_id else None
-        self.firestore_client = firestore.Client() if self.project_id else None
+        # Konfiguracja Google Cloud (klienci tworzeni leniwie - patrz storage_client/firestore_client)
+        self.project_id = ENV.gcp_project
+        self.bucket_name = ENV.bucket
         
         # Stan monitorowania
         self.active_cases: Dict[str, VehicleMonitoringCase] = {}
         self.is_running = False
         
         # Śledzenie poprzedniego stanu pojazdu dla logowania tylko zmian
-        self.last_vehicle_state: Dict[str, Any] = {}
+        # (BoundedVinCache - limit VIN-ów, żeby zapomniane pojazdy nie rosły w nieskończoność)
+        self.last_vehicle_state: Dict[str, Any] = BoundedVinCache()
         
         # HTTP server dla health check
         self.http_server = None
@@ -553,18 +825,147 @@ class CloudTeslaMonitor:
         
         # NOWE: Cache dla harmonogramów OFF PEAK CHARGE
         # (inicjalizacja PRZED _load_monitoring_state, które może je wypełnić z Cloud Storage)
-        self.last_off_peak_schedules: Dict[str, Dict] = {}  # VIN -> harmonogram hash
-        self.last_tesla_schedules_home: Dict[str, List[Dict]] = {}  # VIN -> lista harmonogramów HOME
-
-        # Ładowanie stanu z Cloud Storage
-        self._load_monitoring_state()
+        self.last_off_peak_schedules: Dict[str, Dict] = BoundedVinCache()  # VIN -> harmonogram hash
+        self.last_tesla_schedules_home: Dict[str, List[Dict]] = BoundedVinCache()  # VIN -> lista harmonogramów HOME
 
         # Identyfikator instancji dla lease-locka cyklu (Firestore)
         self.instance_id = uuid.uuid4().hex
 
         # Retry-budget: licznik nieudanych prób zastosowania harmonogramu per VIN
         # (chroni przed spamem komend do pojazdu przy trwałym błędzie)
-        self.schedule_apply_attempts: Dict[str, Dict[str, Any]] = {}
+        self.schedule_apply_attempts: Dict[str, Dict[str, Any]] = BoundedVinCache()
+
+        # Bufor zdarzeń dla Firestore (zapisy wsadowe zamiast add() per zdarzenie).
+        # Bufor cykliczny: przy dłuższej awarii Firestore najstarsze zdarzenia wypadają
+        self._log_buffer: deque = deque(maxlen=self.LOG_BUFFER_CAPACITY)
+        self._log_buffer_lock = threading.Lock()
+        self._last_log_flush = time.monotonic()
+        _EXIT_FLUSH_MONITORS.add(self)
+
+        # Leniwa inicjalizacja (RLock - _load_monitoring_state może sięgać po klientów GCP)
+        self._init_lock = threading.RLock()
+        self._initialized = False
+
+    def _ensure_initialized(self):
+        """
+        Leniwa inicjalizacja ciężkich zależności (idempotentna, thread-safe).
+
+        Tworzy TeslaController, testuje Tesla HTTP Proxy (tryb non-smart)
+        i ładuje stan monitorowania z Cloud Storage. Wołana przed pracą
+        przez /run-cycle, /run-midnight-wake, reset oraz przy pierwszym
+        dostępie do tesla_controller.
+        """
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+
+            logger.info("🔧 Inicjalizacja TeslaController...")
+            self._tesla_controller = TeslaController()
+
+            # NAPRAWKA: Test połączenia z Tesla HTTP Proxy TYLKO jeśli jest skonfigurowany i private key gotowy
+            if self.proxy_host and self.proxy_port and not self.smart_proxy_mode:
+                # Tylko dla non-smart proxy mode - test połączenia podczas startup
+                if ENV.private_key_ready or os.path.exists('private-key.pem'):
+                    self._test_tesla_proxy_connection(self.proxy_host, self.proxy_port)
+                else:
+                    logger.warning("⚠️ Private key niegotowy - pomijam test Tesla HTTP Proxy")
+            elif self.smart_proxy_mode:
+                logger.info("💡 Smart Proxy Mode - proxy będzie testowany on-demand")
+
+            # Ładowanie stanu z Cloud Storage
+            self._load_monitoring_state()
+
+            self._initialized = True
+
+    @property
+    def tesla_controller(self) -> TeslaController:
+        """TeslaController tworzony przy pierwszym użyciu (patrz _ensure_initialized)"""
+        if self._tesla_controller is None:
+            self._ensure_initialized()
+        return self._tesla_controller
+
+    @tesla_controller.setter
+    def tesla_controller(self, controller):
+        self._tesla_controller = controller
+
+    @functools.cached_property
+    def _http(self) -> requests.Session:
+        """
+        Współdzielona sesja HTTP dla OFF PEAK CHARGE API (keep-alive, pula połączeń).
+
+        Retry urllib3 tylko na etapie nawiązywania połączenia (żądanie nie
+        zostało wysłane) - ponowienia 5xx/429 obsługuje pętla w
+        _call_off_peak_charge_api.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                              max_retries=UrllibRetry(total=3, connect=3, read=0, status=0, backoff_factor=0.5))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'Content-Type': 'application/json'})
+        return session
+
+    @functools.cached_property
+    def _proxy_http(self) -> requests.Session:
+        """
+        Sesja HTTP (keep-alive) dla testów połączenia z lokalnym Tesla HTTP Proxy.
+
+        Proxy używa certyfikatu self-signed, więc weryfikacja TLS jest wyłączona.
+        Bez retry - test gotowości sam ponawia próby (patrz _start_proxy_on_demand).
+        """
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
+        session.verify = False
+        return session
+
+    def _close_http_session(self, name: str = '_http'):
+        """Zamyka sesję HTTP (jeśli była utworzona) - kolejne użycie utworzy nową"""
+        session = self.__dict__.pop(name, None)
+        if session is not None:
+            session.close()
+
+    STATUS_TIMEOUT_SECONDS = 90  # limit odczytu statusu pojazdu na poziomie aplikacji
+    STATUS_CACHE_TTL_SECONDS = 45  # wiek statusu akceptowany na początku cyklu
+
+    @functools.cached_property
+    def _status_executor(self) -> ThreadPoolExecutor:
+        """Pula wątków dla odczytu statusu pojazdu z timeoutem (patrz _check_vehicle_status)"""
+        return ThreadPoolExecutor(max_workers=2, thread_name_prefix="tesla-status")
+
+    SCHEDULE_RUN_TIMEOUT_SECONDS = 300  # limit schedule.run_pending() w pętli continuous
+    RECONNECT_BASE_SECONDS = 60        # baza backoffu ponownego połączenia z Tesla API
+    RECONNECT_INTERVAL_SECONDS = 3600  # górny limit odstępu prób połączenia w trybie oczekiwania
+    RECONNECT_MAX_ATTEMPT = 10         # limit wykładnika backoffu
+    _pending_schedule_run = None  # Future zadań schedule, które przekroczyły limit
+
+    @functools.cached_property
+    def _stop_event(self) -> threading.Event:
+        """Sygnał zatrzymania dla pętli trybu scheduler/continuous (ustawiany w stop_monitoring)"""
+        return threading.Event()
+
+    @functools.cached_property
+    def _schedule_executor(self) -> ThreadPoolExecutor:
+        """Jednowątkowa pula dla schedule.run_pending() z timeoutem (pętla continuous)"""
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="schedule")
+
+    @functools.cached_property
+    def storage_client(self):
+        """Klient Google Cloud Storage tworzony przy pierwszym użyciu"""
+        if not self.project_id:
+            return None
+        # Import leniwy - biblioteki GCP to większość czasu importu modułu (cold start)
+        from google.cloud import storage
+        return storage.Client()
+
+    @functools.cached_property
+    def firestore_client(self):
+        """Klient Firestore tworzony przy pierwszym użyciu"""
+        if not self.project_id:
+            return None
+        from google.cloud import firestore
+        return firestore.Client()
         
     def _load_monitoring_state(self):
         """Ładuje stan monitorowania z Cloud Storage"""
@@ -574,10 +975,16 @@ class CloudTeslaMonitor:
                 return
                 
             bucket = self.storage_client.bucket(self.bucket_name)
-            blob = bucket.blob('monitoring_state.json')
-            
-            if blob.exists():
-                state_data = json.loads(blob.download_as_text())
+            # get_blob zamiast exists(): to samo zapytanie o metadane, ale daje
+            # generację obiektu potrzebną do warunkowego zapisu
+            blob = bucket.get_blob('monitoring_state.json')
+            
+            if blob is not None:
+                self._state_generation = blob.generation
+                # OPTYMALIZACJA: jednorazowy odczyt bajtów - parser (orjson/json) przyjmuje
+                # bytes bezpośrednio, bez pośredniej kopii str (download_as_text)
+                with blob.open('rb') as f:
+                    state_data = _json_loads_bytes(f.read())
                 self.active_cases = {
                     case_id: VehicleMonitoringCase.from_dict(case_data)
                     for case_id, case_data in state_data.get('active_cases', {}).items()
@@ -597,8 +1004,8 @@ class CloudTeslaMonitor:
                         state_age_ok = False
 
                 if state_age_ok:
-                    self.last_off_peak_schedules = state_data.get('last_off_peak_schedules', {})
-                    self.last_vehicle_state = state_data.get('last_vehicle_state', {})
+                    self.last_off_peak_schedules = BoundedVinCache(state_data.get('last_off_peak_schedules', {}))
+                    self.last_vehicle_state = BoundedVinCache(state_data.get('last_vehicle_state', {}))
                     logger.info(f"Załadowano stan decyzyjny: {len(self.last_off_peak_schedules)} hashy planów, "
                                 f"{len(self.last_vehicle_state)} stanów pojazdów")
                 else:
@@ -606,17 +1013,48 @@ class CloudTeslaMonitor:
 
                 logger.info(f"Załadowano stan monitorowania: {len(self.active_cases)} aktywnych przypadków")
             else:
+                self._state_generation = None
                 logger.info("Brak zapisanego stanu monitorowania - rozpoczynam z pustym stanem")
 
         except Exception as e:
             logger.error(f"Błąd ładowania stanu monitorowania: {e}")
     
-    def _save_monitoring_state(self):
-        """Zapisuje stan monitorowania do Cloud Storage"""
+    def _refresh_monitoring_state(self):
+        """
+        Doładowuje stan z Cloud Storage, jeśli inna instancja zapisała go od
+        naszego ostatniego odczytu/zapisu (inna generacja obiektu).
+
+        Wołane na początku cyklu pod lease-lockiem: w trybie scheduler stan jest
+        ładowany raz na proces, więc bez tego druga instancja miałaby nieaktualną
+        generację i każdy jej zapis kończyłby się konfliktem.
+        """
+        if not self.storage_client:
+            return
+        try:
+            blob = self.storage_client.bucket(self.bucket_name).get_blob('monitoring_state.json')
+        except Exception as e:
+            logger.warning(f"⚠️ Błąd odczytu generacji stanu monitorowania: {e}")
+            return
+        generation = blob.generation if blob is not None else None
+        if generation == self._state_generation:
+            return
+        if self._state_dirty:
+            logger.warning("⚠️ Niezapisane zmiany stanu zastąpione stanem zapisanym przez inną instancję")
+        self._load_monitoring_state()
+        self._last_saved_digest = ""
+
+    def _save_monitoring_state(self) -> bool:
+        """
+        Zapisuje stan monitorowania do Cloud Storage
+
+        Returns:
+            bool: True po zapisie (oraz bez GCS i przy stanie bez zmian), False przy
+                  błędzie lub konflikcie generacji - stan zostaje oznaczony do ponowienia
+        """
         try:
             if not self.storage_client:
                 logger.debug("Brak konfiguracji Google Cloud Storage - pomijam zapis stanu")
-                return
+                return True
                 
             state_data = {
                 'active_cases': {
@@ -626,17 +1064,91 @@ class CloudTeslaMonitor:
                 # Stan decyzyjny musi przeżyć scale-to-zero (patrz _load_monitoring_state)
                 'last_off_peak_schedules': self.last_off_peak_schedules,
                 'last_vehicle_state': self.last_vehicle_state,
-                'last_update': self._get_warsaw_time().isoformat()
             }
-            
+
+            # OPTYMALIZACJA: skrót treści (bez last_update, który zmienia się zawsze) -
+            # identyczny stan nie jest wysyłany ponownie. Znacznik czasu odświeżamy
+            # jednak co STATE_REFRESH_MAX_AGE_SECONDS, żeby nie wygasł TTL 24h przy ładowaniu
+            content = _json_dumps_bytes(state_data)
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            now = time.monotonic()
+            if (digest == self._last_saved_digest
+                    and now - self._last_saved_at < self.STATE_REFRESH_MAX_AGE_SECONDS):
+                logger.debug("Stan monitorowania bez zmian - pomijam zapis do Cloud Storage")
+                return True
+
+            state_data['last_update'] = self._get_warsaw_time().isoformat()
+            # Jednokrotna serializacja do bajtów (bez indent) i upload ze strumienia
+            payload = _json_dumps_bytes(state_data)
+
             bucket = self.storage_client.bucket(self.bucket_name)
             blob = bucket.blob('monitoring_state.json')
-            blob.upload_from_string(json.dumps(state_data, indent=2))
+            try:
+                # if_generation_match: nie nadpisuj po cichu stanu zapisanego przez inną
+                # instancję (0 = obiekt nie może jeszcze istnieć)
+                blob.upload_from_file(io.BytesIO(payload), size=len(payload),
+                                      content_type='application/json',
+                                      if_generation_match=self._state_generation or 0)
+            except gcp_exceptions.PreconditionFailed:
+                # NAPRAWKA: bez ślepego nadpisania i bez udawania sukcesu - zapis się nie
+                # odbył, więc stan zostaje oznaczony. Generację odświeża następny cykl
+                # pod lease-lockiem (_refresh_monitoring_state)
+                logger.warning("⚠️ Stan w Cloud Storage zmieniony przez inną instancję - zapis odrzucony")
+                return False
 
+            self._state_generation = blob.generation
+            self._last_saved_digest = digest
+            self._last_saved_at = now
             logger.debug("Stan monitorowania zapisany do Cloud Storage")
+            return True
 
         except Exception as e:
             logger.error(f"Błąd zapisu stanu monitorowania: {e}")
+            return False
+
+    # ========== DEBOUNCE ZAPISU STANU ==========
+
+    STATE_PERSIST_MIN_INTERVAL_SECONDS = 30  # min. odstęp zapisów stanu poza końcem cyklu
+    STATE_REFRESH_MAX_AGE_SECONDS = 6 * 3600  # max. wiek last_update przy niezmienionym stanie
+    STATE_SHUTDOWN_FLUSH_TIMEOUT_SECONDS = 2  # limit zapisu stanu w stop_monitoring (SIGTERM -> SIGKILL ~10 s)
+    PROXY_SHUTDOWN_WAIT_SECONDS = 5  # limit czekania w stop_monitoring na zwolnienie proxy przez cykl
+    _state_dirty = False
+    _state_dirty_seq = 0  # licznik oznaczeń - zmiana w trakcie zapisu nie jest gubiona
+    _last_persist = 0.0
+    _state_generation: Optional[int] = None  # generacja obiektu stanu w GCS
+    _last_saved_digest = ""
+    _last_saved_at = 0.0
+
+    def _mark_state_dirty(self):
+        """Oznacza stan jako zmieniony - zapis zbiorczo przez _persist_state_if_dirty"""
+        self._state_dirty = True
+        self._state_dirty_seq += 1
+
+    def _persist_state_if_dirty(self, force: bool = False):
+        """
+        Zapisuje stan do Cloud Storage, jeśli był zmieniony.
+
+        Zamiast zapisu po każdej mutacji (przypadek B, hash planu, stan pojazdu)
+        cykl robi jeden zapis na końcu (force=True). Pętla continuous woła bez
+        force - zapis najwyżej co STATE_PERSIST_MIN_INTERVAL_SECONDS.
+
+        Flaga jest zdejmowana dopiero po udanym zapisie: nieudany zapis zostawia
+        stan oznaczony (i _last_persist bez zmian), więc następne wywołanie ponawia.
+
+        Args:
+            force: True - zapisz niezależnie od czasu od ostatniego zapisu
+        """
+        if not self._state_dirty:
+            return
+        if not force and time.monotonic() - self._last_persist < self.STATE_PERSIST_MIN_INTERVAL_SECONDS:
+            return
+        dirty_seq = self._state_dirty_seq
+        if not self._save_monitoring_state():
+            return
+        self._last_persist = time.monotonic()
+        # Zmiana oznaczona w trakcie zapisu czeka na kolejny zapis
+        if self._state_dirty_seq == dirty_seq:
+            self._state_dirty = False
 
     # ========== LEASE-LOCK CYKLU (Firestore) ==========
 
@@ -656,6 +1168,7 @@ class CloudTeslaMonitor:
         lock_ref = self.firestore_client.collection('locks').document('monitoring_cycle')
         now = datetime.now(timezone.utc)
         transaction = self.firestore_client.transaction()
+        from google.cloud import firestore
 
         @firestore.transactional
         def _try_acquire(tx):
@@ -806,9 +1319,9 @@ class CloudTeslaMonitor:
                 effective_end = None
                 if isinstance(end_raw, str):
                     try:
-                        effective_end = datetime.fromisoformat(end_raw.replace('Z', '+00:00'))
+                        effective_end = datetime.fromisoformat(end_raw)
                         if effective_end.tzinfo is None:
-                            effective_end = self.timezone.localize(effective_end)
+                            effective_end = effective_end.replace(tzinfo=self.timezone)
                     except (ValueError, AttributeError):
                         effective_end = None
 
@@ -821,9 +1334,9 @@ class CloudTeslaMonitor:
                 created_raw = data.get('created_at')
                 if isinstance(created_raw, str):
                     try:
-                        created = datetime.fromisoformat(created_raw.replace('Z', '+00:00'))
+                        created = datetime.fromisoformat(created_raw)
                         if created.tzinfo is None:
-                            created = self.timezone.localize(created)
+                            created = created.replace(tzinfo=self.timezone)
                         if now - created <= timedelta(hours=24):
                             return True
                         continue
@@ -863,7 +1376,7 @@ class CloudTeslaMonitor:
             charging_state = vehicle_status.get('charging_state', 'Unknown')
             battery_level = vehicle_status.get('battery_level', 0)
             overlap = self._current_time_overlaps_schedules(schedules)
-            use_proxy = bool(getattr(self.tesla_controller.fleet_api, 'proxy_url', None))
+            use_proxy = self.tesla_controller.uses_proxy
 
             if overlap and charging_state in ('Stopped', 'NoPower', 'Complete'):
                 if charging_state == 'Complete':
@@ -1045,18 +1558,16 @@ class CloudTeslaMonitor:
                 }
             }
             
-            # Przygotuj headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-API-Key': api_key
-            }
+            # Przygotuj headers (Content-Type ustawiony raz w sesji self._http)
+            headers = {'X-API-Key': api_key}
             
             # Loguj żądanie
-            warsaw_time = self._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
-            logger.info(f"{time_str} 🔄 Wywołuję OFF PEAK CHARGE API")
+            tlogger.info("🔄 Wywołuję OFF PEAK CHARGE API")
             logger.info(f"URL: {api_url}")
-            logger.info(f"Dane: {json.dumps(request_data, indent=2)}")
+            # OPTYMALIZACJA: pretty-print tylko na DEBUG (LOG_LEVEL=DEBUG lokalnie) -
+            # w produkcji json.dumps w ogóle się nie wykonuje
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Dane: {json.dumps(request_data, indent=2)}")
 
             # Retry z backoffem: pojedynczy przejściowy błąd (SSL EOF, timeout,
             # 5xx, 429) NIE może odpalać agresywnego fallbacku — fallback dopiero
@@ -1068,22 +1579,23 @@ class CloudTeslaMonitor:
             last_error = None
             for attempt in range(1, max_attempts + 1):
                 try:
-                    response = requests.post(
+                    # OPTYMALIZACJA: sesja z pulą połączeń - bez handshake TLS przy każdym wywołaniu
+                    response = self._http.post(
                         api_url,
                         json=request_data,
                         headers=headers,
-                        timeout=30  # 30 sekund timeout
+                        timeout=(5, 30)  # connect 5s, odczyt 30s
                     )
                 except requests.exceptions.RequestException as e:
                     last_error = f"błąd połączenia: {str(e)}"
-                    logger.warning(f"{time_str} ⚠️ OFF PEAK API próba {attempt}/{max_attempts} — {last_error}")
+                    tlogger.warning(f"⚠️ OFF PEAK API próba {attempt}/{max_attempts} — {last_error}")
                     response = None
                 else:
                     # Retry tylko na przejściowych statusach; 4xx (poza 429) nie naprawi się sam
                     if response.status_code == 200 or (response.status_code < 500 and response.status_code != 429):
                         break
                     last_error = f"błąd HTTP {response.status_code}"
-                    logger.warning(f"{time_str} ⚠️ OFF PEAK API próba {attempt}/{max_attempts} — {last_error}")
+                    tlogger.warning(f"⚠️ OFF PEAK API próba {attempt}/{max_attempts} — {last_error}")
 
                 if attempt < max_attempts:
                     time.sleep(backoff_base * (2 ** (attempt - 1)))  # 2s, 4s, ...
@@ -1097,35 +1609,33 @@ class CloudTeslaMonitor:
             if response.status_code == 200:
                 response_data = response.json()
                 
-                # Loguj pomyślną odpowiedź
-                logger.info(f"{time_str} ✅ OFF PEAK CHARGE API - sukces")
-                logger.info("=== ODPOWIEDŹ OFF PEAK CHARGE API ===")
-                logger.info(json.dumps(response_data, indent=2, ensure_ascii=False))
-                logger.info("===================================")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"=== ODPOWIEDŹ OFF PEAK CHARGE API ===\n{json.dumps(response_data, indent=2, ensure_ascii=False)}")
                 
-                # Dodatkowe logowanie kluczowych informacji
-                if response_data.get('success') and 'data' in response_data:
-                    data = response_data['data']
-                    summary = data.get('summary', {})
-                    schedule_count = summary.get('scheduledSlots', 0)
-                    total_energy = summary.get('totalEnergy', 0)
-                    total_cost = summary.get('totalCost', 0)
-                    avg_price = summary.get('averagePrice', 0)
-                    
-                    logger.info(f"{time_str} 📊 Harmonogram: {schedule_count} sesji, {total_energy} kWh, {total_cost:.2f} zł (średnia: {avg_price:.3f} zł/kWh)")
-                    
-                    # Loguj harmonogram ładowania
-                    charging_schedule = data.get('chargingSchedule', [])
-                    for i, slot in enumerate(charging_schedule, 1):
-                        start_time = slot.get('start_time', '')
-                        end_time = slot.get('end_time', '')
-                        charge_amount = slot.get('charge_amount', 0)
-                        cost = slot.get('cost', 0)
-                        logger.info(f"{time_str} ⚡ Sesja #{i}: {start_time} - {end_time}, {charge_amount} kWh, {cost:.2f} zł")
+                # OPTYMALIZACJA: jeden strukturalny wpis zamiast pełnego dumpa JSON,
+                # linii podsumowania i osobnej linii per sesja (5-20 zapisów do
+                # Cloud Logging na wywołanie). Pola json_fields są przeszukiwalne
+                # w Log Explorer.
+                data = response_data.get('data', {}) if response_data.get('success') else {}
+                summary = data.get('summary', {})
+                charging_schedule = data.get('chargingSchedule', [])
+                tlogger.info(
+                    "✅ OFF PEAK CHARGE API - sukces: %s sesji, %s kWh, %.2f zł (średnia: %.3f zł/kWh)",
+                    summary.get('scheduledSlots', 0), summary.get('totalEnergy', 0),
+                    summary.get('totalCost', 0), summary.get('averagePrice', 0),
+                    extra={'json_fields': {
+                        'event': 'off_peak_charge_response',
+                        'vin': vehicle_vin,
+                        'battery': battery_level,
+                        'summary': summary,
+                        'slots': charging_schedule,
+                        'api_url': api_url
+                    }}
+                )
                 
                 return response_data
             else:
-                logger.error(f"{time_str} ❌ Błąd OFF PEAK CHARGE API - status {response.status_code}")
+                tlogger.error(f"❌ Błąd OFF PEAK CHARGE API - status {response.status_code}")
                 return _create_fallback_response(f"błąd HTTP {response.status_code}")
                 
         except requests.exceptions.RequestException as e:
@@ -1147,50 +1657,147 @@ class CloudTeslaMonitor:
             extra_data: Dodatkowe dane (opcjonalnie)
         """
         warsaw_time = self._get_warsaw_time()
-        log_data = {
-            'timestamp': warsaw_time.isoformat(),
-            'timestamp_utc': datetime.utcnow().isoformat(),
-            'timezone': str(self.timezone),
-            'event_message': message,  # Zmieniono z 'message' na 'event_message'
-        }
+        # OPTYMALIZACJA: słownik budowany jednym przebiegiem (pola opcjonalne odfiltrowane)
+        log_data = {k: v for k, v in (
+            ('timestamp', warsaw_time.isoformat()),
+            ('timestamp_utc', datetime.now(_UTC).isoformat()),
+            ('timezone', str(self.timezone)),
+            ('event_message', message),  # Zmieniono z 'message' na 'event_message'
+            ('battery_level', battery_level),
+            ('vehicle_vin', vehicle_vin or None),
+        ) if v is not None}
         
-        if battery_level is not None:
-            log_data['battery_level'] = battery_level
-            
-        if vehicle_vin:
-            log_data['vehicle_vin'] = vehicle_vin
-            
         if extra_data:
-            log_data.update(extra_data)
+            log_data |= extra_data
         
         # Logowanie do standardowego loggera (bez extra - to powodowało konflikt)
         logger.info(f"Tesla Monitor: {message}")
         
-        # Dodatkowe logowanie do Cloud Logging jeśli dostępne
+        # Dodatkowe logowanie do Firestore jeśli dostępne.
+        # OPTYMALIZACJA: zdarzenie trafia do bufora; zapis wsadowy po LOG_BUFFER_MAX
+        # zdarzeniach, po LOG_BUFFER_MAX_AGE_SECONDS albo na końcu cyklu
         if self.firestore_client:
-            try:
-                collection = self.firestore_client.collection('tesla_monitor_logs')
-                collection.add(log_data)
-            except Exception as e:
-                logger.error(f"Błąd zapisu do Firestore: {e}")
+            with self._log_buffer_lock:
+                self._log_buffer.append((0, log_data))
+                # OPTYMALIZACJA: najwyżej jeden zrzut w tle naraz - kolejne zdarzenia dołączają
+                # do bufora zamiast uruchamiać następne wątki z równoległymi commitami
+                flush_due = not self._log_flush_in_flight and (
+                    len(self._log_buffer) >= self.LOG_BUFFER_MAX or
+                    time.monotonic() - self._last_log_flush > self.LOG_BUFFER_MAX_AGE_SECONDS)
+                if flush_due:
+                    self._log_flush_in_flight = True
+            if flush_due:
+                threading.Thread(target=self._flush_log_buffer_background,
+                                 name="firestore-log-flush", daemon=True).start()
+
+    # ========== BUFOR LOGÓW ZDARZEŃ (Firestore) ==========
+
+    LOG_BUFFER_MAX = 50              # zdarzeń w buforze przed wymuszonym zapisem
+    LOG_BUFFER_MAX_AGE_SECONDS = 10  # maksymalny wiek bufora
+    LOG_BUFFER_CAPACITY = 500        # pojemność bufora cyklicznego (zdarzenia czekające na ponowienie)
+    LOG_FLUSH_MAX_ATTEMPTS = 5       # nieudane zapisy zdarzenia, po których jest porzucane
+    LOG_COMMIT_RETRY = Retry(initial=0.5, maximum=5.0, multiplier=2.0, timeout=30.0)
+    _log_flush_in_flight = False     # czy wątek zrzutu w tle już pracuje
+
+    @functools.cached_property
+    def _log_collection(self):
+        """Referencja kolekcji tesla_monitor_logs tworzona raz (bez parsowania ścieżki per zapis)"""
+        return self.firestore_client.collection('tesla_monitor_logs') if self.firestore_client else None
+
+    def _flush_log_buffer(self):
+        """
+        Zapisuje zbuforowane zdarzenia do Firestore jednym WriteBatch.
+
+        Wołane automatycznie przy progu bufora, na końcu cyklu, przy resecie,
+        zatrzymaniu i wyjściu procesu (atexit). Na Cloud Run CPU jest dławione
+        po odpowiedzi HTTP, dlatego cykle zrzucają bufor przed zwróceniem wyniku.
+
+        Bufor trzyma pary (liczba nieudanych prób, zdarzenie) - zdarzenie, którego
+        zapis nie udał się LOG_FLUSH_MAX_ATTEMPTS razy, jest porzucane.
+        """
+        if not self.firestore_client:
+            return
+        with self._log_buffer_lock:
+            if not self._log_buffer:
+                return
+            entries = list(self._log_buffer)
+            self._log_buffer.clear()
+            self._last_log_flush = time.monotonic()
+
+        try:
+            collection = self._log_collection
+            batch = self.firestore_client.batch()
+            for _, entry in entries:
+                batch.set(collection.document(), entry)
+            batch.commit(retry=self.LOG_COMMIT_RETRY)
+        except Exception as e:
+            logger.error(f"Błąd zapisu {len(entries)} zdarzeń do Firestore: {e}")
+            # NAPRAWKA: zdarzenia wracają na początek bufora - ponowienie przy kolejnym zrzucie
+            # (nowsze zdarzenia mają pierwszeństwo, gdy bufor cykliczny jest pełny).
+            # Limit prób: partia, której zapis zawsze się nie udaje, nie krąży w nieskończoność
+            retry_entries = [(attempts + 1, entry) for attempts, entry in entries
+                             if attempts + 1 < self.LOG_FLUSH_MAX_ATTEMPTS]
+            if len(retry_entries) < len(entries):
+                logger.warning(f"⚠️ Porzucono {len(entries) - len(retry_entries)} zdarzeń po "
+                               f"{self.LOG_FLUSH_MAX_ATTEMPTS} nieudanych próbach zapisu")
+            with self._log_buffer_lock:
+                room = self.LOG_BUFFER_CAPACITY - len(self._log_buffer)
+                if room > 0 and retry_entries:
+                    self._log_buffer.extendleft(reversed(retry_entries[-room:]))
     
-    def _get_monitoring_schedule_interval(self) -> int:
+    def _flush_log_buffer_background(self):
+        """Zrzut bufora w wątku w tle; zwalnia znacznik zrzutu po zakończeniu"""
+        try:
+            self._flush_log_buffer()
+        finally:
+            with self._log_buffer_lock:
+                self._log_flush_in_flight = False
+
+    def _get_monitoring_schedule_interval(self, now: Optional[datetime] = None) -> int:
         """
         Zwraca interwał monitorowania w minutach na podstawie aktualnej godziny warszawskiej
         
+        Args:
+            now: Już odczytany czas warszawski (None - odczytaj zegar)
+        
         Returns:
             int: Interwał w minutach (15 lub 60)
         """
-        warsaw_time = self._get_warsaw_time()
-        current_hour = warsaw_time.hour
-        
         # CZAS WARSZAWSKI (Europe/Warsaw):
         # 07:00-23:00 (7-22): co 15 minut
         # 23:00-07:00 (23-6): co 60 minut
-        if 7 <= current_hour <= 22:
-            return 15
-        else:
-            return 60
+        # Indeks krotki po godzinie lokalnej - zmiana czasu (DST) nie wymaga unieważniania
+        return _INTERVAL_BY_HOUR[(now or self._get_warsaw_time()).hour]
+
+    # ========== BUDŻET ZAPYTAŃ vehicle_data ==========
+
+    @functools.cached_property
+    def _vehicle_data_calls(self) -> deque:
+        """Znaczniki czasu (monotonic) udanych odczytów vehicle_data z ostatniej doby"""
+        return deque(maxlen=ENV.vehicle_data_daily_budget * 2)
+
+    def _budget_interval_minutes(self, floor_minutes: int) -> int:
+        """
+        Wylicza interwał monitorowania tak, żeby nie przekroczyć dziennego budżetu vehicle_data.
+
+        Pozostałe zapytania z okna 24h są rozkładane równomiernie na czas do
+        wypadnięcia najstarszego zapytania z okna.
+
+        Args:
+            floor_minutes: Minimalny interwał (z tablicy godzinowej)
+
+        Returns:
+            int: Interwał w minutach (nie mniejszy niż floor_minutes)
+        """
+        calls = self._vehicle_data_calls
+        now = time.monotonic()
+        while calls and now - calls[0] > 86400:
+            calls.popleft()
+        if not calls:
+            return floor_minutes
+        remaining = max(1, ENV.vehicle_data_daily_budget - len(calls))
+        seconds_left = 86400 - (now - calls[0])
+        return max(floor_minutes, math.ceil(seconds_left / remaining / 60))
     
     def reset_vehicle_state(self, vehicle_vin: str = None):
         """
@@ -1202,46 +1809,50 @@ class CloudTeslaMonitor:
         if vehicle_vin:
             if vehicle_vin in self.last_vehicle_state:
                 del self.last_vehicle_state[vehicle_vin]
+                self._mark_state_dirty()
                 logger.info(f"🔄 Zresetowano stan pojazdu {vehicle_vin[-4:]}")
         else:
             self.last_vehicle_state.clear()
+            self._mark_state_dirty()
             logger.info("🔄 Zresetowano stan wszystkich pojazdów")
     
     def reset_all_monitoring_state(self):
         """
         Kompletny reset stanu monitorowania - wszystkie dane wracają do stanu początkowego
         """
+        # Inicjalizacja PRZED resetem - inaczej późniejsze leniwe ładowanie
+        # stanu z Cloud Storage nadpisałoby wyczyszczony stan
+        self._ensure_initialized()
         warsaw_time = self._get_warsaw_time()
-        time_str = warsaw_time.strftime("[%H:%M]")
         
-        logger.info(f"{time_str} 🔄 === KOMPLETNY RESET STANU MONITOROWANIA ===")
+        tlogger.info("🔄 === KOMPLETNY RESET STANU MONITOROWANIA ===")
         
         # 1. Reset stanów pojazdów
         vehicles_count = len(self.last_vehicle_state)
         self.last_vehicle_state.clear()
-        logger.info(f"{time_str} ✅ Zresetowano stany {vehicles_count} pojazdów")
+        tlogger.info(f"✅ Zresetowano stany {vehicles_count} pojazdów")
         
         # 2. Reset aktywnych przypadków
         cases_count = len(self.active_cases)
         self.active_cases.clear()
-        logger.info(f"{time_str} ✅ Zresetowano {cases_count} aktywnych przypadków monitorowania")
+        tlogger.info(f"✅ Zresetowano {cases_count} aktywnych przypadków monitorowania")
         
         # 3. Reset cache harmonogramów OFF PEAK
         off_peak_count = len(self.last_off_peak_schedules)
         self.last_off_peak_schedules.clear()
-        logger.info(f"{time_str} ✅ Zresetowano cache {off_peak_count} harmonogramów OFF PEAK")
+        tlogger.info(f"✅ Zresetowano cache {off_peak_count} harmonogramów OFF PEAK")
         
         # 4. Reset cache harmonogramów Tesla HOME
         tesla_home_count = len(self.last_tesla_schedules_home)
         self.last_tesla_schedules_home.clear()
-        logger.info(f"{time_str} ✅ Zresetowano cache {tesla_home_count} harmonogramów Tesla HOME")
+        self._status_cache = None
+        tlogger.info(f"✅ Zresetowano cache {tesla_home_count} harmonogramów Tesla HOME")
         
         # 5. Zapisz pusty stan do Cloud Storage
-        try:
-            self._save_monitoring_state()
-            logger.info(f"{time_str} ✅ Zapisano pusty stan do Cloud Storage")
-        except Exception as e:
-            logger.error(f"{time_str} ❌ Błąd zapisu pustego stanu: {e}")
+        if self._save_monitoring_state():
+            tlogger.info("✅ Zapisano pusty stan do Cloud Storage")
+        else:
+            tlogger.error("❌ Błąd zapisu pustego stanu")
         
         # 6. Log zdarzenia resetu
         self._log_event(
@@ -1256,8 +1867,12 @@ class CloudTeslaMonitor:
                 'reset_reason': 'manual_testing_reset'
             }
         )
+        self._flush_log_buffer()
+        
+        # Świeża sesja HTTP po resecie (zrywa ewentualnie zawieszone połączenia)
+        self._close_http_session()
         
-        logger.info(f"{time_str} 🎉 RESET ZAKOŃCZONY - aplikacja gotowa do testowania od początku")
+        tlogger.info("🎉 RESET ZAKOŃCZONY - aplikacja gotowa do testowania od początku")
         
         return {
             'reset_completed': True,
@@ -1280,16 +1895,16 @@ class CloudTeslaMonitor:
         Returns:
             Dict z wynikami operacji
         """
+        self._ensure_initialized()
         warsaw_time = self._get_warsaw_time()
-        time_str = warsaw_time.strftime("[%H:%M]")
         
-        logger.info(f"{time_str} 🔄 === RESET HARMONOGRAMÓW HOME W TESLA ===")
+        tlogger.info("🔄 === RESET HARMONOGRAMÓW HOME W TESLA ===")
         
         try:
             # 1. Sprawdź połączenie z Tesla Controller
             if not self.tesla_controller.connect():
                 error_msg = "Nie można połączyć się z Tesla API"
-                logger.error(f"{time_str} ❌ {error_msg}")
+                tlogger.error("❌ %s", error_msg)
                 return {
                     'success': False,
                     'error': error_msg,
@@ -1301,10 +1916,10 @@ class CloudTeslaMonitor:
                 # Użyj pierwszego dostępnego pojazdu
                 if self.tesla_controller.vehicles:
                     vehicle_vin = self.tesla_controller.vehicles[0].get('vin')
-                    logger.info(f"{time_str} 🚗 Użyto pierwszego dostępnego pojazdu: {vehicle_vin[-4:]}")
+                    tlogger.info("🚗 Użyto pierwszego dostępnego pojazdu: %s", vehicle_vin[-4:])
                 else:
                     error_msg = "Brak dostępnych pojazdów"
-                    logger.error(f"{time_str} ❌ {error_msg}")
+                    tlogger.error("❌ %s", error_msg)
                     return {
                         'success': False,
                         'error': error_msg,
@@ -1312,11 +1927,23 @@ class CloudTeslaMonitor:
                     }
             
             # 3. Pobierz wszystkie harmonogramy HOME z Tesla
-            logger.info(f"{time_str} 📋 Pobieranie aktualnych harmonogramów HOME z Tesla...")
-            home_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
+            # 5. ...równolegle z uruchomieniem Tesla HTTP Proxy on-demand dla komend usuwania
+            # OPTYMALIZACJA: start proxy (do ~10 s oczekiwania na gotowość) nakłada się
+            # na round-trip odczytu harmonogramów zamiast następować po nim
+            tlogger.info("📋 Pobieranie aktualnych harmonogramów HOME z Tesla...")
+            tlogger.info("🚀 Uruchamianie Tesla HTTP Proxy on-demand...")
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="tesla-reset") as executor:
+                proxy_future = executor.submit(self._acquire_proxy)
+                schedules_future = executor.submit(self._get_home_schedules_from_tesla, vehicle_vin)
+                home_schedules = schedules_future.result()
+                proxy_started = proxy_future.result()
+
+            if not home_schedules and proxy_started:
+                # Nic do usuwania (albo błąd odczytu) - proxy niepotrzebny
+                self._release_proxy()
 
             if home_schedules is None:
-                logger.error(f"{time_str} ❌ Nie udało się odczytać harmonogramów HOME")
+                tlogger.error("❌ Nie udało się odczytać harmonogramów HOME")
                 return {
                     'success': False,
                     'error': 'Błąd odczytu harmonogramów z Tesla',
@@ -1324,7 +1951,7 @@ class CloudTeslaMonitor:
                 }
 
             if not home_schedules:
-                logger.info(f"{time_str} ✅ Brak harmonogramów HOME do usunięcia")
+                tlogger.info("✅ Brak harmonogramów HOME do usunięcia")
                 return {
                     'success': True,
                     'message': 'Brak harmonogramów HOME do usunięcia',
@@ -1333,7 +1960,7 @@ class CloudTeslaMonitor:
                     'timestamp': warsaw_time.isoformat()
                 }
             
-            logger.info(f"{time_str} 📋 Znaleziono {len(home_schedules)} harmonogramów HOME do usunięcia")
+            tlogger.info("📋 Znaleziono %s harmonogramów HOME do usunięcia", len(home_schedules))
             
             # 4. Wyświetl szczegóły harmonogramów przed usunięciem
             for i, schedule in enumerate(home_schedules):
@@ -1344,20 +1971,21 @@ class CloudTeslaMonitor:
                 lat = schedule.get('latitude', 0.0)
                 lon = schedule.get('longitude', 0.0)
                 
-                logger.info(f"{time_str} 📋 Harmonogram #{i+1}: ID={schedule_id}, {start_time}-{end_time}, enabled={enabled}, coords=({lat:.6f}, {lon:.6f})")
+                tlogger.info("📋 Harmonogram #%s: ID=%s, %s-%s, enabled=%s, coords=(%.6f, %.6f)", i+1, schedule_id, start_time, end_time, enabled, lat, lon)
             
-            # 5. Uruchom Tesla HTTP Proxy on-demand dla komend usuwania
-            logger.info(f"{time_str} 🚀 Uruchamianie Tesla HTTP Proxy on-demand...")
-            if not self._start_proxy_on_demand():
-                logger.warning(f"{time_str} ⚠️ Tesla HTTP Proxy nie uruchomiony - próbuję usuwać przez Fleet API")
+            if not proxy_started:
+                tlogger.warning("⚠️ Tesla HTTP Proxy nie uruchomiony - próbuję usuwać przez Fleet API")
 
             # 5.5 OPTYMALIZACJA: Jeden wake_up przed całą sekwencją usuwania (unika HTTP 429)
-            logger.info(f"{time_str} 🔄 Budzenie pojazdu przed usunięciem {len(home_schedules)} harmonogramów...")
-            use_proxy = bool(hasattr(self.tesla_controller.fleet_api, 'proxy_url') and self.tesla_controller.fleet_api.proxy_url)
+            tlogger.info("🔄 Budzenie pojazdu przed usunięciem %s harmonogramów...", len(home_schedules))
+            use_proxy = self.tesla_controller.uses_proxy
             if not self.tesla_controller.wake_up_vehicle(use_proxy=use_proxy):
-                logger.warning(f"{time_str} ⚠️ Wake_up nie powiodło się - kontynuuję mimo to (pojazd może być już online)")
+                tlogger.warning("⚠️ Wake_up nie powiodło się - kontynuuję mimo to (pojazd może być już online)")
 
             # 6. Usuń wszystkie harmonogramy HOME jeden po drugim
+            # Sekwencyjnie jak w _remove_old_schedules_from_tesla: pojazd wykonuje komendy
+            # po kolei, a równoległe wysyłanie kończy się HTTP 429. Ponowienia po 429
+            # obsługuje remove_charge_schedule klienta Fleet API (jedna warstwa retry).
             success_count = 0
             error_count = 0
             removed_schedule_ids = []
@@ -1365,39 +1993,41 @@ class CloudTeslaMonitor:
             for schedule in home_schedules:
                 schedule_id = schedule.get('id')
                 if schedule_id:
-                    logger.info(f"{time_str} 🗑️ Usuwanie harmonogramu HOME ID: {schedule_id}")
+                    tlogger.info("🗑️ Usuwanie harmonogramu HOME ID: %s", schedule_id)
                     
                     try:
                         # OPTYMALIZACJA: skip_wake=True bo wake_up już wywołane na początku sekwencji
                         if self.tesla_controller.remove_charge_schedule(schedule_id, skip_wake=True):
                             success_count += 1
                             removed_schedule_ids.append(schedule_id)
-                            logger.info(f"{time_str} ✅ Usunięto harmonogram ID: {schedule_id}")
+                            tlogger.info("✅ Usunięto harmonogram ID: %s", schedule_id)
                         else:
                             error_count += 1
-                            logger.error(f"{time_str} ❌ Nie udało się usunąć harmonogramu ID: {schedule_id}")
+                            tlogger.error("❌ Nie udało się usunąć harmonogramu ID: %s", schedule_id)
                     except Exception as remove_error:
                         error_count += 1
-                        logger.error(f"{time_str} ❌ Błąd usuwania harmonogramu ID {schedule_id}: {remove_error}")
+                        tlogger.error("❌ Błąd usuwania harmonogramu ID %s: %s", schedule_id, remove_error)
                 else:
                     error_count += 1
-                    logger.error(f"{time_str} ❌ Harmonogram bez ID - pomijam")
+                    tlogger.error("❌ Harmonogram bez ID - pomijam")
             
-            # 7. Zatrzymaj Tesla HTTP Proxy
-            logger.info(f"{time_str} 🛑 Zatrzymywanie Tesla HTTP Proxy...")
-            self._stop_proxy()
+            # 7. Zwolnij Tesla HTTP Proxy (zatrzymanie po TTL bezczynności)
+            if proxy_started:
+                tlogger.info("🛑 Zwalnianie Tesla HTTP Proxy...")
+                self._release_proxy()
             
             # 8. Weryfikacja - sprawdź czy harmonogramy zostały usunięte
-            logger.info(f"{time_str} 🔍 Weryfikacja usunięcia harmonogramów...")
+            tlogger.info("🔍 Weryfikacja usunięcia harmonogramów...")
             remaining_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
             if remaining_schedules is None:
-                logger.warning(f"{time_str} ⚠️ Nie udało się zweryfikować pozostałych harmonogramów")
+                tlogger.warning("⚠️ Nie udało się zweryfikować pozostałych harmonogramów")
                 remaining_schedules = []
 
             # 9. Wyczyść cache harmonogramów Tesla HOME
             if vehicle_vin in self.last_tesla_schedules_home:
                 del self.last_tesla_schedules_home[vehicle_vin]
-                logger.info(f"{time_str} 🧹 Wyczyszczono cache harmonogramów Tesla HOME")
+                self._mark_state_dirty()
+                tlogger.info("🧹 Wyczyszczono cache harmonogramów Tesla HOME")
             
             # 10. Loguj wyniki
             result = {
@@ -1426,17 +2056,17 @@ class CloudTeslaMonitor:
             )
             
             if success_count == len(home_schedules):
-                logger.info(f"{time_str} 🎉 RESET HARMONOGRAMÓW ZAKOŃCZONY POMYŚLNIE - usunięto {success_count}/{len(home_schedules)} harmonogramów")
+                tlogger.info("🎉 RESET HARMONOGRAMÓW ZAKOŃCZONY POMYŚLNIE - usunięto %s/%s harmonogramów", success_count, len(home_schedules))
             elif success_count > 0:
-                logger.warning(f"{time_str} ⚠️ RESET CZĘŚCIOWO POMYŚLNY - usunięto {success_count}/{len(home_schedules)} harmonogramów")
+                tlogger.warning("⚠️ RESET CZĘŚCIOWO POMYŚLNY - usunięto %s/%s harmonogramów", success_count, len(home_schedules))
             else:
-                logger.error(f"{time_str} ❌ RESET NIEUDANY - nie usunięto żadnego harmonogramu")
+                tlogger.error("❌ RESET NIEUDANY - nie usunięto żadnego harmonogramu")
             
             return result
             
         except Exception as e:
             error_msg = f"Błąd resetowania harmonogramów HOME: {e}"
-            logger.error(f"{time_str} ❌ {error_msg}")
+            tlogger.error("❌ %s", error_msg)
             
             # Zatrzymaj proxy w przypadku błędu
             try:
@@ -1450,13 +2080,28 @@ class CloudTeslaMonitor:
                 'timestamp': warsaw_time.isoformat()
             }
     
-    def _check_vehicle_status(self) -> Optional[Dict[str, Any]]:
+    # OPTYMALIZACJA: krótki cache statusu - vehicle_data jest płatne i limitowane
+    # (200/dzień), a kilka ścieżek jednego cyklu pyta o ten sam stan
+    _status_cache: Optional[Dict[str, Any]] = None
+    _status_cache_ts = 0.0
+
+    def _check_vehicle_status(self, ttl_s: float = 0, force: bool = False) -> Optional[Dict[str, Any]]:
         """
         Sprawdza status pojazdu
         
+        Args:
+            ttl_s: Maksymalny wiek (s) statusu z cache akceptowany przez wołającego;
+                   0 = zawsze świeży odczyt
+            force: True - pomiń cache (np. odczyt po wybudzeniu pojazdu)
+        
         Returns:
             Dict z statusem pojazdu lub None w przypadku błędu
         """
+        if (not force and self._status_cache is not None
+                and time.monotonic() - self._status_cache_ts < ttl_s):
+            logger.debug("Status pojazdu z cache (%.0fs)", time.monotonic() - self._status_cache_ts)
+            return self._status_cache
+
         try:
             # Test połączenia z Tesla API (bez szczegółowych logów)
             try:
@@ -1488,33 +2133,16 @@ class CloudTeslaMonitor:
             # Pobieranie statusu pojazdu z timeout'em
             try:
                 # NAPRAWKA: Dodaj timeout na poziomie aplikacji
-                import signal
-                import threading
-                
-                status_result = None
-                status_error = None
-                status_finished = threading.Event()
-                
-                def get_status_with_timeout():
-                    nonlocal status_result, status_error
-                    try:
-                        status_result = self.tesla_controller.get_vehicle_status()
-                    except Exception as e:
-                        status_error = e
-                    finally:
-                        status_finished.set()
-                
-                # Uruchom w osobnym wątku z timeout'em
-                status_thread = threading.Thread(target=get_status_with_timeout, daemon=True)
-                status_thread.start()
-                
-                # Czekaj maksymalnie 90 sekund na odpowiedź Tesla API
-                if status_finished.wait(timeout=90):
-                    if status_error:
-                        raise status_error
-                    status = status_result
-                else:
-                    logger.error("⏰ TIMEOUT pobierania statusu pojazdu (90s) - Tesla API nie odpowiada")
+                # OPTYMALIZACJA: współdzielona pula wątków zamiast nowego wątku per odczyt
+                # Jawna lista endpointów - status zawsze jednym żądaniem vehicle_data
+                future = self._status_executor.submit(self.tesla_controller.get_vehicle_status,
+                                                      endpoints=VEHICLE_STATUS_ENDPOINTS)
+                try:
+                    # Czekaj maksymalnie 90 sekund na odpowiedź Tesla API
+                    status = future.result(timeout=self.STATUS_TIMEOUT_SECONDS)
+                except FutureTimeoutError:
+                    future.cancel()
+                    logger.error(f"⏰ TIMEOUT pobierania statusu pojazdu ({self.STATUS_TIMEOUT_SECONDS}s) - Tesla API nie odpowiada")
                     return None
                 
                 if not status:
@@ -1530,6 +2158,13 @@ class CloudTeslaMonitor:
                 
                 return None
             
+            # Znacznik czasu PO zakończeniu odczytu - wiek liczony od realnych danych
+            self._status_cache = status
+            self._status_cache_ts = time.monotonic()
+            # NAPRAWKA: budżet liczy tylko realne vehicle_data - status offline pochodzi z listy pojazdów
+            if status.get('online'):
+                self._vehicle_data_calls.append(self._status_cache_ts)
+
             # Logowanie prostego statusu pojazdu
             _log_simple_status(status)
                 
@@ -1539,6 +2174,27 @@ class CloudTeslaMonitor:
             logger.error(f"❌ KRYTYCZNY błąd sprawdzania statusu pojazdu: {e}")
             return None
     
+    POST_WAKE_POLL_DELAYS = (0.5, 1, 2, 3, 3.5)  # łącznie max 10 s
+
+    def _wait_until_online(self) -> bool:
+        """
+        Czeka po wybudzeniu, aż pojazd zgłosi stan online.
+
+        Zamiast stałej pauzy odpytuje lekki endpoint listy pojazdów (nie vehicle_data)
+        z rosnącymi odstępami i kończy przy pierwszym 'online'.
+
+        Returns:
+            bool: True jeśli pojazd jest online przed upływem limitu
+        """
+        for delay in self.POST_WAKE_POLL_DELAYS:
+            time.sleep(delay)
+            try:
+                if self.tesla_controller.is_online_light():
+                    return True
+            except Exception as e:
+                logger.debug(f"Lekki test online nieudany: {e}")
+        return False
+
     def _handle_condition_a(self, status: Dict[str, Any], force: bool = False) -> bool:
         """
         Obsługuje warunek A: ONLINE + is_charging_ready=true + HOME
@@ -1561,21 +2217,12 @@ class CloudTeslaMonitor:
         vehicle_vin = status.get('vin', 'Unknown')
         apply_ok = True
         
-        # Pobierz aktualny czas warszawski
-        warsaw_time = self._get_warsaw_time()
-        time_str = warsaw_time.strftime("[%H:%M]")
-        
         # Sprawdź czy to jest zmiana stanu (loguj tylko zmiany)
         last_state = self.last_vehicle_state.get(vehicle_vin, {})
-        was_ready = last_state.get('is_charging_ready', False)
-        was_home = last_state.get('location_status') == 'HOME'
-        was_online = last_state.get('online', False)
         
-
-        
-        # Loguj tylko jeśli to pierwsza detekcja tego stanu
+        # Loguj tylko jeśli to pierwsza detekcja tego stanu (gotowy, w domu, online)
         # (force = midnight/failsafe: wykonaj pełny blok niezależnie od przejścia stanu)
-        if force or not (was_ready and was_home and was_online):
+        if force or _extract_state(last_state) != (True, True, True):
             self._log_event(
                 message="Car ready for schedule",
                 battery_level=battery_level,
@@ -1603,11 +2250,11 @@ class CloudTeslaMonitor:
                         if self._schedule_apply_blocked(vehicle_vin, schedule_hash):
                             return False
 
-                        logger.info(f"{time_str} 🔄 Harmonogram RÓŻNY - rozpoczynam zarządzanie harmonogramami Tesla")
+                        tlogger.info("🔄 Harmonogram RÓŻNY - rozpoczynam zarządzanie harmonogramami Tesla")
 
                         # Zarządzaj harmonogramami Tesla
                         if self._manage_tesla_charging_schedules(api_response, vehicle_vin, vehicle_status=status):
-                            logger.info(f"{time_str} ✅ Pomyślnie zaktualizowano harmonogramy ładowania Tesla")
+                            tlogger.info("✅ Pomyślnie zaktualizowano harmonogramy ładowania Tesla")
 
                             # Hash zatwierdzany dopiero po potwierdzonym sukcesie
                             self._commit_schedule_hash(vehicle_vin, api_response)
@@ -1628,7 +2275,7 @@ class CloudTeslaMonitor:
                                 }
                             )
                         else:
-                            logger.error(f"{time_str} ❌ Błąd aktualizacji harmonogramów Tesla")
+                            tlogger.error("❌ Błąd aktualizacji harmonogramów Tesla")
                             self._record_schedule_apply_failure(vehicle_vin, schedule_hash)
                             apply_ok = False
                             self._log_event(
@@ -1643,7 +2290,7 @@ class CloudTeslaMonitor:
                                 }
                             )
                     else:
-                        logger.info(f"{time_str} 📋 Harmonogram IDENTYCZNY - nie wykonuję zmian w Tesla")
+                        tlogger.info("📋 Harmonogram IDENTYCZNY - nie wykonuję zmian w Tesla")
                         
                         # Zapisz informacje o pominięciu aktualizacji
                         self._log_event(
@@ -1671,7 +2318,7 @@ class CloudTeslaMonitor:
                         }
                     )
             except Exception as api_error:
-                logger.error(f"❌ Błąd obsługi OFF PEAK CHARGE API: {api_error}")
+                logger.error("❌ Błąd obsługi OFF PEAK CHARGE API: %s", api_error)
                 apply_ok = False
                 self._log_event(
                     message="OFF PEAK CHARGE API processing error",
@@ -1685,11 +2332,10 @@ class CloudTeslaMonitor:
                 )
         
         # NAPRAWKA: Zakończ aktywny przypadek B jeśli pojazd stał się gotowy
-        if vehicle_vin in self.active_cases:
-            case = self.active_cases[vehicle_vin]
-            warsaw_tz = pytz.timezone('Europe/Warsaw')
-            now = datetime.now(warsaw_tz)
-            time_str = now.strftime("[%H:%M]")
+        active = self.active_cases
+        case = active.get(vehicle_vin)
+        if case is not None:
+            now = self._get_warsaw_time()
             
             # Loguj zakończenie przypadku B z powodu gotowości
             self._log_event(
@@ -1698,33 +2344,34 @@ class CloudTeslaMonitor:
                 vehicle_vin=vehicle_vin,
                 extra_data={
                     'condition': 'B_terminated_by_A',
-                    'case_duration_minutes': (self._get_warsaw_time() - case.start_time).total_seconds() / 60,
+                    'case_duration_minutes': (now - case.start_time).total_seconds() / 60,
                     'termination_reason': 'charging_ready_true'
                 }
             )
             
             # Usuń przypadek z aktywnych
-            del self.active_cases[vehicle_vin]
-            self._save_monitoring_state()
-            logger.info(f"{time_str} ✅ Zakończono przypadek B - pojazd gotowy do ładowania")
+            del active[vehicle_vin]
+            self._mark_state_dirty()
+            tlogger.info("✅ Zakończono przypadek B - pojazd gotowy do ładowania")
 
         return apply_ok
 
-    def _handle_condition_b(self, status: Dict[str, Any]):
+    def _handle_condition_b(self, status: Dict[str, Any], warsaw_time: Optional[datetime] = None):
         """
         Obsługuje warunek B: ONLINE + HOME + is_charging_ready=false (pierwszy raz)
         
         Args:
             status: Status pojazdu
+            warsaw_time: Czas warszawski cyklu (opcjonalnie - unika ponownego liczenia)
         """
+        now = warsaw_time or self._get_warsaw_time()
         vehicle_vin = status.get('vin', 'Unknown')
         battery_level = status.get('battery_level', 0)
         
         # Sprawdź czy to jest zmiana stanu (loguj tylko zmiany)
         last_state = self.last_vehicle_state.get(vehicle_vin, {})
-        was_ready = last_state.get('is_charging_ready', True)  # Domyślnie True, żeby wykryć zmianę na False
-        was_home = last_state.get('location_status') == 'HOME'
-        was_online = last_state.get('online', False)
+        # Brak poprzedniego stanu = traktuj jak gotowy, żeby wykryć zmianę na False
+        was_ready = _extract_state(last_state)[0] if last_state else True
         
         # Loguj tylko jeśli to zmiana z gotowego na niegotowy
         if was_ready and not status.get('is_charging_ready', False):
@@ -1743,47 +2390,49 @@ class CloudTeslaMonitor:
             _log_simple_status(status, "niegotowy do ładowania")
         
         # Sprawdź czy już mamy aktywny przypadek dla tego pojazdu
-        if vehicle_vin not in self.active_cases:
+        active = self.active_cases
+        case = active.get(vehicle_vin)
+        if case is None:
             # Utwórz nowy przypadek monitorowania tylko jeśli nie istnieje
             case_id = f"{vehicle_vin}_{int(time.time())}"
             new_case = VehicleMonitoringCase(
                 case_id=case_id,
                 vehicle_vin=vehicle_vin,
-                start_time=self._get_warsaw_time(),
+                start_time=now,
                 state=MonitoringState.WAITING_FOR_OFFLINE,
                 last_battery_level=status.get('battery_level', 0),
-                last_check_time=self._get_warsaw_time()
+                last_check_time=now
             )
             
-            self.active_cases[vehicle_vin] = new_case
-            self._save_monitoring_state()
+            active[vehicle_vin] = new_case
+            self._mark_state_dirty()
             
-            warsaw_tz = pytz.timezone('Europe/Warsaw')
-            now = datetime.now(warsaw_tz)
-            time_str = now.strftime("[%H:%M]")
-            logger.info(f"{time_str} 🔄 Rozpoczęto monitorowanie przypadku B")
+            tlogger.info("🔄 Rozpoczęto monitorowanie przypadku B")
         else:
             # Aktualizuj istniejący przypadek
-            case = self.active_cases[vehicle_vin]
-            case.last_check_time = self._get_warsaw_time()
+            case.last_check_time = now
             case.last_battery_level = battery_level
     
-    def _process_active_cases(self, current_status: Optional[Dict[str, Any]]):
+    def _process_active_cases(self, current_status: Optional[Dict[str, Any]],
+                              warsaw_time: Optional[datetime] = None):
         """
         Przetwarza aktywne przypadki monitorowania
         
         Args:
             current_status: Aktualny status pojazdu
+            warsaw_time: Czas warszawski cyklu (opcjonalnie - unika ponownego liczenia)
         """
         if not current_status:
             return
         
         vehicle_vin = current_status.get('vin')
-        if not vehicle_vin or vehicle_vin not in self.active_cases:
+        active = self.active_cases
+        case = active.get(vehicle_vin) if vehicle_vin else None
+        if case is None:
             return
         
-        case = self.active_cases[vehicle_vin]
         is_online = current_status.get('online', False)
+        now = warsaw_time or self._get_warsaw_time()
         
         if case.state == MonitoringState.WAITING_FOR_OFFLINE:
             if not is_online:
@@ -1797,15 +2446,12 @@ class CloudTeslaMonitor:
                     vehicle_vin=vehicle_vin,
                     extra_data={
                         'condition': 'B_offline',
-                        'case_duration_minutes': (self._get_warsaw_time() - case.start_time).total_seconds() / 60
+                        'case_duration_minutes': (now - case.start_time).total_seconds() / 60
                     }
                 )
                 
                 # Wybudź pojazd
-                warsaw_tz = pytz.timezone('Europe/Warsaw')
-                now = datetime.now(warsaw_tz)
-                time_str = now.strftime("[%H:%M]")
-                logger.info(f"{time_str} 🔄 Budzenie pojazdu {vehicle_vin[-4:]}")
+                tlogger.info("🔄 Budzenie pojazdu %s", vehicle_vin[-4:])
                 wake_success = self.tesla_controller.wake_up_vehicle(use_proxy=False)  # Przypadek B - bez proxy
                 
                 # Log: "Car was awaken"
@@ -1820,8 +2466,8 @@ class CloudTeslaMonitor:
                 
                 # Sprawdź status po wybudzeniu
                 if wake_success:
-                    time.sleep(3)  # Krótka pauza po wybudzeniu
-                    new_status = self._check_vehicle_status()
+                    self._wait_until_online()  # Krótka pauza po wybudzeniu (z wczesnym wyjściem)
+                    new_status = self._check_vehicle_status(force=True)
                     if new_status:
                         # Użyj prostego logowania statusu po wybudzeniu
                         _log_simple_status(new_status, "po wybudzeniu")
@@ -1832,20 +2478,32 @@ class CloudTeslaMonitor:
                         location_after_wake = new_status.get('location_status', 'UNKNOWN')
                         
                         if is_online_after_wake and is_charging_ready_after_wake and location_after_wake == 'HOME':
-                            logger.info(f"{time_str} ✅ Po wybudzeniu: pojazd spełnia warunek A - wywołuję OFF PEAK CHARGE API")
+                            tlogger.info("✅ Po wybudzeniu: pojazd spełnia warunek A - wywołuję OFF PEAK CHARGE API")
                             try:
                                 self._handle_condition_a(new_status)
                             except Exception as api_ex:
-                                logger.error(f"❌ Błąd wywołania warunku A po wybudzeniu: {api_ex}")
+                                logger.error("❌ Błąd wywołania warunku A po wybudzeniu: %s", api_ex)
                 
                 # Zakończ przypadek
-                del self.active_cases[vehicle_vin]
-                self._save_monitoring_state()
-                logger.info(f"{time_str} ✅ Zakończono monitorowanie przypadku B")
+                active.pop(vehicle_vin, None)
+                self._mark_state_dirty()
+                tlogger.info("✅ Zakończono monitorowanie przypadku B")
             else:
                 # Pojazd nadal ONLINE - aktualizuj timestamp
-                case.last_check_time = self._get_warsaw_time()
-                case.last_battery_level = current_status.get('battery_level', case.last_battery_level)
+                battery_level = current_status.get('battery_level', case.last_battery_level)
+                case.last_check_time = now
+                
+                # OPTYMALIZACJA: adaptacyjny backoff - stabilny stan (bez zmiany baterii)
+                # wydłuża odstęp do następnego odpytania, każda zmiana go zeruje
+                if battery_level == case.last_battery_level:
+                    case.consecutive_no_change += 1
+                else:
+                    case.consecutive_no_change = 0
+                case.last_battery_level = battery_level
+                backoff = min(ENV.case_b_backoff_base * 2 ** min(case.consecutive_no_change, 6),
+                              ENV.case_b_backoff_max)
+                case.next_poll_at = now + timedelta(seconds=backoff)
+                self._mark_state_dirty()
     
     def run_monitoring_cycle(self) -> str:
         """
@@ -1857,115 +2515,205 @@ class CloudTeslaMonitor:
                  'failed' — cykl nieudany (endpoint HTTP powinien zwrócić 500,
                             żeby retry Cloud Schedulera zadziałał)
         """
+        self._ensure_initialized()
+        # Bez _reap_idle_proxy() przed cyklem: cykle są co 15-60 min, więc TTL zawsze
+        # by minął i cykl zatrzymywałby proxy tuż przed własnym _acquire_proxy().
+        # Bezczynny proxy zatrzymuje pętla continuous i health check workera.
         if not self._acquire_cycle_lock():
             return 'busy'
         try:
+            # Pod lockiem stan w GCS jest aktualny - doładuj go, jeśli zapisała go inna instancja
+            self._refresh_monitoring_state()
             return self._run_monitoring_cycle_locked()
         finally:
+            # Proxy zajęty przez cykl zostaje ciepły na PROXY_IDLE_TTL_SECONDS
+            if self._cycle_holds_proxy:
+                self._cycle_holds_proxy = False
+                self._release_proxy()
+            # Zapis stanu PRZED zwolnieniem locka - następny cykl widzi aktualny stan
+            self._persist_state_if_dirty(force=True)
             self._release_cycle_lock()
+            self._flush_log_buffer()
+
+    SLEEP_RESPECT_MIN_SECONDS = 3 * 3600  # jak długo pojazd musi stabilnie spać
+
+    def _should_let_vehicle_sleep(self, status: Dict[str, Any], now: datetime) -> bool:
+        """
+        Sprawdza czy pominąć wybudzenie pojazdu offline (TESLA_SLEEP_RESPECT=true).
+
+        Pojazd śpi od ponad SLEEP_RESPECT_MIN_SECONDS bez zmiany stanu, a jest
+        noc (23:00-06:00 czasu warszawskiego) - wybudzenie tylko zużyłoby limit
+        zapytań i baterię. Plan na nowy dzień i tak zapewnia midnight wake.
+
+        Args:
+            status: Aktualny status pojazdu (offline)
+            now: Czas warszawski cyklu
+
+        Returns:
+            bool: True jeśli wybudzenie należy pominąć
+        """
+        if not ENV.sleep_respect or not (now.hour >= 23 or now.hour < 6):
+            return False
+        last_state = self.last_vehicle_state.get(status.get('vin', 'Unknown'))
+        if not last_state or _extract_state(last_state)[2]:
+            return False
+        try:
+            state_since = datetime.fromisoformat(last_state['state_since'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return (now - state_since).total_seconds() > self.SLEEP_RESPECT_MIN_SECONDS
+
+    def _case_b_poll_deferred(self, now: datetime) -> bool:
+        """
+        Sprawdza czy pominąć odczyt vehicle_data w tym cyklu (backoff przypadku B).
+
+        Wszystkie aktywne przypadki są w oknie backoffu (next_poll_at), a lekkie
+        sprawdzenie listy pojazdów potwierdza, że pojazd wciąż jest online - stan
+        przypadku B się nie zmienił, więc płatny odczyt statusu jest zbędny.
+        Przejście w OFFLINE wychodzi w lekkim sprawdzeniu i cykl idzie normalnie.
+
+        Args:
+            now: Czas warszawski cyklu
+
+        Returns:
+            bool: True jeśli cykl może pominąć odczyt statusu
+        """
+        cases = self.active_cases
+        if not cases or any(case.next_poll_at is None or now >= case.next_poll_at
+                            for case in cases.values()):
+            return False
+        try:
+            return self.tesla_controller.is_online_light()
+        except Exception as e:
+            logger.debug(f"Lekkie sprawdzenie online nieudane ({e}) - pełny odczyt statusu")
+            return False
 
     def _run_monitoring_cycle_locked(self) -> str:
         """Właściwy cykl monitorowania (wołać tylko pod lockiem)."""
         cycle_id = int(time.time())
         try:
+            # OPTYMALIZACJA: jeden odczyt czasu warszawskiego na cykl
+            now = self._get_warsaw_time()
+
+            # OPTYMALIZACJA: backoff przypadku B - pojazd wciąż online w oknie next_poll_at,
+            # cykl bez odczytu vehicle_data (i bez startu proxy)
+            if self._case_b_poll_deferred(now):
+                logger.debug("Przypadek B w oknie backoffu, pojazd online - pomijam odczyt statusu")
+                return 'ok'
+
             # NAPRAWKA: Jeśli Smart Proxy Mode i komponenty gotowe, przygotuj proxy na początku cyklu
             if self.smart_proxy_mode and self.proxy_available:
-                private_key_ready = os.getenv('TESLA_PRIVATE_KEY_READY', 'false').lower() == 'true'
-                if private_key_ready and not self.proxy_running:
-                    warsaw_time = self._get_warsaw_time()
-                    time_str = warsaw_time.strftime("[%H:%M]")
-                    logger.info(f"{time_str} 🚀 Przygotowywanie Tesla HTTP Proxy dla cyklu monitorowania...")
+                if ENV.private_key_ready:
+                    # Ciepły proxy (w TTL bezczynności) jest tylko zajmowany - bez ponownego startu
+                    proxy_warm = self.proxy_running
+                    if not proxy_warm:
+                        tlogger.info("🚀 Przygotowywanie Tesla HTTP Proxy dla cyklu monitorowania...")
                     
-                    # Próbuj uruchomić proxy
+                    # Próbuj uruchomić proxy (zwalniany w run_monitoring_cycle po cyklu)
                     try:
-                        proxy_started = self._start_proxy_on_demand()
-                        if proxy_started:
-                            logger.info(f"{time_str} ✅ Tesla HTTP Proxy gotowy dla cyklu")
-                        else:
-                            logger.warning(f"{time_str} ⚠️ Tesla HTTP Proxy nie uruchomiony - cykl będzie ograniczony")
+                        proxy_started = self._acquire_proxy()
+                        self._cycle_holds_proxy = proxy_started
+                        if proxy_started and not proxy_warm:
+                            tlogger.info("✅ Tesla HTTP Proxy gotowy dla cyklu")
+                        elif not proxy_started:
+                            tlogger.warning("⚠️ Tesla HTTP Proxy nie uruchomiony - cykl będzie ograniczony")
                     except Exception as proxy_ex:
-                        logger.warning(f"{time_str} ⚠️ Błąd uruchamiania proxy: {proxy_ex}")
+                        tlogger.warning("⚠️ Błąd uruchamiania proxy: %s", proxy_ex)
             
             # Pobierz status pojazdu (bez szczegółowych logów cyklu)
             try:
-                status = self._check_vehicle_status()
+                status = self._check_vehicle_status(ttl_s=self.STATUS_CACHE_TTL_SECONDS)
                 if not status:
-                    logger.warning(f"⚠️ Nie udało się pobrać statusu pojazdu")
+                    logger.warning("⚠️ Nie udało się pobrać statusu pojazdu")
                     return 'failed'
             except TeslaAuthenticationError as auth_ex:
-                logger.error(f"🚫 Błąd autoryzacji Tesla: {auth_ex}")
-                logger.error(f"⚠️ Możliwe wygaśnięcie tokenów - należy ponownie autoryzować aplikację")
+                logger.error("🚫 Błąd autoryzacji Tesla: %s", auth_ex)
+                logger.error("⚠️ Możliwe wygaśnięcie tokenów - należy ponownie autoryzować aplikację")
                 # Nie przerywaj aplikacji - po prostu pomiń ten cykl
                 return 'failed'
             except Exception as status_ex:
-                logger.error(f"❌ Błąd pobierania statusu: {status_ex}")
+                logger.error("❌ Błąd pobierania statusu: %s", status_ex)
                 return 'failed'
             
             is_online = status.get('online', False)
             is_charging_ready = status.get('is_charging_ready', False)
             location_status = status.get('location_status', 'UNKNOWN')
+            # Końcówka VIN do logów - wyliczona raz na cykl
+            vin_tail = status.get('vin', 'unknown')[-4:]
             
             # NOWA LOGIKA: Jeśli Worker został wywołany, a pojazd jest offline → wybudź pojazd
-            if not is_online:
-                warsaw_time = self._get_warsaw_time()
-                time_str = warsaw_time.strftime("[%H:%M]")
-                vehicle_vin = status.get('vin', 'unknown')
-                
-                logger.info(f"🔄 [WORKER] Pojazd {vehicle_vin[-4:]} jest offline - wybudzam przed cyklem")
-                logger.info(f"{time_str} 🚨 WORKER: Pojazd offline wymaga wybudzenia")
+            # (chyba że pojazd śpi stabilnie w nocy - wtedy nie wymuszamy wybudzenia)
+            if not is_online and self._should_let_vehicle_sleep(status, now):
+                tlogger.info("😴 Pojazd %s śpi stabilnie w oknie nocnym - pomijam wybudzenie", vin_tail)
+            elif not is_online:
+                logger.info("🔄 [WORKER] Pojazd %s jest offline - wybudzam przed cyklem", vin_tail)
+                tlogger.info("🚨 WORKER: Pojazd offline wymaga wybudzenia")
                 
                 try:
                     # Sprawdź czy pojazd został wybrany
                     if not self.tesla_controller.current_vehicle:
-                        logger.info(f"{time_str} 🔗 Łączenie z Tesla API dla wybudzenia...")
+                        tlogger.info("🔗 Łączenie z Tesla API dla wybudzenia...")
                         tesla_connected = self.tesla_controller.connect()
                         if not tesla_connected:
-                            logger.error(f"{time_str} ❌ Nie można połączyć się z Tesla API")
-                            logger.warning(f"{time_str} ⚠️ Kontynuuję cykl bez wybudzenia pojazdu")
+                            tlogger.error("❌ Nie można połączyć się z Tesla API")
+                            tlogger.warning("⚠️ Kontynuuję cykl bez wybudzenia pojazdu")
                         elif not self.tesla_controller.current_vehicle:
-                            logger.error(f"{time_str} ❌ Nie wybrano żadnego pojazdu po połączeniu")
-                            logger.warning(f"{time_str} ⚠️ Kontynuuję cykl bez wybudzenia pojazdu")
+                            tlogger.error("❌ Nie wybrano żadnego pojazdu po połączeniu")
+                            tlogger.warning("⚠️ Kontynuuję cykl bez wybudzenia pojazdu")
                         else:
                             selected_vin = self.tesla_controller.current_vehicle.get('vin', 'unknown')
-                            logger.info(f"{time_str} ✅ Wybrany pojazd do wybudzenia: {selected_vin[-4:]}")
+                            selected_tail = selected_vin[-4:]
+                            tlogger.info("✅ Wybrany pojazd do wybudzenia: %s", selected_tail)
                     
                     # Wybudź pojazd (bez proxy - Fleet API)
                     if self.tesla_controller.current_vehicle:
                         selected_vin = self.tesla_controller.current_vehicle.get('vin', 'unknown')
-                        logger.info(f"🔄 [WORKER] Budzenie pojazdu {selected_vin[-4:]} przez Fleet API...")
+                        selected_tail = selected_vin[-4:]
+                        logger.info("🔄 [WORKER] Budzenie pojazdu %s przez Fleet API...", selected_tail)
                         wake_success = self.tesla_controller.wake_up_vehicle(use_proxy=False)
                         
                         if wake_success:
-                            logger.info(f"✅ [WORKER] Pojazd {selected_vin[-4:]} wybudzony pomyślnie")
-                            logger.info(f"{time_str} ⏳ Oczekiwanie 5 sekund na pełne wybudzenie pojazdu...")
-                            time.sleep(5)  # Pauza po wybudzeniu
+                            logger.info("✅ [WORKER] Pojazd %s wybudzony pomyślnie", selected_tail)
+                            tlogger.info("⏳ Oczekiwanie na pełne wybudzenie pojazdu...")
+                            self._wait_until_online()  # Pauza po wybudzeniu (z wczesnym wyjściem)
                             
                             # Pobierz nowy status po wybudzeniu
-                            logger.info(f"{time_str} 🔄 Sprawdzanie statusu pojazdu po wybudzeniu...")
-                            new_status = self._check_vehicle_status()
+                            tlogger.info("🔄 Sprawdzanie statusu pojazdu po wybudzeniu...")
+                            new_status = self._check_vehicle_status(force=True)
                             if new_status:
                                 status = new_status  # Użyj nowego statusu
                                 is_online = status.get('online', False)
                                 is_charging_ready = status.get('is_charging_ready', False)
                                 location_status = status.get('location_status', 'UNKNOWN')
-                                logger.info(f"{time_str} 📊 Status po wybudzeniu: online={is_online}, charging_ready={is_charging_ready}, location={location_status}")
+                                tlogger.info("📊 Status po wybudzeniu: online=%s, charging_ready=%s, location=%s", is_online, is_charging_ready, location_status)
                             else:
-                                logger.warning(f"{time_str} ⚠️ Nie udało się pobrać statusu po wybudzeniu")
+                                tlogger.warning("⚠️ Nie udało się pobrać statusu po wybudzeniu")
                         else:
-                            logger.error(f"❌ [WORKER] Nie udało się wybudzić pojazdu {selected_vin[-4:]}")
-                            logger.warning(f"{time_str} ⚠️ Kontynuuję cykl mimo niepowodzenia wybudzenia")
+                            logger.error("❌ [WORKER] Nie udało się wybudzić pojazdu %s", selected_tail)
+                            tlogger.warning("⚠️ Kontynuuję cykl mimo niepowodzenia wybudzenia")
                         
                 except Exception as wake_ex:
-                    logger.error(f"❌ [WORKER] Błąd wybudzania pojazdu: {wake_ex}")
-                    logger.warning(f"{time_str} ⚠️ Kontynuuję cykl mimo błędu wybudzenia")
+                    logger.error("❌ [WORKER] Błąd wybudzania pojazdu: %s", wake_ex)
+                    tlogger.warning("⚠️ Kontynuuję cykl mimo błędu wybudzenia")
                 
-                logger.info(f"{time_str} 🚀 Kontynuuję cykl monitorowania po próbie wybudzenia...")
+                tlogger.info("🚀 Kontynuuję cykl monitorowania po próbie wybudzenia...")
+                # Wybudzenie mogło trwać do kilku minut - odśwież czas cyklu
+                now = self._get_warsaw_time()
+            
+            cycle_time = now
+            # Klucz stanu do szybkiej detekcji zmian (pełna lokalizacja, nie tylko HOME;
+            # liczony po ewentualnym wybudzeniu, które aktualizuje status)
+            state_key = (is_online, is_charging_ready, location_status)
+            vehicle_vin = status.get('vin', 'Unknown')
+            prev_state = self.last_vehicle_state.get(vehicle_vin)
+            # Po round-tripie JSON klucz stanu wraca jako lista
+            state_unchanged = prev_state is not None and tuple(prev_state.get('state_key') or ()) == state_key
             
             # Przetwórz aktywne przypadki (bez szczegółowych logów)
             try:
-                self._process_active_cases(status)
+                self._process_active_cases(status, cycle_time)
             except Exception as cases_ex:
-                logger.error(f"❌ Błąd przetwarzania przypadków: {cases_ex}")
+                logger.error("❌ Błąd przetwarzania przypadków: %s", cases_ex)
                 # Kontynuuj mimo błędu
             
             # Sprawdź warunki główne (bez szczegółowych logów)
@@ -1976,18 +2724,21 @@ class CloudTeslaMonitor:
                     try:
                         condition_a_ok = self._handle_condition_a(status)
                     except Exception as cond_a_ex:
-                        logger.error(f"❌ Błąd obsługi warunku A: {cond_a_ex}")
+                        logger.error("❌ Błąd obsługi warunku A: %s", cond_a_ex)
                         condition_a_ok = False
                 else:
                     # Warunek B: ONLINE + HOME + is_charging_ready=false
                     try:
-                        self._handle_condition_b(status)
+                        self._handle_condition_b(status, cycle_time)
                     except Exception as cond_b_ex:
-                        logger.error(f"❌ Błąd obsługi warunku B: {cond_b_ex}")
+                        logger.error("❌ Błąd obsługi warunku B: %s", cond_b_ex)
+            elif state_unchanged:
+                # OPTYMALIZACJA: stan bez zmian (zdecydowana większość cykli) -
+                # pomiń porównania pól i budowanie komunikatów zmian
+                pass
             else:
                 # Inne przypadki - loguj tylko jeśli zmienił się stan
-                vehicle_vin = status.get('vin', 'Unknown')
-                last_state = self.last_vehicle_state.get(vehicle_vin, {})
+                last_state = prev_state or {}
                 last_online = last_state.get('online', False)
                 last_location = last_state.get('location_status', 'UNKNOWN')
                 last_ready = last_state.get('is_charging_ready', False)
@@ -2026,10 +2777,7 @@ class CloudTeslaMonitor:
                 if state_changed:
                     # Loguj znaczące zmiany stanu z prostym formatem
                     change_description = ", ".join(change_messages)
-                    warsaw_tz = pytz.timezone('Europe/Warsaw')
-                    now = datetime.now(warsaw_tz)
-                    time_str = now.strftime("[%H:%M]")
-                    logger.info(f"{time_str} 📍 ZMIANA: {change_description}")
+                    tlogger.info("📍 ZMIANA: %s", change_description)
                     
                     # Loguj do bucket tylko znaczące zmiany
                     if (last_location == 'HOME' and location_status not in ['HOME', 'UNKNOWN', 'UNAVAILABLE']):
@@ -2077,23 +2825,41 @@ class CloudTeslaMonitor:
             # Przy nieudanej próbie zastosowania harmonogramu stan celowo NIE jest
             # zapisywany — następny tick zobaczy ponownie "zmianę" i ponowi próbę
             # (ograniczone przez retry-budget w _schedule_apply_blocked).
-            vehicle_vin = status.get('vin', 'Unknown')
-            if condition_a_ok:
+            battery_level = status.get('battery_level', 0)
+            if condition_a_ok and state_unchanged and prev_state.get('battery_level') == battery_level:
+                # OPTYMALIZACJA: nic się nie zmieniło - bez przebudowy słownika i isoformat
+                # ('last_update' pojazdu = czas ostatniej zmiany). Stan oznaczamy do zapisu
+                # tylko co STATE_REFRESH_MAX_AGE_SECONDS - inaczej 'last_update' w GCS
+                # przekroczyłby TTL 24h i po restarcie stan zostałby odrzucony
+                if time.monotonic() - self._last_saved_at >= self.STATE_REFRESH_MAX_AGE_SECONDS:
+                    self._mark_state_dirty()
+            elif condition_a_ok:
+                state_tuple = (is_charging_ready, location_status == 'HOME', is_online)
+                last_update = cycle_time.isoformat()
+                # state_since: od kiedy krotka stanu się nie zmienia (dla _should_let_vehicle_sleep)
+                if prev_state and prev_state.get('state_since') and _extract_state(prev_state) == state_tuple:
+                    state_since = prev_state['state_since']
+                else:
+                    state_since = last_update
                 self.last_vehicle_state[vehicle_vin] = {
                     'online': is_online,
                     'is_charging_ready': is_charging_ready,
                     'location_status': location_status,
-                    'battery_level': status.get('battery_level', 0),
-                    'last_update': self._get_warsaw_time().isoformat()
+                    'battery_level': battery_level,
+                    'last_update': last_update,
+                    'state_since': state_since,
+                    'state_key': state_key,
+                    # Krotka stanu wyliczona raz - następny tick nie musi jej odtwarzać
+                    '_state_tuple': state_tuple
                 }
-                self._save_monitoring_state()
+                self._mark_state_dirty()
             else:
-                logger.warning(f"⚠️ Stan pojazdu {vehicle_vin[-4:]} NIE zapisany (nieudana aplikacja harmonogramu) — retry przy następnym cyklu")
+                logger.warning("⚠️ Stan pojazdu %s NIE zapisany (nieudana aplikacja harmonogramu) — retry przy następnym cyklu", vin_tail)
 
             return 'ok' if condition_a_ok else 'failed'
 
         except Exception as e:
-            logger.error(f"❌ KRYTYCZNY błąd w cyklu monitorowania: {e}")
+            logger.error("❌ KRYTYCZNY błąd w cyklu monitorowania: %s", e)
             # Nie przerywaj aplikacji - loguj i zwróć porażkę (endpoint odda 500 → retry schedulera)
             return 'failed'
     
@@ -2101,50 +2867,52 @@ class CloudTeslaMonitor:
         """Wykonuje jednorazowe wybudzenie pojazdu o godzinie 0:00 czasu warszawskiego i sprawdza stan"""
         # Ten sam lease-lock co zwykły cykl — midnight nie może nakładać się
         # z triggerem Scout ani retry schedulera
+        self._ensure_initialized()
         if not self._acquire_cycle_lock():
             logger.info("🔒 Midnight wake pominięty — inny cykl w toku")
             return
         try:
             self._run_midnight_wake_check_locked()
         finally:
+            self._persist_state_if_dirty(force=True)
             self._release_cycle_lock()
+            self._flush_log_buffer()
 
     def _run_midnight_wake_check_locked(self):
         try:
-            warsaw_time = self._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
-            logger.info(f"{time_str} 🌙 Nocne wybudzenie pojazdu")
+            tlogger.info("🌙 Nocne wybudzenie pojazdu")
             
             # NAPRAWKA: Połączenie z Tesla API przed nocnym wybudzeniem
-            logger.info(f"{time_str} 🔗 Łączenie z Tesla API przed nocnym wybudzeniem...")
+            tlogger.info("🔗 Łączenie z Tesla API przed nocnym wybudzeniem...")
             tesla_connected = self.tesla_controller.connect()
             if not tesla_connected:
-                logger.error(f"{time_str} ❌ Nie można połączyć się z Tesla API")
-                logger.error(f"{time_str} ❌ Nocne wybudzenie przerwane - brak połączenia z Tesla")
+                tlogger.error("❌ Nie można połączyć się z Tesla API")
+                tlogger.error("❌ Nocne wybudzenie przerwane - brak połączenia z Tesla")
                 return
             
             # Sprawdź czy pojazd został wybrany
             if not self.tesla_controller.current_vehicle:
-                logger.error(f"{time_str} ❌ Nie wybrano żadnego pojazdu po połączeniu")
-                logger.error(f"{time_str} ❌ Nocne wybudzenie przerwane - brak wybranego pojazdu")
+                tlogger.error("❌ Nie wybrano żadnego pojazdu po połączeniu")
+                tlogger.error("❌ Nocne wybudzenie przerwane - brak wybranego pojazdu")
                 return
                 
             selected_vin = self.tesla_controller.current_vehicle.get('vin', 'unknown')
-            logger.info(f"{time_str} ✅ Wybrany pojazd do wybudzenia: {selected_vin[-4:]}")
+            selected_tail = selected_vin[-4:]
+            tlogger.info(f"✅ Wybrany pojazd do wybudzenia: {selected_tail}")
             
             # SMART PROXY: Uruchom proxy on-demand dla komendy wake_up
             proxy_started = False
             if self.smart_proxy_mode and self.proxy_available:
-                logger.info(f"{time_str} 🚀 Uruchamianie Tesla HTTP Proxy on-demand dla wake_up...")
-                proxy_started = self._start_proxy_on_demand()
+                tlogger.info("🚀 Uruchamianie Tesla HTTP Proxy on-demand dla wake_up...")
+                proxy_started = self._acquire_proxy()
                 if not proxy_started:
-                    logger.warning(f"{time_str} ⚠️ Nie udało się uruchomić Tesla HTTP Proxy - próbuję wake_up bez proxy")
+                    tlogger.warning("⚠️ Nie udało się uruchomić Tesla HTTP Proxy - próbuję wake_up bez proxy")
                 else:
-                    logger.info(f"{time_str} ✅ Tesla HTTP Proxy uruchomiony dla wake_up")
+                    tlogger.info("✅ Tesla HTTP Proxy uruchomiony dla wake_up")
             
             try:
                 # Wybudź pojazd (z proxy jeśli dostępny)
-                logger.info(f"{time_str} 🔄 Budzenie pojazdu {selected_vin[-4:]} {'przez Tesla HTTP Proxy' if proxy_started else 'bezpośrednio Fleet API'}")
+                tlogger.info(f"🔄 Budzenie pojazdu {selected_tail} {'przez Tesla HTTP Proxy' if proxy_started else 'bezpośrednio Fleet API'}")
                 wake_success = self.tesla_controller.wake_up_vehicle(use_proxy=proxy_started)
                 
                 # Log wybudzenia
@@ -2160,11 +2928,11 @@ class CloudTeslaMonitor:
                 )
                 
                 if wake_success:
-                    # Poczekaj chwilę na pełne wybudzenie
-                    time.sleep(5)
+                    # Poczekaj chwilę na pełne wybudzenie (z wczesnym wyjściem)
+                    self._wait_until_online()
                     
                     # Sprawdź status po wybudzeniu
-                    status = self._check_vehicle_status()
+                    status = self._check_vehicle_status(force=True)
                     if status:
                         # Log stanu po wybudzeniu
                         self._log_event(
@@ -2193,7 +2961,7 @@ class CloudTeslaMonitor:
 
                         
                         if is_online_midnight and is_charging_ready_midnight and location_midnight == 'HOME':
-                            logger.info(f"{time_str} ✅ Po nocnym wybudzeniu: pojazd spełnia warunek A - wywołuję OFF PEAK CHARGE API (force)")
+                            tlogger.info("✅ Po nocnym wybudzeniu: pojazd spełnia warunek A - wywołuję OFF PEAK CHARGE API (force)")
                             try:
                                 # force=True: midnight to failsafe — musi wymusić świeży plan
                                 # na nowy dzień nawet przy "niezmienionym" stanie/hashu
@@ -2201,22 +2969,20 @@ class CloudTeslaMonitor:
                             except Exception as api_ex:
                                 logger.error(f"❌ Błąd wywołania warunku A po nocnym wybudzeniu: {api_ex}")
                         else:
-                            logger.info(f"{time_str} ℹ️ Po nocnym wybudzeniu: pojazd nie spełnia warunku A (online={is_online_midnight}, ready={is_charging_ready_midnight}, location={location_midnight})")
+                            tlogger.info(f"ℹ️ Po nocnym wybudzeniu: pojazd nie spełnia warunku A (online={is_online_midnight}, ready={is_charging_ready_midnight}, location={location_midnight})")
                     else:
-                        logger.warning(f"{time_str} ⚠️ Nie udało się pobrać statusu po nocnym wybudzeniu")
+                        tlogger.warning("⚠️ Nie udało się pobrać statusu po nocnym wybudzeniu")
                 else:
-                    logger.warning(f"{time_str} ⚠️ Nie udało się wybudzić pojazdu (proxy_used={proxy_started})")
+                    tlogger.warning(f"⚠️ Nie udało się wybudzić pojazdu (proxy_used={proxy_started})")
                     
             finally:
-                # SMART PROXY: Zatrzymaj proxy po zakończeniu komendy wake_up
-                if proxy_started and self.proxy_running:
-                    logger.info(f"{time_str} 🛑 Zatrzymywanie Tesla HTTP Proxy po wake_up...")
-                    self._stop_proxy()
+                # SMART PROXY: Zwolnij proxy po zakończeniu komendy wake_up
+                if proxy_started:
+                    tlogger.info("🛑 Zwalnianie Tesla HTTP Proxy po wake_up...")
+                    self._release_proxy()
                 
         except Exception as e:
-            warsaw_time = self._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
-            logger.error(f"{time_str} ❌ Błąd podczas nocnego wybudzenia: {e}")
+            tlogger.error(f"❌ Błąd podczas nocnego wybudzenia: {e}")
             
             # Zatrzymaj proxy w przypadku błędu
             if hasattr(self, 'proxy_running') and self.proxy_running:
@@ -2225,41 +2991,97 @@ class CloudTeslaMonitor:
     def setup_schedule(self):
         """Konfiguruje harmonogram monitorowania"""
         # NAPRAWKA: Nie czyść harmonogramu jeśli już istnieje z tym samym interwałem
-        current_interval = self._get_monitoring_schedule_interval()
+        # Interwał z tablicy godzinowej, wydłużony gdy grozi wyczerpanie
+        # dziennego budżetu zapytań vehicle_data (okno kroczące 24h)
+        # OPTYMALIZACJA: jeden odczyt zegara warszawskiego dla interwału i logów
+        warsaw_time = self._get_warsaw_time()
+        base_interval = self._get_monitoring_schedule_interval(warsaw_time)
+        current_interval = self._budget_interval_minutes(base_interval)
         
-        # Sprawdź czy harmonogram już istnieje z właściwym interwałem
-        existing_jobs = schedule.jobs
-        if existing_jobs:
-            # Sprawdź czy mamy już zadanie z właściwym interwałem
-            for job in existing_jobs:
-                if hasattr(job, 'interval') and job.interval == current_interval * 60:  # schedule używa sekund
-                    warsaw_time = self._get_warsaw_time()
-                    logger.debug(f"Harmonogram już istnieje z interwałem {current_interval} min (czas: {warsaw_time.strftime('%H:%M:%S')})")
-                    return  # Nie zmieniaj istniejącego harmonogramu
+        # NAPRAWKA: Zadania stałe (nocne wybudzenie, kontrola interwału)
+        # rejestrowane raz - zmiana interwału podmienia tylko zadanie cyklu (tag 'cycle')
+        if not schedule.get_jobs('static'):
+            # Jednorazowe wybudzenie pojazdu o godzinie 0:00 czasu warszawskiego
+            schedule.every().day.at("00:00", "Europe/Warsaw").do(self.run_midnight_wake_check).tag('static')
+            logger.info("Harmonogram: jednorazowe wybudzenie pojazdu o godzinie 00:00 czasu warszawskiego (Europe/Warsaw)")
+            
+            # NAPRAWKA: Sprawdzaj interwał rzadziej - co 2 godziny zamiast co godzinę
+            schedule.every(2).hours.do(self.setup_schedule).tag('static')
         
-        # Wyczyść poprzednie zadania TYLKO jeśli potrzebna zmiana
-        schedule.clear()
+        # Sprawdź czy zadanie cyklu już istnieje z właściwym interwałem
+        # (job.interval to liczba jednostek - tu minut - a nie sekundy)
+        for job in schedule.get_jobs('cycle'):
+            if job.interval == current_interval:
+                logger.debug(f"Harmonogram już istnieje z interwałem {current_interval} min (czas: {warsaw_time.strftime('%H:%M:%S')})")
+                return  # Nie zmieniaj istniejącego harmonogramu
         
-        # Konfiguruj harmonogram na podstawie aktualnej godziny
-        interval = current_interval
+        # Podmień TYLKO zadanie cyklu - zadania stałe zachowują swoje terminy
+        schedule.clear('cycle')
         
-        warsaw_time = self._get_warsaw_time()
-        
-        if interval == 15:
+        schedule.every(current_interval).minutes.do(self.run_monitoring_cycle).tag('cycle')
+        if current_interval > base_interval:
+            logger.info(f"Harmonogram: sprawdzanie co {current_interval} minut (budżet vehicle_data: "
+                        f"{len(self._vehicle_data_calls)}/{ENV.vehicle_data_daily_budget} w 24h, "
+                        f"aktualnie: {warsaw_time.strftime('%H:%M:%S')})")
+        elif current_interval == 15:
             # Godziny dzienne: co 15 minut
-            schedule.every(15).minutes.do(self.run_monitoring_cycle)
             logger.info(f"Harmonogram: sprawdzanie co 15 minut (godziny dzienne 07:00-23:00 czasu warszawskiego, aktualnie: {warsaw_time.strftime('%H:%M:%S')})")
         else:
             # Godziny nocne: co 60 minut
-            schedule.every(60).minutes.do(self.run_monitoring_cycle)
             logger.info(f"Harmonogram: sprawdzanie co 60 minut (godziny nocne 23:00-07:00 czasu warszawskiego, aktualnie: {warsaw_time.strftime('%H:%M:%S')})")
-        
-        # Jednorazowe wybudzenie pojazdu o godzinie 0:00 czasu warszawskiego
-        schedule.every().day.at("00:00", "Europe/Warsaw").do(self.run_midnight_wake_check)
-        logger.info("Harmonogram: jednorazowe wybudzenie pojazdu o godzinie 00:00 czasu warszawskiego (Europe/Warsaw)")
-        
-        # NAPRAWKA: Sprawdzaj interwał rzadziej - co 2 godziny zamiast co godzinę
-        schedule.every(2).hours.do(self.setup_schedule)
+    
+    def _reconnect_delay(self, attempt: int) -> float:
+        """
+        Wylicza opóźnienie kolejnej próby połączenia z Tesla API (backoff wykładniczy z pełnym jitterem).
+
+        Losowe opóźnienie rozprasza próby wielu instancji po awarii Tesla API,
+        zamiast synchronizować je w stałym rytmie.
+
+        Args:
+            attempt: Liczba nieudanych prób od ostatniego połączenia
+
+        Returns:
+            float: Sekundy do następnej próby, z zakresu [0, min(limit, baza * 2^attempt)]
+        """
+        attempt = min(attempt, self.RECONNECT_MAX_ATTEMPT)
+        return random.uniform(0, min(self.RECONNECT_INTERVAL_SECONDS, self.RECONNECT_BASE_SECONDS * 2 ** attempt))
+
+    LOOP_MAX_SLEEP_SECONDS = 60  # maks. uśpienie pętli continuous między sprawdzeniami
+
+    def _loop_sleep_seconds(self) -> float:
+        """
+        Zwraca czas uśpienia pętli continuous do terminu najbliższego zadania schedule.
+
+        Returns:
+            float: Sekundy snu w zakresie [1, LOOP_MAX_SLEEP_SECONDS]
+        """
+        idle = schedule.idle_seconds()
+        if idle is None:
+            return self.LOOP_MAX_SLEEP_SECONDS
+        return min(self.LOOP_MAX_SLEEP_SECONDS, max(1.0, idle))
+
+    HEARTBEAT_INTERVAL_SECONDS = 3600  # odstęp heartbeatu pętli continuous
+    _next_heartbeat_at: Optional[float] = None
+
+    def _heartbeat_if_due(self):
+        """
+        Loguje heartbeat pętli continuous co HEARTBEAT_INTERVAL_SECONDS.
+
+        Termin liczony od zegara monotonicznego w samej pętli - heartbeat idzie
+        także w trybie oczekiwania, gdy zadania schedule nie są wykonywane.
+        """
+        now = time.monotonic()
+        if self._next_heartbeat_at is None:
+            self._next_heartbeat_at = now + self.HEARTBEAT_INTERVAL_SECONDS
+        elif now >= self._next_heartbeat_at:
+            self._next_heartbeat_at = now + self.HEARTBEAT_INTERVAL_SECONDS
+            self._heartbeat_log()
+
+    def _heartbeat_log(self):
+        """Loguje cogodzinny heartbeat trybu continuous"""
+        tlogger.info("💓 Monitor działa")
+        # Zdarzenia spoza cykli (np. po nieudanym zapisie) nie czekają dłużej niż godzinę
+        self._flush_log_buffer()
     
     def _start_health_server(self):
         """Uruchamia HTTP server dla health check"""
@@ -2279,32 +3101,89 @@ class CloudTeslaMonitor:
     
     def start_monitoring(self):
         """Uruchamia monitorowanie w trybie scheduler lub continuous"""
-        warsaw_time = self._get_warsaw_time()
-        time_str = warsaw_time.strftime("[%H:%M]")
+        
+        # Cloud Run przy skalowaniu do zera wysyła SIGTERM (nie KeyboardInterrupt)
+        self._install_signal_handlers()
+        self._stop_event.clear()
         
         # Sprawdź tryb działania
         continuous_mode = os.getenv('CONTINUOUS_MODE', 'false').lower() == 'true'
         
         if continuous_mode:
-            logger.info(f"{time_str} 🔄 Uruchamianie Cloud Tesla Monitor w trybie CONTINUOUS")
+            tlogger.info("🔄 Uruchamianie Cloud Tesla Monitor w trybie CONTINUOUS")
             self._start_continuous_monitoring()
         else:
-            logger.info(f"{time_str} 📅 Uruchamianie Cloud Tesla Monitor w trybie SCHEDULER (optymalizacja kosztów)")
+            tlogger.info("📅 Uruchamianie Cloud Tesla Monitor w trybie SCHEDULER (optymalizacja kosztów)")
             self._start_scheduler_monitoring()
     
+    def _install_signal_handlers(self):
+        """Rejestruje obsługę SIGTERM/SIGINT - zapis stanu i zatrzymanie proxy przed wyjściem"""
+        # signal.signal działa tylko w głównym wątku (np. nie pod serwerem WSGI)
+        if threading.current_thread() is not threading.main_thread():
+            logger.debug("Pominięto rejestrację obsługi sygnałów (wątek poboczny)")
+            return
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._handle_shutdown_signal)
+    
+    _shutdown_signal: Optional[int] = None  # sygnał zatrzymania czekający na obsługę w pętli głównej
+
+    def _handle_shutdown_signal(self, signum, frame):
+        """
+        Obsługa SIGTERM/SIGINT: tylko zgłasza zatrzymanie.
+
+        Handler przerywa dowolną ramkę wątku głównego (np. pod _log_buffer_lock
+        w _log_event), więc nie wolno tu brać locków, logować ani zatrzymywać
+        proxy. _stop_event budzi pętlę główną, która woła stop_monitoring()
+        już poza kontekstem sygnału.
+
+        Args:
+            signum: Numer odebranego sygnału
+            frame: Ramka stosu (nieużywana)
+        """
+        self._shutdown_signal = signum
+        self.is_running = False
+        self._stop_event.set()
+
+    def _finish_after_shutdown_signal(self):
+        """Zatrzymuje monitor po sygnale SIGTERM/SIGINT (wołane z pętli głównej po jej wyjściu)"""
+        signum = self._shutdown_signal
+        if signum is None:
+            return
+        self._shutdown_signal = None
+        logger.info(f"⛔ Otrzymano sygnał {signal.Signals(signum).name} - zatrzymywanie monitora")
+        self.stop_monitoring()
+
+    def _wait_while_running(self, future, timeout: float) -> bool:
+        """
+        Czeka na zakończenie future najwyżej timeout sekund, w krótkich odcinkach -
+        sygnał zatrzymania (is_running=False) przerywa oczekiwanie.
+
+        Returns:
+            bool: True gdy future zakończony (wyjątek zadania leci dalej)
+        """
+        deadline = time.monotonic() + timeout
+        while self.is_running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                future.result(timeout=min(1.0, remaining))
+                return True
+            except FutureTimeoutError:
+                continue
+        return False
+    
     def _start_scheduler_monitoring(self):
         """Uruchamia monitorowanie w trybie scheduler (optymalizacja kosztów)"""
-        warsaw_time = self._get_warsaw_time()
-        time_str = warsaw_time.strftime("[%H:%M]")
         
-        logger.info(f"{time_str} 💰 TRYB SCHEDULER: Cloud Run skaluje do zera między wywołaniami")
-        logger.info(f"{time_str} 📅 Harmonogram zarządzany przez Cloud Scheduler")
-        logger.info(f"{time_str} 🔗 Endpointy dostępne:")
-        logger.info(f"{time_str}   - GET/POST /run-cycle - cykl monitorowania")
-        logger.info(f"{time_str}   - GET/POST /run-midnight-wake - nocne wybudzenie")
-        logger.info(f"{time_str}   - GET /health - sprawdzenie stanu")
-        logger.info(f"{time_str}   - GET /reset - reset stanu")
-        logger.info(f"{time_str}   - GET /reset-tesla-schedules - reset harmonogramów Tesla")
+        tlogger.info("💰 TRYB SCHEDULER: Cloud Run skaluje do zera między wywołaniami")
+        tlogger.info("📅 Harmonogram zarządzany przez Cloud Scheduler")
+        tlogger.info("🔗 Endpointy dostępne:")
+        tlogger.info("  - GET/POST /run-cycle - cykl monitorowania")
+        tlogger.info("  - GET/POST /run-midnight-wake - nocne wybudzenie")
+        tlogger.info("  - GET /health - sprawdzenie stanu")
+        tlogger.info("  - GET /reset - reset stanu")
+        tlogger.info("  - GET /reset-tesla-schedules - reset harmonogramów Tesla")
         
         # Uruchom tylko HTTP server
         self._start_health_server()
@@ -2312,25 +3191,26 @@ class CloudTeslaMonitor:
         # Test połączenia z Tesla (bez uruchamiania harmonogramu)
         tesla_connected = self.tesla_controller.connect()
         if tesla_connected:
-            logger.info(f"{time_str} ✅ Tesla API połączone - gotowe do obsługi wywołań")
+            tlogger.info("✅ Tesla API połączone - gotowe do obsługi wywołań")
         else:
-            logger.warning(f"{time_str} ⚠️ Tesla API niedostępne - aplikacja działa w trybie oczekiwania")
+            tlogger.warning("⚠️ Tesla API niedostępne - aplikacja działa w trybie oczekiwania")
         
         self.is_running = True
         
         # Prosta pętla utrzymująca aplikację przy życiu
         try:
-            logger.info(f"{time_str} 🎯 Aplikacja gotowa do obsługi wywołań Cloud Scheduler")
+            tlogger.info("🎯 Aplikacja gotowa do obsługi wywołań Cloud Scheduler")
             
-            while self.is_running:
-                # Minimalne utrzymanie przy życiu - sprawdzaj co 5 minut
-                time.sleep(300)
-                
+            # NAPRAWKA: Event.wait zamiast sleep(300) - stop_monitoring budzi pętlę od razu,
+            # a heartbeat przy zmianie godziny nie gubi pełnej godziny (sleep 300 s mijał minutę 0)
+            last_heartbeat_hour = self._get_warsaw_time().hour
+            while self.is_running and not self._stop_event.wait(timeout=60):
                 # Heartbeat co godzinę
                 current_time = self._get_warsaw_time()
-                if current_time.minute == 0:  # Raz na godzinę
-                    time_str = current_time.strftime("[%H:%M]")
-                    logger.info(f"{time_str} 💓 Scheduler mode: Aplikacja aktywna, oczekuje na Cloud Scheduler")
+                if current_time.hour != last_heartbeat_hour:  # Raz na godzinę
+                    last_heartbeat_hour = current_time.hour
+                    tlogger.info("💓 Scheduler mode: Aplikacja aktywna, oczekuje na Cloud Scheduler")
+            self._finish_after_shutdown_signal()
                 
         except KeyboardInterrupt:
             logger.info("⛔ Otrzymano sygnał przerwania - zatrzymywanie monitora")
@@ -2342,11 +3222,9 @@ class CloudTeslaMonitor:
     
     def _start_continuous_monitoring(self):
         """Uruchamia monitorowanie w trybie continuous (poprzednia implementacja)"""
-        warsaw_time = self._get_warsaw_time()
-        time_str = warsaw_time.strftime("[%H:%M]")
         
-        logger.info(f"{time_str} 🔄 TRYB CONTINUOUS: Aplikacja działa ciągle (wyższe koszty)")
-        logger.info(f"{time_str} ⚠️ Uwaga: Ten tryb generuje stałe koszty Cloud Run")
+        tlogger.info("🔄 TRYB CONTINUOUS: Aplikacja działa ciągle (wyższe koszty)")
+        tlogger.info("⚠️ Uwaga: Ten tryb generuje stałe koszty Cloud Run")
         
         # Uruchom health check server
         self._start_health_server()
@@ -2357,123 +3235,137 @@ class CloudTeslaMonitor:
         # Test połączenia z Tesla
         tesla_connected = self.tesla_controller.connect()
         if not tesla_connected:
-            logger.error(f"{time_str} ❌ Nie udało się połączyć z Tesla API")
-            logger.info(f"{time_str} ⚠️ Aplikacja będzie działać w trybie oczekiwania")
+            tlogger.error("❌ Nie udało się połączyć z Tesla API")
+            tlogger.info("⚠️ Aplikacja będzie działać w trybie oczekiwania")
             # Nie kończymy aplikacji - niech działa jako serwer
         
         self.is_running = True
         if tesla_connected:
-            logger.info(f"{time_str} ✅ Monitoring uruchomiony z połączeniem Tesla")
+            tlogger.info("✅ Monitoring uruchomiony z połączeniem Tesla")
             # Wykonaj pierwszy cykl monitorowania tylko jeśli Tesla jest połączona
             self.run_monitoring_cycle()
         else:
-            logger.info(f"{time_str} ⚠️ Monitoring uruchomiony w trybie oczekiwania")
+            tlogger.info("⚠️ Monitoring uruchomiony w trybie oczekiwania")
         
         # Główna pętla monitorowania
-        loop_iteration = 0
+        # OPTYMALIZACJA: heartbeat (_heartbeat_if_due) i próba ponownego połączenia
+        # liczone od zegara monotonicznego - bez licznika iteracji
+        reconnect_attempt = 0
+        next_reconnect_at = time.monotonic() + self._reconnect_delay(reconnect_attempt)
         try:
             while self.is_running:
-                loop_iteration += 1
-                warsaw_time = self._get_warsaw_time()
-                
-                # Uproszczony heartbeat - tylko co 60 minut
-                if loop_iteration % 60 == 0:  # Co 60 iteracji (60 minut)
-                    time_str = warsaw_time.strftime("[%H:%M]")
-                    logger.info(f"{time_str} 💓 Monitor działa")
                 
                 # Sprawdź i wykonaj zaplanowane zadania (tylko jeśli Tesla jest połączona)
                 if tesla_connected:
                     try:
-                        # Wykonaj zadania z timeout'em przy użyciu threading
-                        import threading
-                        import signal
-                        
-                        schedule_finished = threading.Event()
-                        schedule_error = None
-                        
-                        def run_schedule_with_timeout():
-                            nonlocal schedule_error
-                            try:
-                                schedule.run_pending()
-                            except Exception as e:
-                                schedule_error = e
-                            finally:
-                                schedule_finished.set()
-                        
-                        # Uruchom schedule w osobnym wątku
-                        schedule_thread = threading.Thread(target=run_schedule_with_timeout, daemon=True)
-                        schedule_thread.start()
-                        
-                        # Czekaj maksymalnie 5 minut na zakończenie zadań
-                        if schedule_finished.wait(timeout=300):  # 5 minut timeout
-                            if schedule_error:
-                                raise schedule_error
+                        # Wykonaj zadania z timeout'em
+                        # OPTYMALIZACJA: stały wątek puli zamiast nowego wątku + Event co minutę
+                        pending = self._pending_schedule_run
+                        if pending is not None and not pending.done():
+                            # Poprzednie zadania wciąż trwają - nie uruchamiaj równolegle drugiej partii
+                            tlogger.warning("⏰ Zadania harmonogramu nadal w toku - pomijam uruchomienie")
                         else:
-                            time_str = warsaw_time.strftime("[%H:%M]")
-                            logger.error(f"{time_str} ⏰ TIMEOUT harmonogramu - zadanie trwa ponad 5 minut!")
+                            self._pending_schedule_run = None
+                            future = self._schedule_executor.submit(schedule.run_pending)
+                            # Czekaj maksymalnie 5 minut na zakończenie zadań (wyjątek zadania leci dalej);
+                            # sygnał zatrzymania przerywa oczekiwanie
+                            if not self._wait_while_running(future, self.SCHEDULE_RUN_TIMEOUT_SECONDS):
+                                self._pending_schedule_run = future
+                                if self.is_running:
+                                    tlogger.error("⏰ TIMEOUT harmonogramu - zadanie trwa ponad 5 minut!")
                             
                     except Exception as schedule_error:
-                        time_str = warsaw_time.strftime("[%H:%M]")
-                        logger.error(f"{time_str} ❌ Błąd w harmonogramie: {schedule_error}")
+                        tlogger.error(f"❌ Błąd w harmonogramie: {schedule_error}")
                         
                         # NAPRAWKA: W przypadku błędu, sprawdź czy to nie problem z tokenami Tesla
                         if "401" in str(schedule_error) or "unauthorized" in str(schedule_error).lower():
-                            logger.error(f"{time_str} 🚫 Błąd autoryzacji Tesla - możliwe wygaśnięcie tokenów")
+                            tlogger.error("🚫 Błąd autoryzacji Tesla - możliwe wygaśnięcie tokenów")
                             tesla_connected = False  # Przejdź w tryb oczekiwania
+                            reconnect_attempt = 0
+                            next_reconnect_at = time.monotonic() + self._reconnect_delay(reconnect_attempt)
                         
                         # Nie przerywaj pętli - loguj i kontynuuj
                 else:
                     # W trybie oczekiwania - sprawdź co jakiś czas czy można się połączyć
-                    if loop_iteration % 60 == 0:  # Co godzinę próbuj połączyć się z Tesla
-                        time_str = warsaw_time.strftime("[%H:%M]")
-                        logger.info(f"{time_str} 🔄 Próba ponownego połączenia z Tesla API...")
+                    # NAPRAWKA: backoff wykładniczy z jitterem zamiast stałej próby co godzinę
+                    if time.monotonic() >= next_reconnect_at:
+                        tlogger.info("🔄 Próba ponownego połączenia z Tesla API...")
                         if self.tesla_controller.connect():
                             tesla_connected = True
-                            logger.info(f"{time_str} ✅ Pomyślnie połączono z Tesla API")
+                            reconnect_attempt = 0
+                            tlogger.info("✅ Pomyślnie połączono z Tesla API")
                             self.setup_schedule()  # Ustaw harmonogram
                         else:
-                            logger.info(f"{time_str} ❌ Nadal brak połączenia z Tesla API")
+                            reconnect_attempt = min(reconnect_attempt + 1, self.RECONNECT_MAX_ATTEMPT)
+                            delay = self._reconnect_delay(reconnect_attempt)
+                            next_reconnect_at = time.monotonic() + delay
+                            tlogger.info(f"❌ Nadal brak połączenia z Tesla API - kolejna próba za {delay / 60:.1f} min")
                 
-                time.sleep(60)  # Sprawdzaj co minutę czy są zadania do wykonania
+                # Zbiorczy zapis stanu (debounce) - najwyżej co STATE_PERSIST_MIN_INTERVAL_SECONDS
+                self._persist_state_if_dirty()
+                self._reap_idle_proxy()
+                self._heartbeat_if_due()
+                
+                # OPTYMALIZACJA: śpij do terminu najbliższego zadania (najwyżej minutę -
+                # zbiorczy zapis stanu, reaper proxy i heartbeat też potrzebują taktu);
+                # stop_monitoring przerywa oczekiwanie natychmiast.
+                # W trybie oczekiwania zadania nie są wykonywane (zaległe dawałyby idle <= 0,
+                # czyli takt 1 s) - śpij do próby połączenia, z tym samym limitem minuty
+                if tesla_connected:
+                    wait_seconds = self._loop_sleep_seconds()
+                else:
+                    wait_seconds = min(self.LOOP_MAX_SLEEP_SECONDS,
+                                       max(1.0, next_reconnect_at - time.monotonic()))
+                if self._stop_event.wait(timeout=wait_seconds):
+                    break
+            self._finish_after_shutdown_signal()
                 
         except KeyboardInterrupt:
             logger.info("⛔ Otrzymano sygnał przerwania - zatrzymywanie monitora")
             self.stop_monitoring()
         except Exception as e:
-            logger.error(f"💥 KRYTYCZNY BŁĄD w pętli monitorowania (iteracja #{loop_iteration}): {e}")
-            logger.error(f"💥 Typ błędu: {type(e).__name__}")
-            import traceback
-            logger.error(f"💥 Stack trace: {traceback.format_exc()}")
+            # OPTYMALIZACJA: stack trace przez exc_info - formatowany przez handler, nie zawczasu
+            logger.error("💥 KRYTYCZNY BŁĄD w pętli monitorowania: %s (%s)", e, type(e).__name__, exc_info=True)
             self.stop_monitoring()
             raise  # Re-raise żeby Cloud Run widział crash
     
     def stop_monitoring(self):
         """Zatrzymuje monitorowanie"""
-        import traceback
         warsaw_time = self._get_warsaw_time()
         logger.info(f"🛑 === ZATRZYMYWANIE CLOUD TESLA MONITOR === (czas: {warsaw_time.strftime('%H:%M:%S')})")
         
         # Loguj stan przed zatrzymaniem
-        try:
-            import psutil
-            process = psutil.Process()
-            memory = process.memory_info()
-            logger.info(f"🔍 Stan przed zatrzymaniem: pamięć={memory.rss / 1024 / 1024:.1f}MB, wątki={process.num_threads()}")
-        except Exception as e:
-            logger.warning(f"🔍 Nie można pobrać informacji o procesie: {e}")
+        if PSUTIL_AVAILABLE:
+            try:
+                process = psutil.Process()
+                memory = process.memory_info()
+                logger.info(f"🔍 Stan przed zatrzymaniem: pamięć={memory.rss / 1024 / 1024:.1f}MB, wątki={process.num_threads()}")
+            except Exception as e:
+                logger.warning(f"🔍 Nie można pobrać informacji o procesie: {e}")
+        else:
+            logger.warning("🔍 psutil niedostępny - pomijam informacje o procesie")
         
-        # Loguj stack trace aby zobaczyć skąd wywołano stop_monitoring
-        logger.info(f"🔍 Stop monitoring wywołane z:")
-        for line in traceback.format_stack():
-            logger.info(f"🔍   {line.strip()}")
+        # Stack trace (skąd wywołano stop_monitoring) tylko w DEBUG - jeden rekord
+        # zamiast linii per ramka, bo każdy log to synchroniczny zapis w ścieżce zamykania
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Stop monitoring wywołane z:\n%s", ''.join(traceback.format_stack()))
         
         self.is_running = False
+        self._stop_event.set()
         logger.info("🔴 is_running ustawione na False")
         
-        # SMART PROXY: Zatrzymaj proxy jeśli działa
-        if hasattr(self, 'proxy_running') and self.proxy_running:
+        # Cykl z wątku HTTP może właśnie wysyłać komendę przez proxy - daj mu chwilę
+        # na zwolnienie proxy zamiast zatrzymywać je w trakcie komendy
+        proxy_wait_deadline = time.monotonic() + self.PROXY_SHUTDOWN_WAIT_SECONDS
+        while self._proxy_refcount > 0 and time.monotonic() < proxy_wait_deadline:
+            time.sleep(0.1)
+        
+        # SMART PROXY: Zatrzymaj proxy zawsze - także proces, który nie zdążył
+        # zgłosić gotowości (proxy_running=False), oraz usuń certyfikaty TLS
+        if getattr(self, 'proxy_running', False):
             logger.info("🛑 Zatrzymywanie Tesla HTTP Proxy...")
-            self._stop_proxy()
+        self._stop_proxy()
+        self._remove_proxy_certs()
         
         # Zatrzymaj HTTP server
         if self.http_server:
@@ -2484,11 +3376,29 @@ class CloudTeslaMonitor:
                 logger.error(f"❌ Błąd zatrzymywania health check server: {e}")
         
         # Zapisz stan przed zakończeniem
-        try:
-            self._save_monitoring_state()
+        # OPTYMALIZACJA: stan jest zapisywany na bieżąco (debounce w pętli i na końcu cyklu),
+        # tu tylko zaległe zmiany - w wątku z limitem czasu, żeby wolny zapis do GCS
+        # nie blokował zamykania aż do SIGKILL
+        flush_thread = threading.Thread(target=self._persist_state_if_dirty, kwargs={'force': True},
+                                        name='state-flush', daemon=True)
+        flush_thread.start()
+        flush_thread.join(timeout=self.STATE_SHUTDOWN_FLUSH_TIMEOUT_SECONDS)
+        if flush_thread.is_alive():
+            logger.warning("⚠️ Zapis stanu trwa ponad %ss - kontynuuję zamykanie", self.STATE_SHUTDOWN_FLUSH_TIMEOUT_SECONDS)
+        else:
             logger.info("✅ Stan monitorowania zapisany")
-        except Exception as e:
-            logger.error(f"❌ Błąd zapisywania stanu: {e}")
+        
+        # Zrzuć zbuforowane zdarzenia do Firestore
+        self._flush_log_buffer()
+        
+        # Zamknij sesję HTTP OFF PEAK CHARGE API
+        self._close_http_session()
+        
+        # Zamknij pule wątków statusu i harmonogramu (bez czekania na zawieszone wywołania)
+        for executor_name in ('_status_executor', '_schedule_executor'):
+            executor = self.__dict__.pop(executor_name, None)
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
         
         logger.info("🏁 === MONITORING ZATRZYMANY ===")
     
@@ -2520,7 +3430,7 @@ class CloudTeslaMonitor:
             schedule_data: Dane harmonogramu z API OFF PEAK CHARGE
             
         Returns:
-            str: Hash MD5 harmonogramu
+            str: Hash BLAKE2b (128 bit, hex) harmonogramu
         """
         try:
             # Wyciągnij tylko istotne dane do porównania (bez timestamp, requestId itp.)
@@ -2529,18 +3439,28 @@ class CloudTeslaMonitor:
             # Posortuj harmonogram według czasu rozpoczęcia dla konsystencji
             sorted_schedule = sorted(charging_schedule, key=lambda x: x.get('start_time', ''))
             
+            # OPTYMALIZACJA: tani odcisk (krotka start/end/amount) - ten sam plan
+            # jest hashowany w _is_schedule_different i ponownie w _commit_schedule_hash,
+            # więc przy zgodnym odcisku zwracamy zapamiętany hash bez json.dumps
+            fingerprint = tuple(
+                (slot.get('start_time'), slot.get('end_time'), slot.get('charge_amount'))
+                for slot in sorted_schedule
+            )
+            cached_fp, cached_hash = self._schedule_hash_memo
+            if cached_hash and fingerprint == cached_fp:
+                return cached_hash
+            
             # Utwórz hash na podstawie dat i czasów ładowania
-            hash_data = []
-            for slot in sorted_schedule:
-                hash_data.append({
-                    'start_time': slot.get('start_time'),
-                    'end_time': slot.get('end_time'),
-                    'charge_amount': slot.get('charge_amount')
-                })
-            
-            # Konwertuj na string i oblicz hash
-            hash_string = json.dumps(hash_data, sort_keys=True)
-            return hashlib.md5(hash_string.encode()).hexdigest()
+            # OPTYMALIZACJA: BLAKE2b (stdlib, szybszy od MD5/SHA-256) z 16-bajtowym
+            # skrótem - ta sama długość hex co MD5, więc format stanu bez zmian.
+            # Sloty podawane wprost do hashera (separatory pól/rekordów \x1f/\x1e)
+            # zamiast listy słowników i json.dumps(sort_keys=True)
+            hasher = hashlib.blake2b(digest_size=16)
+            for start, end, amount in fingerprint:
+                hasher.update(f"{start}\x1f{end}\x1f{amount}\x1e".encode())
+            schedule_hash = hasher.hexdigest()
+            self._schedule_hash_memo = (fingerprint, schedule_hash)
+            return schedule_hash
         except Exception as e:
             logger.error(f"Błąd generowania hash harmonogramu: {e}")
             return ""
@@ -2557,6 +3477,7 @@ class CloudTeslaMonitor:
             bool: True jeśli harmonogram jest różny lub to pierwsza próba
         """
         new_hash = self._generate_schedule_hash(new_schedule_data)
+        vin_tail = vehicle_vin[-4:]
         last_hash = self.last_off_peak_schedules.get(vehicle_vin, {}).get('hash', '')
 
         is_different = new_hash != last_hash
@@ -2566,9 +3487,9 @@ class CloudTeslaMonitor:
         # inaczej porażka wysyłki blokowałaby retry ("IDENTYCZNY" mimo tego,
         # że w aucie nic się nie zmieniło).
         if is_different:
-            logger.info(f"📋 Harmonogram dla {vehicle_vin[-4:]}: {'RÓŻNY' if last_hash else 'PIERWSZY'} (hash: {new_hash[:8]}...)")
+            logger.info(f"📋 Harmonogram dla {vin_tail}: {'RÓŻNY' if last_hash else 'PIERWSZY'} (hash: {new_hash[:8]}...)")
         else:
-            logger.info(f"📋 Harmonogram dla {vehicle_vin[-4:]}: IDENTYCZNY (hash: {new_hash[:8]}...)")
+            logger.info(f"📋 Harmonogram dla {vin_tail}: IDENTYCZNY (hash: {new_hash[:8]}...)")
 
         return is_different
 
@@ -2585,7 +3506,8 @@ class CloudTeslaMonitor:
         }
         logger.info(f"📋 Hash harmonogramu zatwierdzony po sukcesie dla {vehicle_vin[-4:]} (hash: {new_hash[:8]}...)")
         # Persystuj — hash musi przeżyć scale-to-zero, inaczej cold start robi pełny rewrite
-        self._save_monitoring_state()
+        # (zapis na końcu cyklu przez _persist_state_if_dirty)
+        self._mark_state_dirty()
 
     def _is_schedule_for_today(self, start_warsaw: datetime, end_warsaw: datetime) -> bool:
         """
@@ -2639,15 +3561,17 @@ class CloudTeslaMonitor:
                 home_lat = self.tesla_controller.default_latitude
                 home_lon = self.tesla_controller.default_longitude
             else:
-                # Fallback do domyślnych wartości
-                home_lat = float(os.getenv('HOME_LATITUDE', '52.334215'))
-                home_lon = float(os.getenv('HOME_LONGITUDE', '20.937516'))
+                # Fallback do domyślnych wartości (sparsowanych raz w ENV)
+                home_lat = ENV.home_latitude
+                home_lon = ENV.home_longitude
 
             # FAZA 2: tryb one_time — sloty (także jutrzejsze) wysyłane jako harmonogramy
             # jednorazowe zamiast filtrowania "tylko na dziś". Auto zawsze ma realny plan
             # nocny i nie zależy od midnight wake. Za flagą do czasu weryfikacji na aucie.
             use_one_time = os.getenv('USE_ONE_TIME_SCHEDULES', 'false').lower() == 'true'
             now_warsaw = self._get_warsaw_time()
+            # OPTYMALIZACJA: Python 3.11+ fromisoformat obsługuje sufiks 'Z' - bez replace() per slot
+            parse_iso = datetime.fromisoformat
 
             filtered_count = 0
             for i, slot in enumerate(charging_schedule):
@@ -2660,19 +3584,19 @@ class CloudTeslaMonitor:
                 
                 try:
                     # Konwertuj na czas warszawski i wyciągnij minuty od północy
-                    start_dt = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                    end_dt = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
+                    start_dt = parse_iso(start_time_str)
+                    end_dt = parse_iso(end_time_str)
                     
                     # Konwertuj na czas warszawski
-                    warsaw_tz = pytz.timezone('Europe/Warsaw')
-                    start_warsaw = start_dt.astimezone(warsaw_tz)
-                    end_warsaw = end_dt.astimezone(warsaw_tz)
+                    start_warsaw = start_dt.astimezone(_WARSAW_TZ)
+                    end_warsaw = end_dt.astimezone(_WARSAW_TZ)
 
                     # Slot całkowicie miniony nie ma sensu w żadnym trybie — z days=All
                     # wykonałby się JUTRO według DZISIEJSZYCH cen (błąd klasy L10)
                     if end_warsaw <= now_warsaw:
-                        logger.info(f"⏰ Harmonogram #{i+1}: {start_warsaw.strftime('%Y-%m-%d %H:%M')}-"
-                                   f"{end_warsaw.strftime('%Y-%m-%d %H:%M')} - POMINIĘTY (już miniony)")
+                        logger.info(_FMT_SLOT_SKIPPED, "⏰", i + 1,
+                                    start_warsaw.date(), start_warsaw.hour, start_warsaw.minute,
+                                    end_warsaw.date(), end_warsaw.hour, end_warsaw.minute, "już miniony")
                         filtered_count += 1
                         continue
 
@@ -2683,8 +3607,9 @@ class CloudTeslaMonitor:
                         pass
                     elif not self._is_schedule_for_today(start_warsaw, end_warsaw):
                         # Tryb legacy: przepuszczaj tylko harmonogramy na dzisiejszy dzień
-                        logger.info(f"🔜 Harmonogram #{i+1}: {start_warsaw.strftime('%Y-%m-%d %H:%M')}-"
-                                   f"{end_warsaw.strftime('%Y-%m-%d %H:%M')} - POMINIĘTY (nie dotyczy dzisiaj)")
+                        logger.info(_FMT_SLOT_SKIPPED, "🔜", i + 1,
+                                    start_warsaw.date(), start_warsaw.hour, start_warsaw.minute,
+                                    end_warsaw.date(), end_warsaw.hour, end_warsaw.minute, "nie dotyczy dzisiaj")
                         filtered_count += 1
                         continue
 
@@ -2712,7 +3637,7 @@ class CloudTeslaMonitor:
                         end_time=normalized_end_minutes,
                         start_enabled=True,
                         end_enabled=True,
-                        days_of_week="All",  # Wszystkie dni tygodnia
+                        days_of_week=ALL_DAYS,
                         lat=home_lat,
                         lon=home_lon,
                         one_time=use_one_time
@@ -2722,13 +3647,14 @@ class CloudTeslaMonitor:
                     
                     # Loguj konwersję z informacją o normalizacji
                     if end_minutes != normalized_end_minutes:
-                        logger.info(f"📅 Harmonogram #{i+1}: {start_warsaw.strftime('%H:%M')}-{end_warsaw.strftime('%H:%M')} "
-                                  f"({start_minutes}-{end_minutes} min → normalizacja: {normalized_end_minutes} min), "
-                                  f"{slot.get('charge_amount', 0)} kWh")
+                        logger.info(_FMT_SLOT_NORMALIZED, i + 1,
+                                    start_warsaw.hour, start_warsaw.minute, end_warsaw.hour, end_warsaw.minute,
+                                    start_minutes, end_minutes, normalized_end_minutes,
+                                    slot.get('charge_amount', 0))
                     else:
-                        logger.info(f"📅 Harmonogram #{i+1}: {start_warsaw.strftime('%H:%M')}-{end_warsaw.strftime('%H:%M')} "
-                                  f"({start_minutes}-{end_minutes} min), "
-                                  f"{slot.get('charge_amount', 0)} kWh")
+                        logger.info(_FMT_SLOT_CONVERTED, i + 1,
+                                    start_warsaw.hour, start_warsaw.minute, end_warsaw.hour, end_warsaw.minute,
+                                    start_minutes, end_minutes, slot.get('charge_amount', 0))
                 
                 except Exception as e:
                     logger.error(f"Błąd parsowania slotu #{i+1}: {e}")
@@ -2749,7 +3675,7 @@ class CloudTeslaMonitor:
                     end_time=23 * 60 + 59,    # 23:59 = 1439 (w zakresie 0-1439)
                     start_enabled=True,
                     end_enabled=True,
-                    days_of_week="All",
+                    days_of_week=ALL_DAYS,
                     lat=home_lat,
                     lon=home_lon,
                     one_time=False  # strażnik ma trwać, dopóki nie pojawi się realny plan
@@ -2774,6 +3700,7 @@ class CloudTeslaMonitor:
         1. Wykryj czy są jakiekolwiek nakładania (optymalizacja)
         2. Jeśli brak nakładań, zwróć oryginalną listę
         3. Jeśli są nakładania, usuń harmonogramy o niższym priorytecie
+           (konflikt z zaakceptowanymi szukany bisectem - O(n log n) porównań)
         4. Kolejność z API = priorytet (pierwszy = najważniejszy)
         
         Args:
@@ -2783,7 +3710,9 @@ class CloudTeslaMonitor:
         Returns:
             List[ChargeSchedule]: Lista harmonogramów bez nakładań
         """
-        if not schedules:
+        # OPTYMALIZACJA: szybka ścieżka - pojedynczy harmonogram nie ma z czym się nakładać
+        # (segmenty jednego okna przez północ są rozłączne)
+        if len(schedules) <= 1:
             return schedules
         
         # KROK 1: Szybkie wykrycie czy są jakiekolwiek nakładania
@@ -2796,14 +3725,21 @@ class CloudTeslaMonitor:
         logger.warning(f"⚠️ Wykryto nakładania w harmonogramach - rozwiązywanie konfliktów...")
         
         # KROK 2: Rozwiąż nakładania zachowując priorytety
+        # OPTYMALIZACJA: zaakceptowane segmenty są rozłączne i posortowane - konflikt
+        # sprawdzany bisectem z sąsiadami zamiast skanu wszystkich zaakceptowanych
         resolved_schedules = []
+        accepted_starts: List[int] = []
+        accepted_ends: List[int] = []
         
         for i, current_schedule in enumerate(schedules):
             # Sprawdź czy current_schedule nakłada się z już zaakceptowanymi harmonogramami
+            segments = _schedule_segments(current_schedule)
             has_conflict = False
             
-            for accepted_schedule in resolved_schedules:
-                if self._schedules_overlap(current_schedule, accepted_schedule):
+            for seg_start, seg_end in segments:
+                idx = bisect.bisect_left(accepted_starts, seg_start)
+                if ((idx > 0 and accepted_ends[idx - 1] > seg_start) or
+                        (idx < len(accepted_starts) and accepted_starts[idx] < seg_end)):
                     logger.info(f"🚫 Harmonogram #{i+1} ({self.tesla_controller.minutes_to_time(current_schedule.start_time)}-"
                               f"{self.tesla_controller.minutes_to_time(current_schedule.end_time)}) "
                               f"nakłada się z wyższym priorytetem - POMIJAM")
@@ -2811,6 +3747,10 @@ class CloudTeslaMonitor:
                     break
             
             if not has_conflict:
+                for seg_start, seg_end in segments:
+                    idx = bisect.bisect_left(accepted_starts, seg_start)
+                    accepted_starts.insert(idx, seg_start)
+                    accepted_ends.insert(idx, seg_end)
                 resolved_schedules.append(current_schedule)
                 logger.info(f"✅ Harmonogram #{i+1} ({self.tesla_controller.minutes_to_time(current_schedule.start_time)}-"
                           f"{self.tesla_controller.minutes_to_time(current_schedule.end_time)}) "
@@ -2819,7 +3759,8 @@ class CloudTeslaMonitor:
         logger.info(f"🔧 Rozwiązano nakładania: {len(schedules)} → {len(resolved_schedules)} harmonogramów")
         return resolved_schedules
 
-    def _detect_any_overlaps(self, schedules: List[ChargeSchedule]) -> bool:
+    @staticmethod
+    def _detect_any_overlaps(schedules: List[ChargeSchedule]) -> bool:
         """
         Szybkie sprawdzenie czy w liście harmonogramów są jakiekolwiek nakładania
         
@@ -2829,10 +3770,15 @@ class CloudTeslaMonitor:
         Returns:
             bool: True jeśli znaleziono przynajmniej jedno nakładanie
         """
-        for i, schedule1 in enumerate(schedules):
-            for j, schedule2 in enumerate(schedules[i+1:], start=i+1):
-                if self._schedules_overlap(schedule1, schedule2):
-                    return True
+        # OPTYMALIZACJA: sweep line - segmenty posortowane po początku, nakładanie gdy
+        # segment zaczyna się przed końcem któregoś wcześniejszego (O(n log n) zamiast O(n²)).
+        # Segmenty jednego okna przez północ są rozłączne, więc nie dają fałszywych trafień
+        segments = sorted(seg for s in schedules for seg in _schedule_segments(s))
+        max_end = 0
+        for seg_start, seg_end in segments:
+            if seg_start < max_end:
+                return True
+            max_end = max(max_end, seg_end)
         return False
 
     def _schedules_overlap(self, schedule1: ChargeSchedule, schedule2: ChargeSchedule) -> bool:
@@ -2849,18 +3795,8 @@ class CloudTeslaMonitor:
         # Okno przez północ dzielimy na segmenty w obrębie doby — poprzednia
         # formuła (start1<end2 AND start2<end1) po normalizacji end<start
         # NIE wykrywała realnych nakładań okien typu 23:00-01:00
-        def _segments(s: ChargeSchedule):
-            start = s.start_time % 1440
-            end = s.end_time - 1440 if s.end_time > 1440 else s.end_time
-            end = end % 1440 if end != 1440 else 0
-            if start < end:
-                return [(start, end)]
-            if start == end:
-                return []  # okno zerowej długości
-            return [(start, 1440), (0, end)]  # przez północ
-
-        for a_start, a_end in _segments(schedule1):
-            for b_start, b_end in _segments(schedule2):
+        for a_start, a_end in _schedule_segments(schedule1):
+            for b_start, b_end in _schedule_segments(schedule2):
                 if a_start < b_end and b_start < a_end:
                     return True
         return False
@@ -2869,6 +3805,12 @@ class CloudTeslaMonitor:
         """
         Pobiera harmonogramy ładowania z lokalizacji HOME z pojazdu Tesla
         
+        Bez cache (w odróżnieniu od _check_vehicle_status): każde wywołanie jest
+        albo pierwszym odczytem w przepływie, albo kontrolą po komendzie
+        modyfikującej - migawka sprzed kilku sekund dałaby fałszywy wynik
+        weryfikacji. Liczbę odczytów ograniczają wołający (np. jeden odczyt
+        kontrolny po całej serii usunięć).
+        
         Args:
             vehicle_vin: VIN pojazdu
             
@@ -2876,26 +3818,20 @@ class CloudTeslaMonitor:
             List[Dict]: Lista harmonogramów HOME z Tesla
         """
         try:
+            vin_tail = vehicle_vin[-4:]
             # Upewnij się że Tesla Controller jest połączony i ma wybrany pojazd
             if not self.tesla_controller.current_vehicle:
                 # Spróbuj połączyć się i wybrać pierwszy pojazd
                 if self.tesla_controller.connect():
-                    self.tesla_controller.list_vehicles()
-                    if self.tesla_controller.vehicles:
-                        # Znajdź pojazd o danym VIN
-                        for i, vehicle in enumerate(self.tesla_controller.vehicles):
-                            if vehicle.get('vin') == vehicle_vin:
-                                if self.tesla_controller.select_vehicle(i):
-                                    break
-                        else:
-                            # Jeśli nie znaleziono VIN, użyj pierwszego pojazdu
-                            self.tesla_controller.select_vehicle(0)
+                    # OPTYMALIZACJA: wybór po indeksie VIN (bez skanowania listy i bez
+                    # rysowania tabeli list_vehicles); brak VIN -> pierwszy pojazd
+                    self.tesla_controller.select_vehicle_by_vin(vehicle_vin)
                 else:
                     logger.error("Nie można połączyć się z Tesla API")
                     return None
 
             if not self.tesla_controller.current_vehicle:
-                logger.error(f"Nie można znaleźć pojazdu {vehicle_vin[-4:]}")
+                logger.error(f"Nie można znaleźć pojazdu {vin_tail}")
                 return None
 
             # Pobierz wszystkie harmonogramy
@@ -2904,45 +3840,47 @@ class CloudTeslaMonitor:
             if all_schedules is None:
                 # Błąd odczytu — NIE oznacza braku harmonogramów; wołający nie może
                 # na tej podstawie dodawać nowych okien obok nieznanych starych
-                logger.error(f"📍 Błąd odczytu harmonogramów z Tesla dla {vehicle_vin[-4:]}")
+                logger.error(f"📍 Błąd odczytu harmonogramów z Tesla dla {vin_tail}")
                 return None
 
             if not all_schedules:
-                logger.info(f"📍 Brak harmonogramów w Tesla dla {vehicle_vin[-4:]}")
+                logger.info(f"📍 Brak harmonogramów w Tesla dla {vin_tail}")
                 return []
             
             # DEBUG: Wyloguj strukturę pierwszego harmonogramu
-            if all_schedules:
+            # OPTYMALIZACJA: bez formatowania słownika, gdy DEBUG jest wyłączony
+            if logger.isEnabledFor(logging.DEBUG):
                 first_schedule = all_schedules[0]
-                logger.debug(f"📋 DEBUG: Struktura harmonogramu - dostępne pola: {list(first_schedule.keys())}")
-                logger.debug(f"📋 DEBUG: Przykładowy harmonogram: {first_schedule}")
+                logger.debug("📋 DEBUG: Struktura harmonogramu - dostępne pola: %s", list(first_schedule))
+                logger.debug("📋 DEBUG: Przykładowy harmonogram: %s", first_schedule)
             
             # Filtruj harmonogramy HOME (w okolicy domowej lokalizacji)
             home_schedules = []
             home_lat = self.tesla_controller.default_latitude
             home_lon = self.tesla_controller.default_longitude
             home_radius = self.tesla_controller.home_radius
+            # OPTYMALIZACJA: korekta długości cos(szerokości domu) liczona raz, nie per harmonogram
+            lon_scale = math.cos(math.radians(home_lat))
             
             for schedule in all_schedules:
                 # NAPRAWKA: Tesla API używa 'latitude' i 'longitude', nie 'lat' i 'lon'
                 schedule_lat = schedule.get('latitude', 0.0)
                 schedule_lon = schedule.get('longitude', 0.0)
                 
-                # Oblicz odległość od domu (proste przybliżenie)
+                # Odległość w stopniach (przybliżenie równoodległościowe, jak w _determine_location_status)
                 if schedule_lat != 0.0 and schedule_lon != 0.0:
-                    import math
-                    lat_diff = abs(schedule_lat - home_lat)
-                    lon_diff = abs(schedule_lon - home_lon) * math.cos(math.radians(home_lat))
-                    distance = (lat_diff**2 + lon_diff**2)**0.5
+                    distance = math.hypot(schedule_lat - home_lat, (schedule_lon - home_lon) * lon_scale)
                     
                     if distance <= home_radius:
                         home_schedules.append(schedule)
-                        logger.debug(f"📍 Harmonogram HOME: ID={schedule.get('id')}, odległość={distance:.4f}, współrzędne=({schedule_lat:.6f}, {schedule_lon:.6f})")
+                        logger.debug("📍 Harmonogram HOME: ID=%s, odległość=%.4f, współrzędne=(%.6f, %.6f)",
+                                     schedule.get('id'), distance, schedule_lat, schedule_lon)
                     else:
-                        logger.debug(f"📍 Harmonogram OUTSIDE: ID={schedule.get('id')}, odległość={distance:.4f}, współrzędne=({schedule_lat:.6f}, {schedule_lon:.6f})")
+                        logger.debug("📍 Harmonogram OUTSIDE: ID=%s, odległość=%.4f, współrzędne=(%.6f, %.6f)",
+                                     schedule.get('id'), distance, schedule_lat, schedule_lon)
                 else:
                     # Brak współrzędnych - pomijamy taki harmonogram (powinien być bardzo rzadki)
-                    logger.warning(f"📍 Harmonogram bez współrzędnych: ID={schedule.get('id')} - pomijam")
+                    logger.warning("📍 Harmonogram bez współrzędnych: ID=%s - pomijam", schedule.get('id'))
             
             logger.info(f"📍 Znaleziono {len(home_schedules)} harmonogramów HOME z {len(all_schedules)} całkowitych")
             return home_schedules
@@ -2967,6 +3905,92 @@ class CloudTeslaMonitor:
             and bool(vehicle_schedule.get('enabled', False)) == bool(desired.enabled)
         )
 
+    def _log_home_schedules(self, schedules: Optional[List[Dict]], label: str, level: int = logging.INFO):
+        """
+        Loguje harmonogramy HOME odczytane z pojazdu (po jednej linii na harmonogram)
+
+        Args:
+            schedules: Harmonogramy z _get_home_schedules_from_tesla (None = błąd odczytu)
+            label: Etykieta linii (np. "Aktywny")
+            level: Poziom logowania
+        """
+        if not schedules:
+            logger.log(level, "📍 Brak harmonogramów HOME w Tesla%s", " (błąd odczytu)" if schedules is None else "")
+            return
+        fmt = self._fmt_schedule_time
+        for n, schedule in enumerate(schedules, 1):
+            logger.log(level, "   %s #%d: ID=%s, %s-%s, enabled=%s", label, n, schedule.get('id', 'BRAK'),
+                       fmt(schedule.get('start_time', 'N/A')), fmt(schedule.get('end_time', 'N/A')),
+                       schedule.get('enabled', False))
+
+    def _fmt_schedule_time(self, value) -> str:
+        """Minuty od północy jako HH:MM; wartości spoza int (np. 'N/A') bez zmian jako tekst"""
+        return self.tesla_controller.minutes_to_time(value) if isinstance(value, int) else str(value)
+
+    @staticmethod
+    def _schedule_content_key(schedule) -> Tuple:
+        """
+        Klucz treści harmonogramu (start, end, enabled, one_time) do porównań zbiorami.
+
+        Harmonogram z pojazdu (dict) bez pola one_time dostaje one_time=None -
+        pasuje wtedy do obu wariantów, jak w _schedule_content_matches.
+        """
+        if isinstance(schedule, dict):
+            one_time = bool(schedule['one_time']) if 'one_time' in schedule else None
+            return (schedule.get('start_time'), schedule.get('end_time'),
+                    bool(schedule.get('enabled', False)), one_time)
+        return (schedule.start_time, schedule.end_time, bool(schedule.enabled), bool(schedule.one_time))
+
+    def _missing_in_vehicle(self, vehicle_schedules: List[Dict],
+                            desired: List[ChargeSchedule]) -> List[ChargeSchedule]:
+        """
+        Zwraca pożądane harmonogramy, których nie ma w pojeździe.
+
+        OPTYMALIZACJA: jeden zbiór kluczy treści zamiast _schedule_content_matches
+        dla każdej pary (O(n + m) zamiast O(n * m)); semantyka dopasowania ta sama.
+        """
+        vehicle_keys = {self._schedule_content_key(v) for v in vehicle_schedules}
+        missing = []
+        for schedule in desired:
+            key = self._schedule_content_key(schedule)
+            if key not in vehicle_keys and key[:3] + (None,) not in vehicle_keys:
+                missing.append(schedule)
+        return missing
+
+    def _not_in_plan(self, vehicle_schedules: List[Dict],
+                     desired: List[ChargeSchedule]) -> List[Dict]:
+        """
+        Zwraca harmonogramy pojazdu, które nie pasują do żadnego pożądanego
+        (odwrotność _missing_in_vehicle, to samo dopasowanie po kluczach treści).
+        """
+        desired_keys = {self._schedule_content_key(s) for s in desired}
+        stale = []
+        for schedule in vehicle_schedules:
+            key = self._schedule_content_key(schedule)
+            if key[3] is None:
+                matched = key[:3] + (True,) in desired_keys or key[:3] + (False,) in desired_keys
+            else:
+                matched = key in desired_keys
+            if not matched:
+                stale.append(schedule)
+        return stale
+
+    ADD_SCHEDULE_BACKOFF_SECONDS = 3       # baza opóźnienia po nieudanym dodaniu harmonogramu
+    ADD_SCHEDULE_BACKOFF_MAX_SECONDS = 12  # limit opóźnienia
+
+    def _add_schedule_backoff(self, failures: int) -> float:
+        """
+        Zwraca opóźnienie przed kolejną komendą po serii błędów (backoff wykładniczy z pełnym jitterem).
+
+        Args:
+            failures: Liczba kolejnych nieudanych komend (>= 1)
+
+        Returns:
+            float: Sekundy opóźnienia
+        """
+        cap = min(self.ADD_SCHEDULE_BACKOFF_MAX_SECONDS, self.ADD_SCHEDULE_BACKOFF_SECONDS * 2 ** (failures - 1))
+        return random.uniform(0, cap)
+
     def _add_schedules_to_tesla(self, schedules: List[ChargeSchedule], vehicle_vin: str) -> bool:
         """
         Dodaje harmonogramy ładowania do pojazdu Tesla z opóźnieniami i weryfikacją
@@ -2985,31 +4009,37 @@ class CloudTeslaMonitor:
         try:
             # OPTYMALIZACJA: Jeden wake_up na początku sekwencji zamiast przed każdą komendą
             logger.info(f"🔄 Budzenie pojazdu przed dodaniem {len(schedules)} harmonogramów...")
-            use_proxy = bool(hasattr(self.tesla_controller.fleet_api, 'proxy_url') and self.tesla_controller.fleet_api.proxy_url)
+            use_proxy = self.tesla_controller.uses_proxy
             if not self.tesla_controller.wake_up_vehicle(use_proxy=use_proxy):
                 logger.warning(f"⚠️ Wake_up nie powiodło się - kontynuuję mimo to (pojazd może być już online)")
 
             success_count = 0
             failed_schedules = []
+            consecutive_failures = 0
 
             for i, schedule in enumerate(schedules):
-                # NAPRAWKA: Dodaj opóźnienie między harmonogramami (Tesla API może nie nadążać)
-                if i > 0:
-                    logger.info(f"⏳ Opóźnienie 3s między harmonogramami...")
-                    time.sleep(3)
+                # OPTYMALIZACJA: bez stałego opóźnienia 3s przed każdą komendą - komendy idą
+                # jedna po drugiej przez tę samą sesję keep-alive; backoff z jitterem
+                # tylko po błędzie (pojazd/API może nie nadążać)
+                if consecutive_failures:
+                    delay = self._add_schedule_backoff(consecutive_failures)
+                    logger.info(f"⏳ Opóźnienie {delay:.1f}s po błędzie przed kolejnym harmonogramem...")
+                    time.sleep(delay)
                 
                 start_time = self.tesla_controller.minutes_to_time(schedule.start_time) if schedule.start_time else "N/A"
                 end_time = self.tesla_controller.minutes_to_time(schedule.end_time) if schedule.end_time else "N/A"
                 
-                logger.info(f"🔄 Dodawanie harmonogramu #{i+1}: {start_time}-{end_time}")
+                logger.info(_FMT_SCHEDULE_ADD, "🔄 Dodawanie harmonogramu", i + 1, start_time, end_time)
 
                 # OPTYMALIZACJA: skip_wake=True bo wake_up już wywołane na początku sekwencji
                 if self.tesla_controller.add_charge_schedule(schedule, skip_wake=True):
                     success_count += 1
-                    logger.info(f"✅ Dodano harmonogram #{i+1}: {start_time}-{end_time}")
+                    consecutive_failures = 0
+                    logger.info(_FMT_SCHEDULE_ADD, "✅ Dodano harmonogram", i + 1, start_time, end_time)
                 else:
+                    consecutive_failures += 1
                     failed_schedules.append(f"#{i+1}: {start_time}-{end_time}")
-                    logger.error(f"❌ Błąd dodawania harmonogramu #{i+1}: {start_time}-{end_time}")
+                    logger.error(_FMT_SCHEDULE_ADD, "❌ Błąd dodawania harmonogramu", i + 1, start_time, end_time)
             
             # NAPRAWKA: Dodaj weryfikację po dodaniu harmonogramów
             if success_count > 0:
@@ -3026,10 +4056,7 @@ class CloudTeslaMonitor:
                     logger.warning(f"⚠️ Nie udało się odczytać harmonogramów do weryfikacji — pomijam kontrolę")
                     verification_schedules = []
                 else:
-                    missing = [
-                        s for s in schedules
-                        if not any(self._schedule_content_matches(v, s) for v in verification_schedules)
-                    ]
+                    missing = self._missing_in_vehicle(verification_schedules, schedules)
                     if missing:
                         for s in missing:
                             logger.error(f"❌ Harmonogram {s.start_time}-{s.end_time} min zgłoszony jako dodany, "
@@ -3039,25 +4066,13 @@ class CloudTeslaMonitor:
                 logger.info(f"📊 Weryfikacja: dodano {success_count}, w pojeździe {len(verification_schedules)} harmonogramów HOME")
 
                 # Loguj szczegóły znalezionych harmonogramów
-                for j, verified_schedule in enumerate(verification_schedules):
-                    schedule_id = verified_schedule.get('id', 'BRAK')
-                    start_time_min = verified_schedule.get('start_time', 'N/A')
-                    end_time_min = verified_schedule.get('end_time', 'N/A')
-                    enabled = verified_schedule.get('enabled', False)
-                    
-                    # Konwertuj minuty na czas dla lepszego wyświetlenia
-                    if isinstance(start_time_min, int):
-                        start_time_display = self.tesla_controller.minutes_to_time(start_time_min)
-                    else:
-                        start_time_display = str(start_time_min)
-                    
-                    if isinstance(end_time_min, int):
-                        end_time_display = self.tesla_controller.minutes_to_time(end_time_min)
-                    else:
-                        end_time_display = str(end_time_min)
-                    
-                    logger.info(f"📋 Harmonogram #{j+1} w Tesla: ID={schedule_id}, "
-                              f"{start_time_display}-{end_time_display}, enabled={enabled}")
+                fmt = self._fmt_schedule_time
+                for j, verified_schedule in enumerate(verification_schedules, 1):
+                    logger.info("📋 Harmonogram #%d w Tesla: ID=%s, %s-%s, enabled=%s", j,
+                                verified_schedule.get('id', 'BRAK'),
+                                fmt(verified_schedule.get('start_time', 'N/A')),
+                                fmt(verified_schedule.get('end_time', 'N/A')),
+                                verified_schedule.get('enabled', False))
                 
                 logger.info(f"✅ Weryfikacja pomyślna: wszystkie dodane harmonogramy obecne w pojeździe")
             
@@ -3080,7 +4095,7 @@ class CloudTeslaMonitor:
         """
         Zarządza harmonogramami ładowania Tesla na podstawie danych z API OFF PEAK CHARGE
         Używa Smart Proxy Mode - uruchamia proxy on-demand dla komend
-        NOWA SEKWENCJA: pobiera obecne -> przygotowuje nowe -> wysyła nowe -> usuwa stare
+        NOWA SEKWENCJA: przygotowuje nowe -> pobiera obecne -> wysyła nowe -> usuwa stare
         
         Args:
             off_peak_data: Dane z API OFF PEAK CHARGE
@@ -3090,221 +4105,174 @@ class CloudTeslaMonitor:
             bool: True jeśli zarządzanie harmonogramami powiodło się
         """
         try:
-            warsaw_time = self._get_warsaw_time()
-            time_str = warsaw_time.strftime("[%H:%M]")
             
-            logger.info(f"{time_str} 🔧 Rozpoczęto zarządzanie harmonogramami Tesla dla {vehicle_vin[-4:]}")
-            
-            # NAPRAWKA: Dodaj szczegółową diagnostykę Smart Proxy Mode
-            logger.info(f"{time_str} 🔍 Diagnostyka Smart Proxy Mode:")
-            logger.info(f"   smart_proxy_mode = {self.smart_proxy_mode}")
-            logger.info(f"   proxy_available = {self.proxy_available}")
-            logger.info(f"   proxy_running = {self.proxy_running}")
-            
-            # Sprawdź zmienne środowiskowe
-            logger.info(f"   TESLA_SMART_PROXY_MODE = {os.getenv('TESLA_SMART_PROXY_MODE')}")
-            logger.info(f"   TESLA_PROXY_AVAILABLE = {os.getenv('TESLA_PROXY_AVAILABLE')}")
-            logger.info(f"   TESLA_HTTP_PROXY_HOST = {os.getenv('TESLA_HTTP_PROXY_HOST')}")
-            logger.info(f"   TESLA_HTTP_PROXY_PORT = {os.getenv('TESLA_HTTP_PROXY_PORT')}")
+            # OPTYMALIZACJA: kroki pośrednie logowane w DEBUG; wynik synchronizacji to jeden
+            # strukturalny wpis INFO (json_fields) zamiast kilkunastu linii na cykl
+            tlogger.debug("🔧 Rozpoczęto zarządzanie harmonogramami Tesla dla %s", vehicle_vin[-4:])
+            
+            # NAPRAWKA: Diagnostyka Smart Proxy Mode - jeden rekord (wcześniej dwa zdublowane bloki)
+            tlogger.debug("🔍 Smart Proxy Mode: smart=%s avail=%s running=%s "
+                          "env{SMART=%s AVAIL=%s HOST=%s PORT=%s}",
+                          self.smart_proxy_mode, self.proxy_available, self.proxy_running,
+                          ENV.smart_proxy_mode_raw, ENV.proxy_available_raw, ENV.proxy_host, ENV.proxy_port)
+            
+            # 1. Konwertuj harmonogramy z API OFF PEAK CHARGE
+            # OPTYMALIZACJA: konwersja nie potrzebuje pojazdu - pusty plan kończy cykl
+            # przed kosztownym startem proxy (odczyt harmonogramów budzi pojazd przez proxy,
+            # więc sam odczyt musi zostać za startem).
+            # UWAGA: wyniku konwersji nie cache'ujemy po hashu planu - zależy od
+            # bieżącego czasu (pomijanie minionych slotów, filtr "tylko dziś").
+            # Przy identycznym hashu _is_schedule_different i tak pomija całą ścieżkę
+            tlogger.debug("🔄 Konwersja harmonogramów z API OFF PEAK CHARGE...")
+            new_schedules = self._convert_off_peak_to_tesla_schedules(off_peak_data, vehicle_vin)
+            
+            if not new_schedules:
+                tlogger.warning("⚠️ Brak harmonogramów do dodania z API OFF PEAK CHARGE")
+                return True  # Techniczne powodzenie - po prostu nie ma harmonogramów
             
             # SMART PROXY: Uruchom proxy on-demand dla komend
             proxy_started = False
-            # Szczegółowa diagnostyka Smart Proxy Mode
-            logger.info(f"{time_str} 🔍 Smart Proxy Mode diagnostyka:")
-            logger.info(f"   smart_proxy_mode = {self.smart_proxy_mode}")
-            logger.info(f"   proxy_available = {self.proxy_available}")
-            logger.info(f"   TESLA_SMART_PROXY_MODE = {os.getenv('TESLA_SMART_PROXY_MODE')}")
-            logger.info(f"   TESLA_PROXY_AVAILABLE = {os.getenv('TESLA_PROXY_AVAILABLE')}")
-            logger.info(f"   TESLA_HTTP_PROXY_HOST = {os.getenv('TESLA_HTTP_PROXY_HOST')}")
-            logger.info(f"   TESLA_HTTP_PROXY_PORT = {os.getenv('TESLA_HTTP_PROXY_PORT')}")
             
             if self.smart_proxy_mode and self.proxy_available:
-                logger.info(f"{time_str} 🚀 Uruchamianie Tesla HTTP Proxy on-demand...")
-                proxy_started = self._start_proxy_on_demand()
+                tlogger.debug("🚀 Uruchamianie Tesla HTTP Proxy on-demand...")
+                proxy_started = self._acquire_proxy()
                 if not proxy_started:
-                    logger.error(f"{time_str} ❌ Nie udało się uruchomić Tesla HTTP Proxy")
-                    logger.warning(f"{time_str} ⚠️ Próba zarządzania harmonogramami bez proxy (może nie działać)")
+                    tlogger.error("❌ Nie udało się uruchomić Tesla HTTP Proxy")
+                    tlogger.warning("⚠️ Próba zarządzania harmonogramami bez proxy (może nie działać)")
                 else:
-                    logger.info(f"{time_str} ✅ Tesla HTTP Proxy uruchomiony pomyślnie")
+                    tlogger.debug("✅ Tesla HTTP Proxy uruchomiony pomyślnie")
                     
                     # NAPRAWKA: Upewnij się że TeslaController używa proxy
-                    if hasattr(self.tesla_controller, 'fleet_api'):
-                        # Sprawdź konfigurację proxy w TeslaController
-                        proxy_host = os.getenv('TESLA_HTTP_PROXY_HOST', 'localhost')
-                        proxy_port = os.getenv('TESLA_HTTP_PROXY_PORT', '4443')
-                        expected_proxy_url = f"https://{proxy_host}:{proxy_port}"
-                        
-                        current_proxy_url = getattr(self.tesla_controller.fleet_api, 'proxy_url', None)
-                        
-                        if current_proxy_url:
-                            logger.info(f"{time_str} ✅ TeslaController ma skonfigurowany proxy: {current_proxy_url}")
+                    # (fleet_api=None przed connect - wtedy konfiguruje go konstruktor klienta)
+                    fleet_api = self.tesla_controller.fleet_api
+                    if fleet_api is not None:
+                        if fleet_api.proxy_url:
+                            tlogger.debug("✅ TeslaController ma skonfigurowany proxy: %s", fleet_api.proxy_url)
                         else:
                             # Ustaw proxy_url w fleet_api (to powinno być zrobione przez konstruktor)
-                            if hasattr(self.tesla_controller.fleet_api, 'proxy_url'):
-                                self.tesla_controller.fleet_api.proxy_url = expected_proxy_url
-                                logger.info(f"{time_str} 🔗 Skonfigurowano proxy w TeslaController: {expected_proxy_url}")
-                            else:
-                                logger.warning(f"{time_str} ⚠️ TeslaController nie obsługuje konfiguracji proxy")
+                            fleet_api.proxy_url = self.PROXY_URL
+                            tlogger.info("🔗 Skonfigurowano proxy w TeslaController: %s", self.PROXY_URL)
             else:
-                logger.warning(f"{time_str} ⚠️ Smart Proxy Mode wyłączony lub niedostępny")
+                tlogger.warning("⚠️ Smart Proxy Mode wyłączony lub niedostępny")
                 if not self.smart_proxy_mode:
-                    logger.warning(f"   - smart_proxy_mode = False (wyłączony)")
+                    logger.warning("   - smart_proxy_mode = False (wyłączony)")
                 if not self.proxy_available:
-                    logger.warning(f"   - proxy_available = False (niedostępny)")
+                    logger.warning("   - proxy_available = False (niedostępny)")
             
             try:
-                # 1. Pobierz obecne harmonogramy HOME z Tesla
-                logger.info(f"{time_str} 📋 Pobieranie obecnych harmonogramów HOME...")
+                # 2. Pobierz obecne harmonogramy HOME z Tesla
+                tlogger.debug("📋 Pobieranie obecnych harmonogramów HOME...")
                 current_home_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
 
                 if current_home_schedules is None:
                     # Bez wiedzy o obecnym stanie pojazdu nie można bezpiecznie
                     # rekoncyliować — dodanie "na ślepo" tworzy duplikaty/osierocone okna
-                    logger.error(f"{time_str} ❌ Nie udało się odczytać obecnych harmonogramów — przerywam (retry w następnym cyklu)")
+                    tlogger.error("❌ Nie udało się odczytać obecnych harmonogramów — przerywam (retry w następnym cyklu)")
                     return False
 
-                if current_home_schedules:
-                    logger.info(f"{time_str} 📍 Znaleziono {len(current_home_schedules)} starych harmonogramów HOME")
-                else:
-                    logger.info(f"{time_str} 📍 Brak starych harmonogramów HOME")
-                
-                # 2. Konwertuj harmonogramy z API OFF PEAK CHARGE
-                logger.info(f"{time_str} 🔄 Konwersja harmonogramów z API OFF PEAK CHARGE...")
-                new_schedules = self._convert_off_peak_to_tesla_schedules(off_peak_data, vehicle_vin)
-                
-                if not new_schedules:
-                    logger.warning(f"{time_str} ⚠️ Brak harmonogramów do dodania z API OFF PEAK CHARGE")
-                    return True  # Techniczne powodzenie - po prostu nie ma harmonogramów
+                tlogger.debug("📍 Obecne harmonogramy HOME: %d", len(current_home_schedules))
                 
                 # 3. Rozwiąż nakładania harmonogramów (zachowaj kolejność priorytetów z API)
-                logger.info(f"{time_str} 🔍 Sprawdzanie nakładań harmonogramów...")
+                tlogger.debug("🔍 Sprawdzanie nakładań harmonogramów...")
                 resolved_schedules = self._resolve_schedule_overlaps(new_schedules, vehicle_vin)
 
                 # REKONCYLIACJA (idempotencja): porównaj pożądany stan z obecnym.
                 # Dodawaj tylko okna, których nie ma; usuwaj tylko te, które nie
                 # pasują do nowego planu. Retry po częściowej porażce oraz podwójny
                 # trigger nie duplikują wtedy okien w pojeździe.
-                schedules_to_add = [
-                    s for s in resolved_schedules
-                    if not any(self._schedule_content_matches(c, s) for c in current_home_schedules)
-                ]
+                schedules_to_add = self._missing_in_vehicle(current_home_schedules, resolved_schedules)
                 # OCHRONA SPECIAL CHARGING: okna aktywnych/zaplanowanych sesji special
                 # nie podlegają wymieceniu przez zwykły cykl
                 protected_ids = self._get_protected_schedule_ids(vehicle_vin)
                 if protected_ids is None:
-                    logger.error(f"{time_str} ❌ Nie można ustalić chronionych harmonogramów special — przerywam (retry w następnym cyklu)")
+                    tlogger.error("❌ Nie można ustalić chronionych harmonogramów special — przerywam (retry w następnym cyklu)")
                     return False
 
                 schedules_to_remove = [
-                    c for c in current_home_schedules
+                    c for c in self._not_in_plan(current_home_schedules, resolved_schedules)
                     if c.get('id') not in protected_ids
-                    and not any(self._schedule_content_matches(c, s) for s in resolved_schedules)
                 ]
 
                 if not schedules_to_add and not schedules_to_remove:
-                    logger.info(f"{time_str} ✅ Stan pojazdu zgodny z planem — brak operacji do wykonania")
+                    tlogger.info("✅ Stan pojazdu zgodny z planem — brak operacji do wykonania")
                     return True
 
                 # NAPRAWKA: Szczegółowe logowanie harmonogramów przed dodaniem
-                logger.info(f"{time_str} 📋 Harmonogramy do dodania ({len(schedules_to_add)}) / usunięcia ({len(schedules_to_remove)}):")
-                for k, schedule in enumerate(schedules_to_add):
-                    start_time_display = self.tesla_controller.minutes_to_time(schedule.start_time) if schedule.start_time else "N/A"
-                    end_time_display = self.tesla_controller.minutes_to_time(schedule.end_time) if schedule.end_time else "N/A"
-                    logger.info(f"   +#{k+1}: {start_time_display}-{end_time_display} "
-                              f"(minuty: {schedule.start_time}-{schedule.end_time}), "
-                              f"enabled={schedule.enabled}")
-                for k, old in enumerate(schedules_to_remove):
-                    logger.info(f"   -#{k+1}: ID={old.get('id')}, {old.get('start_time')}-{old.get('end_time')} min")
+                # (okna trafiają też do json_fields wpisu podsumowania)
+                tlogger.debug("📋 Harmonogramy do dodania (%d) / usunięcia (%d):", len(schedules_to_add), len(schedules_to_remove))
+                # OPTYMALIZACJA: lista per harmonogram (minutes_to_time + formatowanie) tylko gdy DEBUG jest włączony
+                if logger.isEnabledFor(logging.DEBUG):
+                    to_time = self.tesla_controller.minutes_to_time
+                    for k, schedule in enumerate(schedules_to_add, 1):
+                        logger.debug("   +#%d: %s-%s (minuty: %s-%s), enabled=%s", k,
+                                     to_time(schedule.start_time) if schedule.start_time else "N/A",
+                                     to_time(schedule.end_time) if schedule.end_time else "N/A",
+                                     schedule.start_time, schedule.end_time, schedule.enabled)
+                    for k, old in enumerate(schedules_to_remove, 1):
+                        logger.debug("   -#%d: ID=%s, %s-%s min", k, old.get('id'), old.get('start_time'), old.get('end_time'))
 
                 # 4. Dodaj nowe harmonogramy do Tesla (wymaga proxy)
-                logger.info(f"{time_str} ➕ Dodawanie {len(schedules_to_add)} nowych harmonogramów...")
+                tlogger.debug("➕ Dodawanie %d nowych harmonogramów...", len(schedules_to_add))
                 
                 if proxy_started:
-                    # Poczekaj na pełne uruchomienie proxy
-                    logger.info(f"{time_str} ⏳ Oczekiwanie na stabilizację proxy (3s)...")
-                    time.sleep(3)
-                    
+                    # Proxy gotowy - _start_proxy_on_demand zwraca True dopiero po udanym teście połączenia
                     addition_success = self._add_schedules_to_tesla(schedules_to_add, vehicle_vin)
                     if addition_success:
-                        logger.info(f"{time_str} ✅ Pomyślnie dodano nowe harmonogramy Tesla")
+                        tlogger.debug("✅ Pomyślnie dodano nowe harmonogramy Tesla")
                         
-                        # NAPRAWKA: Dodaj szczegółowe logowanie stanu po dodaniu
-                        logger.info(f"{time_str} 🔍 Stan harmonogramów HOME w Tesla po dodaniu:")
-                        updated_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
-                        if updated_schedules:
-                            for f, updated_schedule in enumerate(updated_schedules):
-                                schedule_id = updated_schedule.get('id', 'BRAK')
-                                start_time_min = updated_schedule.get('start_time', 'N/A')
-                                end_time_min = updated_schedule.get('end_time', 'N/A')
-                                enabled = updated_schedule.get('enabled', False)
-                                
-                                if isinstance(start_time_min, int):
-                                    start_display = self.tesla_controller.minutes_to_time(start_time_min)
-                                else:
-                                    start_display = str(start_time_min)
-                                
-                                if isinstance(end_time_min, int):
-                                    end_display = self.tesla_controller.minutes_to_time(end_time_min)
-                                else:
-                                    end_display = str(end_time_min)
-                                
-                                logger.info(f"   Harmonogram #{f+1}: ID={schedule_id}, "
-                                          f"{start_display}-{end_display}, enabled={enabled}")
+                        # OPTYMALIZACJA: bez odczytu "stanu po dodaniu" - _add_schedules_to_tesla
+                        # już zweryfikował obecność nowych okien w pojeździe (każdy odczyt to
+                        # płatne wywołanie vehicle_data)
                         
                         # 5. NOWA SEKWENCJA: Usuń stare harmonogramy PO dodaniu nowych
-                        removal_success = True
+                        removed_count = 0
                         if schedules_to_remove:
-                            logger.info(f"{time_str} 🗑️ Usuwanie {len(schedules_to_remove)} starych harmonogramów HOME...")
-                            removal_success = self._remove_old_schedules_from_tesla(schedules_to_remove, vehicle_vin)
-                            if not removal_success:
-                                # Częściowa porażka NIE jest sukcesem: pozostawione stare okna
-                                # (days=All) odpalą się w złych godzinach. Zwracamy False, żeby
-                                # hash nie został zatwierdzony i retry dokończył sprzątanie
-                                # (rekoncyliacja zapewnia, że retry nie zduplikuje dodanych okien).
-                                logger.error(f"{time_str} ❌ Nie wszystkie stare harmonogramy zostały usunięte — operacja NIEUDANA (retry dokończy)")
-                            else:
-                                logger.info(f"{time_str} ✅ Pomyślnie usunięto stare harmonogramy HOME")
-                        else:
-                            logger.info(f"{time_str} 📍 Brak starych harmonogramów HOME do usunięcia")
+                            tlogger.debug("🗑️ Usuwanie %d starych harmonogramów HOME...", len(schedules_to_remove))
+                            removed_count = self._remove_old_schedules_from_tesla(schedules_to_remove, vehicle_vin)
+                        removal_success = removed_count == len(schedules_to_remove)
+                        if not removal_success:
+                            # Częściowa porażka NIE jest sukcesem: pozostawione stare okna
+                            # (days=All) odpalą się w złych godzinach. Zwracamy False, żeby
+                            # hash nie został zatwierdzony i retry dokończył sprzątanie
+                            # (rekoncyliacja zapewnia, że retry nie zduplikuje dodanych okien).
+                            tlogger.error("❌ Nie wszystkie stare harmonogramy zostały usunięte — operacja NIEUDANA (retry dokończy)")
                         
-                        # NAPRAWKA: Dodaj szczegółowe logowanie końcowego stanu
-                        logger.info(f"{time_str} 🔍 Końcowy stan harmonogramów HOME w Tesla:")
-                        final_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
-                        if final_schedules:
-                            for f, final_schedule in enumerate(final_schedules):
-                                schedule_id = final_schedule.get('id', 'BRAK')
-                                start_time_min = final_schedule.get('start_time', 'N/A')
-                                end_time_min = final_schedule.get('end_time', 'N/A')
-                                enabled = final_schedule.get('enabled', False)
-                                
-                                if isinstance(start_time_min, int):
-                                    start_display = self.tesla_controller.minutes_to_time(start_time_min)
-                                else:
-                                    start_display = str(start_time_min)
-                                
-                                if isinstance(end_time_min, int):
-                                    end_display = self.tesla_controller.minutes_to_time(end_time_min)
-                                else:
-                                    end_display = str(end_time_min)
-                                
-                                logger.info(f"   Aktywny #{f+1}: ID={schedule_id}, "
-                                          f"{start_display}-{end_display}, enabled={enabled}")
-                        else:
-                            logger.info(f"{time_str} 📍 Brak harmonogramów HOME w Tesla po operacji")
+                        # Końcowy stan wyliczony lokalnie (obecne - potwierdzone usunięcia + dodane);
+                        # odczyt kontrolny z pojazdu tylko w DEBUG
+                        final_count = len(current_home_schedules) - removed_count + len(schedules_to_add)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            final_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
+                            self._log_home_schedules(final_schedules, "Aktywny", logging.DEBUG)
+                            if final_schedules is not None:
+                                final_count = len(final_schedules)
                         
                         # Zapisz informacje o operacji
                         operation_data = {
                             'operation': 'schedule_management_new_sequence',
                             'old_schedules_count': len(current_home_schedules),
                             'added_schedules': len(schedules_to_add),
-                            'removed_schedules': len(schedules_to_remove),
+                            'removed_schedules': removed_count,
                             'removal_success': removal_success,
-                            'final_schedules': len(final_schedules) if final_schedules else 0,
+                            'final_schedules': final_count,
                             'operation_success': removal_success,
                             'proxy_used': True,
                             'sequence_version': 'v3.1_reconciliation'
                         }
 
+                        # Jeden wpis podsumowania synchronizacji (przeszukiwalne json_fields)
+                        tlogger.info(
+                            "📊 Harmonogramy HOME %s: +%d / -%d → %d%s",
+                            vehicle_vin[-4:], len(schedules_to_add), removed_count, final_count,
+                            '' if removal_success else ' (usuwanie niepełne)',
+                            extra={'json_fields': {
+                                'event': 'schedule_sync_completed',
+                                'vin': vehicle_vin,
+                                **operation_data,
+                                'added': [(s.start_time, s.end_time) for s in schedules_to_add],
+                                'removed': [old.get('id') for old in schedules_to_remove],
+                            }}
+                        )
+
                         self._log_event(
                             message="Tesla charging schedules updated with reconciliation sequence",
                             vehicle_vin=vehicle_vin,
@@ -3317,27 +4285,19 @@ class CloudTeslaMonitor:
 
                         return removal_success
                     else:
-                        logger.error(f"{time_str} ❌ Błąd dodawania nowych harmonogramów")
+                        tlogger.error("❌ Błąd dodawania nowych harmonogramów")
                         
-                        # NAPRAWKA: Loguj stan po nieudanym dodaniu
-                        logger.error(f"{time_str} 🔍 Stan harmonogramów HOME po nieudanym dodaniu:")
-                        error_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
-                        if error_schedules:
-                            for e, error_schedule in enumerate(error_schedules):
-                                schedule_id = error_schedule.get('id', 'BRAK')
-                                start_time_min = error_schedule.get('start_time', 'N/A')
-                                end_time_min = error_schedule.get('end_time', 'N/A')
-                                enabled = error_schedule.get('enabled', False)
-                                logger.error(f"   Pozostały #{e+1}: ID={schedule_id}, "
-                                           f"{start_time_min}-{end_time_min}, enabled={enabled}")
-                        else:
-                            logger.error(f"{time_str} ❌ Brak harmonogramów HOME w Tesla po nieudanym dodaniu")
+                        # Stan po nieudanym dodaniu tylko w DEBUG - retry w następnym cyklu
+                        # i tak zaczyna od odczytu harmonogramów (rekoncyliacja)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            self._log_home_schedules(self._get_home_schedules_from_tesla(vehicle_vin),
+                                                     "Pozostały", logging.DEBUG)
                         
                         return False
                 else:
-                    logger.error(f"{time_str} ❌ Nie można dodać harmonogramów - brak Tesla HTTP Proxy")
-                    logger.error(f"{time_str} 💡 Komendy add/remove_charge_schedule wymagają Tesla HTTP Proxy")
-                    logger.error(f"{time_str} 💡 Fleet API nie obsługuje tych komend bez proxy")
+                    tlogger.error("❌ Nie można dodać harmonogramów - brak Tesla HTTP Proxy")
+                    tlogger.error("💡 Komendy add/remove_charge_schedule wymagają Tesla HTTP Proxy")
+                    tlogger.error("💡 Fleet API nie obsługuje tych komend bez proxy")
                     
                     self._log_event(
                         message="Tesla charging schedules management failed - no proxy available",
@@ -3354,21 +4314,14 @@ class CloudTeslaMonitor:
                     return False
                     
             finally:
-                # SMART PROXY: Zatrzymaj proxy po zakończeniu komend
-                if proxy_started and self.proxy_running:
-                    logger.info(f"{time_str} 🛑 Zatrzymywanie Tesla HTTP Proxy po zakończeniu komend...")
-                    self._stop_proxy()
-                    
-                    # NAPRAWKA: Przywróć TeslaController do używania Fleet API
-                    if hasattr(self.tesla_controller, 'fleet_api') and hasattr(self.tesla_controller.fleet_api, 'use_proxy'):
-                        self.tesla_controller.fleet_api.use_proxy = False
-                        logger.info(f"{time_str} 🔙 TeslaController przywrócony do Fleet API")
+                # SMART PROXY: Zwolnij proxy po zakończeniu komend
+                # (zatrzymanie po TTL bezczynności - kolejna operacja użyje go ponownie)
+                if proxy_started:
+                    tlogger.debug("🛑 Zwalnianie Tesla HTTP Proxy po zakończeniu komend...")
+                    self._release_proxy()
                     
         except Exception as e:
-            logger.error(f"Błąd zarządzania harmonogramami Tesla: {e}")
-            logger.error(f"Typ błędu: {type(e).__name__}")
-            import traceback
-            logger.error(f"Stack trace: {traceback.format_exc()}")
+            logger.error("Błąd zarządzania harmonogramami Tesla: %s (%s)", e, type(e).__name__, exc_info=True)
             
             self._log_event(
                 message=f"Tesla charging schedules management error: {e}",
@@ -3394,52 +4347,57 @@ class CloudTeslaMonitor:
             bool: True jeśli wyłączono harmonogramy pomyślnie
         """
         try:
+            vin_tail = vehicle_vin[-4:]
             home_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
 
             if home_schedules is None:
-                logger.error(f"📍 Błąd odczytu harmonogramów HOME dla {vehicle_vin[-4:]} — nie można wyłączać")
+                logger.error(f"📍 Błąd odczytu harmonogramów HOME dla {vin_tail} — nie można wyłączać")
                 return False
 
             if not home_schedules:
-                logger.info(f"📍 Brak harmonogramów HOME do wyłączenia dla {vehicle_vin[-4:]}")
+                logger.info(f"📍 Brak harmonogramów HOME do wyłączenia dla {vin_tail}")
                 return True
 
-            # OPTYMALIZACJA: Jeden wake_up przed całą sekwencją wyłączania (unika HTTP 429)
-            logger.info(f"🔄 Budzenie pojazdu przed wyłączeniem {len(home_schedules)} harmonogramów...")
-            use_proxy = bool(hasattr(self.tesla_controller.fleet_api, 'proxy_url') and self.tesla_controller.fleet_api.proxy_url)
-            if not self.tesla_controller.wake_up_vehicle(use_proxy=use_proxy):
-                logger.warning(f"⚠️ Wake_up nie powiodło się - kontynuuję mimo to (pojazd może być już online)")
-
-            success_count = 0
-            for schedule in home_schedules:
+            # OPTYMALIZACJA: podział raz przed pętlą - już wyłączone nie wymagają komend,
+            # a gdy nie ma czego wyłączać, pomijamy też wake_up (i budzenie auta)
+            to_disable = [s for s in home_schedules if s.get('id') and s.get('enabled', False)]
+            already_disabled = [s for s in home_schedules if s.get('id') and not s.get('enabled', True)]
+            for schedule in already_disabled:
+                logger.info(f"ℹ️ Harmonogram HOME ID {schedule.get('id')} już wyłączony")
+            success_count = len(already_disabled)
+
+            if to_disable:
+                # OPTYMALIZACJA: Jeden wake_up przed całą sekwencją wyłączania (unika HTTP 429)
+                logger.info(f"🔄 Budzenie pojazdu przed wyłączeniem {len(to_disable)} harmonogramów...")
+                use_proxy = self.tesla_controller.uses_proxy
+                if not self.tesla_controller.wake_up_vehicle(use_proxy=use_proxy):
+                    logger.warning(f"⚠️ Wake_up nie powiodło się - kontynuuję mimo to (pojazd może być już online)")
+
+            for schedule in to_disable:
                 schedule_id = schedule.get('id')
-                if schedule_id and schedule.get('enabled', False):
-                    # Wyłącz harmonogram modyfikując go z enabled=False
-                    try:
-                        modified_schedule = ChargeSchedule(
-                            id=schedule_id,
-                            enabled=False,  # Wyłącz harmonogram
-                            days_of_week=schedule.get('days_of_week', 'All'),
-                            lat=schedule.get('latitude', self.tesla_controller.default_latitude),
-                            lon=schedule.get('longitude', self.tesla_controller.default_longitude),
-                            start_enabled=schedule.get('start_enabled', False),
-                            end_enabled=schedule.get('end_enabled', False),
-                            start_time=schedule.get('start_time'),
-                            end_time=schedule.get('end_time'),
-                            one_time=schedule.get('one_time', False)
-                        )
-                        
-                        # OPTYMALIZACJA: skip_wake=True bo wake_up już wywołane na początku sekwencji
-                        if self.tesla_controller.add_charge_schedule(modified_schedule, skip_wake=True):
-                            success_count += 1
-                            logger.info(f"🔕 Wyłączono harmonogram HOME ID: {schedule_id}")
-                        else:
-                            logger.error(f"❌ Błąd wyłączania harmonogramu HOME ID: {schedule_id}")
-                    except Exception as modify_error:
-                        logger.error(f"❌ Błąd modyfikacji harmonogramu HOME ID {schedule_id}: {modify_error}")
-                elif schedule_id and not schedule.get('enabled', True):
-                    logger.info(f"ℹ️ Harmonogram HOME ID {schedule_id} już wyłączony")
-                    success_count += 1
+                # Wyłącz harmonogram modyfikując go z enabled=False
+                try:
+                    modified_schedule = ChargeSchedule(
+                        id=schedule_id,
+                        enabled=False,  # Wyłącz harmonogram
+                        days_of_week=schedule.get('days_of_week', ALL_DAYS),
+                        lat=schedule.get('latitude', self.tesla_controller.default_latitude),
+                        lon=schedule.get('longitude', self.tesla_controller.default_longitude),
+                        start_enabled=schedule.get('start_enabled', False),
+                        end_enabled=schedule.get('end_enabled', False),
+                        start_time=schedule.get('start_time'),
+                        end_time=schedule.get('end_time'),
+                        one_time=schedule.get('one_time', False)
+                    )
+                    
+                    # OPTYMALIZACJA: skip_wake=True bo wake_up już wywołane na początku sekwencji
+                    if self.tesla_controller.add_charge_schedule(modified_schedule, skip_wake=True):
+                        success_count += 1
+                        logger.info(f"🔕 Wyłączono harmonogram HOME ID: {schedule_id}")
+                    else:
+                        logger.error(f"❌ Błąd wyłączania harmonogramu HOME ID: {schedule_id}")
+                except Exception as modify_error:
+                    logger.error(f"❌ Błąd modyfikacji harmonogramu HOME ID {schedule_id}: {modify_error}")
             
             logger.info(f"🔕 Wyłączono {success_count}/{len(home_schedules)} harmonogramów HOME")
             return success_count == len(home_schedules)
@@ -3462,25 +4420,12 @@ class CloudTeslaMonitor:
             return False
         
         # NAPRAWKA: Sprawdź gotowość private key przed uruchomieniem proxy
-        private_key_ready = os.getenv('TESLA_PRIVATE_KEY_READY', 'false').lower() == 'true'
-        if not private_key_ready:
+        if not ENV.private_key_ready:
             logger.warning("⚠️ Private key nie jest gotowy - nie można uruchomić Tesla HTTP Proxy")
             logger.warning("💡 Sprawdź czy startup_worker.sh poprawnie pobrał private key")
             return False
         
-        # Sprawdź czy plik private key istnieje i nie jest pusty
-        if not os.path.exists('private-key.pem'):
-            logger.error("❌ Plik private-key.pem nie istnieje")
-            return False
-        
-        try:
-            key_size = os.path.getsize('private-key.pem')
-            if key_size == 0:
-                logger.error("❌ Plik private-key.pem jest pusty")
-                return False
-            logger.info(f"✅ Private key zweryfikowany ({key_size} bajtów)")
-        except Exception as key_error:
-            logger.error(f"❌ Błąd sprawdzania private key: {key_error}")
+        if not self._private_key_valid():
             return False
         
         if self.proxy_running:
@@ -3493,21 +4438,20 @@ class CloudTeslaMonitor:
                 self._stop_proxy()
         
         try:
-            import subprocess
-            import time
             
-            proxy_host = os.getenv('TESLA_HTTP_PROXY_HOST', 'localhost')
-            proxy_port = os.getenv('TESLA_HTTP_PROXY_PORT', '4443')
+            proxy_host = self.PROXY_HOST
+            proxy_port = self.PROXY_PORT
             
             logger.info(f"🚀 Uruchamianie Tesla HTTP Proxy on-demand...")
             logger.info(f"   Host: {proxy_host}")
             logger.info(f"   Port: {proxy_port}")
             
             # Sprawdź czy port jest wolny
-            import socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            result = sock.connect_ex((proxy_host, int(proxy_port)))
-            sock.close()
+            # OPTYMALIZACJA: adres rozwiązany raz na proces, połączenie z limitem czasu
+            family, sockaddr = self._proxy_sockaddr
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.PROXY_PORT_PROBE_TIMEOUT_SECONDS)
+                result = sock.connect_ex(sockaddr)
             
             if result == 0:
                 logger.warning(f"⚠️ Port {proxy_port} jest już zajęty - sprawdzam czy to nasze proxy...")
@@ -3519,56 +4463,34 @@ class CloudTeslaMonitor:
                     logger.error(f"❌ Port {proxy_port} zajęty przez inny proces")
                     return False
             
-            # Sprawdź czy private-key.pem istnieje
-            if not os.path.exists('private-key.pem'):
-                logger.error("❌ Brak pliku private-key.pem - proxy nie może być uruchomiony")
-                logger.error("💡 Sprawdź czy klucz został pobrany z Secret Manager")
-                return False
-            
-            # Sprawdź rozmiar klucza prywatnego
-            try:
-                key_size = os.path.getsize('private-key.pem')
-                if key_size == 0:
-                    logger.error("❌ Plik private-key.pem jest pusty")
-                    return False
-                logger.info(f"✅ Klucz prywatny znaleziony ({key_size} bajtów)")
-            except Exception as key_error:
-                logger.error(f"❌ Błąd sprawdzania klucza prywatnego: {key_error}")
-                return False
-            
             # Generuj certyfikaty TLS jeśli nie istnieją
             if not os.path.exists('tls-key.pem') or not os.path.exists('tls-cert.pem'):
                 logger.info("🔐 Generowanie certyfikatów TLS...")
                 try:
-                    result = subprocess.run([
-                        'openssl', 'req', '-x509', '-newkey', 'rsa:4096',
-                        '-keyout', 'tls-key.pem', '-out', 'tls-cert.pem',
-                        '-days', '365', '-nodes',
-                        '-subj', '/C=PL/ST=Mazowieckie/L=Warsaw/O=Tesla Monitor/CN=localhost',
-                        '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'
-                    ], check=True, capture_output=True, text=True)
+                    _generate_proxy_tls_cert()
                     logger.info("✅ Certyfikaty TLS wygenerowane pomyślnie")
-                except subprocess.CalledProcessError as cert_error:
+                except Exception as cert_error:
                     logger.error(f"❌ Błąd generowania certyfikatów TLS: {cert_error}")
-                    logger.error(f"stdout: {cert_error.stdout}")
-                    logger.error(f"stderr: {cert_error.stderr}")
                     return False
             
             # Sprawdź czy tesla-http-proxy jest dostępny
-            try:
-                result = subprocess.run(['tesla-http-proxy', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                logger.info("✅ tesla-http-proxy jest dostępny")
-            except subprocess.TimeoutExpired:
-                logger.error("❌ tesla-http-proxy timeout - może być zawieszony")
-                return False
-            except FileNotFoundError:
-                logger.error("❌ tesla-http-proxy nie znaleziony w PATH")
-                logger.error("💡 Sprawdź czy tesla-http-proxy jest zainstalowany")
-                return False
-            except Exception as proxy_check_error:
-                logger.error(f"❌ Błąd sprawdzania tesla-http-proxy: {proxy_check_error}")
-                return False
+            # OPTYMALIZACJA: raz na proces - restart po TTL nie uruchamia dodatkowego podprocesu
+            if not self._proxy_binary_checked:
+                try:
+                    result = subprocess.run(['tesla-http-proxy', '--help'], 
+                                          capture_output=True, text=True, timeout=5)
+                    logger.info("✅ tesla-http-proxy jest dostępny")
+                    self._proxy_binary_checked = True
+                except subprocess.TimeoutExpired:
+                    logger.error("❌ tesla-http-proxy timeout - może być zawieszony")
+                    return False
+                except FileNotFoundError:
+                    logger.error("❌ tesla-http-proxy nie znaleziony w PATH")
+                    logger.error("💡 Sprawdź czy tesla-http-proxy jest zainstalowany")
+                    return False
+                except Exception as proxy_check_error:
+                    logger.error(f"❌ Błąd sprawdzania tesla-http-proxy: {proxy_check_error}")
+                    return False
             
             # Uruchom Tesla HTTP Proxy
             proxy_cmd = [
@@ -3594,9 +4516,15 @@ class CloudTeslaMonitor:
             
             logger.info(f"⏳ Oczekiwanie na uruchomienie proxy (PID: {self.proxy_process.pid})...")
             
-            # Poczekaj na uruchomienie proxy z progressivnym timeout'em
-            for attempt in range(1, 11):  # 10 prób
-                time.sleep(1)
+            # OPTYMALIZACJA: sondowanie gotowości z backoffem od 50 ms zamiast stałej
+            # sekundy między próbami - proxy zwykle wstaje w ~100-300 ms. Udany test
+            # połączenia potwierdza gotowość (bez dodatkowego oczekiwania na stabilizację)
+            started_at = time.monotonic()
+            deadline = started_at + self.PROXY_READY_TIMEOUT_SECONDS
+            delay = self.PROXY_READY_PROBE_INITIAL_SECONDS
+            attempt = 0
+            while time.monotonic() < deadline:
+                attempt += 1
                 
                 # Sprawdź czy proces nadal działa
                 if self.proxy_process.poll() is not None:
@@ -3610,30 +4538,24 @@ class CloudTeslaMonitor:
                 # Test połączenia
                 if self._test_proxy_connection():
                     self.proxy_running = True
-                    logger.info(f"✅ Tesla HTTP Proxy uruchomiony pomyślnie po {attempt}s (PID: {self.proxy_process.pid})")
-                    
-                    # Dodatkowy test autoryzacji
-                    try:
-                        proxy_url = f"https://{proxy_host}:{proxy_port}"
-                        response = requests.get(f"{proxy_url}/api/1/vehicles", 
-                                              timeout=5, verify=False)
-                        logger.info(f"🔗 Test autoryzacji proxy: status {response.status_code}")
-                    except Exception as auth_test_error:
-                        logger.debug(f"Test autoryzacji błąd: {auth_test_error}")
-                    
+                    logger.info("✅ Tesla HTTP Proxy uruchomiony pomyślnie po %.2fs (próba %d, PID: %s)",
+                                time.monotonic() - started_at, attempt, self.proxy_process.pid)
                     return True
                 
-                if attempt % 3 == 0:  # Co 3 sekundy
-                    logger.info(f"⏳ Próba {attempt}/10 - czekam na odpowiedź proxy...")
+                time.sleep(delay)
+                delay = min(delay * 1.5, self.PROXY_READY_PROBE_MAX_SECONDS)
             
             # Timeout - proxy nie odpowiada
-            logger.error("❌ Tesla HTTP Proxy nie odpowiada po 10 sekundach")
+            logger.error("❌ Tesla HTTP Proxy nie odpowiada po %s sekundach", self.PROXY_READY_TIMEOUT_SECONDS)
             
             # Sprawdź czy proces jeszcze działa
             if self.proxy_process.poll() is None:
                 logger.error("🔍 Proces proxy działa ale nie odpowiada - sprawdzam logi...")
-                # Spróbuj odczytać partial output
+                # OPTYMALIZACJA: najpierw zatrzymaj proces - communicate() na działającym
+                # procesie zawsze czekało pełny timeout; po terminate() zwraca od razu
+                # zbuforowany output (i tak zatrzymujemy proxy poniżej)
                 try:
+                    self.proxy_process.terminate()
                     stdout, stderr = self.proxy_process.communicate(timeout=2)
                     if stdout:
                         logger.error(f"stdout: {stdout[:500]}...")
@@ -3641,6 +4563,8 @@ class CloudTeslaMonitor:
                         logger.error(f"stderr: {stderr[:500]}...")
                 except subprocess.TimeoutExpired:
                     logger.error("⏰ Nie można odczytać logów proxy - timeout")
+                except Exception as read_error:
+                    logger.error(f"❌ Błąd odczytu logów proxy: {read_error}")
             
             self._stop_proxy()
             return False
@@ -3649,9 +4573,7 @@ class CloudTeslaMonitor:
             logger.error(f"❌ Błąd uruchamiania Tesla HTTP Proxy: {e}")
             return False
         except Exception as e:
-            logger.error(f"💥 Nieoczekiwany błąd uruchamiania proxy: {e}")
-            import traceback
-            logger.error(f"Stack trace: {traceback.format_exc()}")
+            logger.error("💥 Nieoczekiwany błąd uruchamiania proxy: %s", e, exc_info=True)
             return False
     
     def _stop_proxy(self):
@@ -3669,8 +4591,18 @@ class CloudTeslaMonitor:
         
         self.proxy_running = False
         self.proxy_process = None
-        
-        # Wyczyść certyfikaty TLS
+        self._proxy_refcount = 0
+        self._proxy_idle_deadline = None
+        # Połączenia z puli wskazują na zatrzymany proces - kolejny start otworzy nowe
+        self._close_http_session('_proxy_http')
+
+    def _remove_proxy_certs(self):
+        """
+        Usuwa certyfikaty TLS proxy (tylko przy zamykaniu monitora).
+
+        OPTYMALIZACJA: zatrzymanie bezczynnego proxy (TTL) ich nie usuwa - kolejny
+        start pomija generowanie certyfikatu (_generate_proxy_tls_cert).
+        """
         try:
             if os.path.exists('tls-key.pem'):
                 os.remove('tls-key.pem')
@@ -3679,6 +4611,92 @@ class CloudTeslaMonitor:
         except Exception as e:
             logger.debug(f"Błąd czyszczenia certyfikatów: {e}")
     
+    # ========== CZAS ŻYCIA PROXY (refcount + TTL bezczynności) ==========
+
+    PROXY_IDLE_TTL_SECONDS = ENV.proxy_idle_ttl  # ile proxy czeka bezczynnie na kolejną operację
+    # Adres lokalnego proxy z domyślnymi wartościami (ENV.proxy_host/port to surowe wartości env)
+    PROXY_HOST = ENV.proxy_host or 'localhost'
+    PROXY_PORT = ENV.proxy_port or '4443'
+    PROXY_URL = f"https://{PROXY_HOST}:{PROXY_PORT}"
+    _proxy_refcount = 0
+    _cycle_holds_proxy = False  # cykl monitorowania zajął proxy (zwalniany po cyklu)
+    _proxy_idle_deadline: Optional[float] = None
+    _proxy_binary_checked = False  # tesla-http-proxy --help sprawdzony w tym procesie
+    _private_key_size: Optional[int] = None  # rozmiar zweryfikowanego private-key.pem (raz na proces)
+    PROXY_READY_TIMEOUT_SECONDS = 10  # limit oczekiwania na gotowość nowo uruchomionego proxy
+    PROXY_READY_PROBE_INITIAL_SECONDS = 0.05  # pierwsza przerwa między testami gotowości
+    PROXY_READY_PROBE_MAX_SECONDS = 1.0  # górny limit przerwy (backoff x1.5)
+    PROXY_PORT_PROBE_TIMEOUT_SECONDS = 0.25  # limit sprawdzenia, czy port proxy jest zajęty
+    # (connect, read): lokalny proxy, który nie przyjmuje połączenia, nie blokuje testu na pełne 10 s
+    PROXY_PROBE_TIMEOUT = (3.05, 10)
+
+    @functools.cached_property
+    def _proxy_sockaddr(self):
+        """(rodzina, adres) lokalnego proxy z getaddrinfo - rozwiązywane raz, nie przy każdym starcie"""
+        # AF_INET: 'localhost' bez podanej rodziny może dać najpierw ::1, a proxy słucha na IPv4 loopback
+        family, _, _, _, sockaddr = socket.getaddrinfo(
+            self.PROXY_HOST, int(self.PROXY_PORT), family=socket.AF_INET, type=socket.SOCK_STREAM)[0]
+        return family, sockaddr
+
+    def _private_key_valid(self) -> bool:
+        """
+        Sprawdza, czy plik private-key.pem istnieje i nie jest pusty.
+
+        Klucz pobiera startup_worker.sh przed startem procesu, więc udana
+        weryfikacja jest zapamiętywana na cały proces (bez stat() przy każdym
+        starcie proxy). Nieudana jest powtarzana przy kolejnej próbie.
+
+        Returns:
+            bool: True jeśli klucz jest gotowy
+        """
+        if CloudTeslaMonitor._private_key_size is not None:
+            return True
+        try:
+            key_size = os.stat('private-key.pem').st_size
+        except FileNotFoundError:
+            logger.error("❌ Plik private-key.pem nie istnieje")
+            logger.error("💡 Sprawdź czy klucz został pobrany z Secret Manager")
+            return False
+        except OSError as key_error:
+            logger.error(f"❌ Błąd sprawdzania private key: {key_error}")
+            return False
+        if key_size == 0:
+            logger.error("❌ Plik private-key.pem jest pusty")
+            return False
+        logger.info(f"✅ Private key zweryfikowany ({key_size} bajtów)")
+        CloudTeslaMonitor._private_key_size = key_size
+        return True
+
+    def _acquire_proxy(self) -> bool:
+        """
+        Zajmuje Tesla HTTP Proxy dla sekcji wysyłającej komendy.
+
+        Działający proxy jest używany ponownie (start trwa kilka sekund), więc
+        kolejne operacje w krótkim odstępie (reset, harmonogramy, wake) płacą
+        za start tylko raz. Każde udane wywołanie wymaga _release_proxy().
+
+        Returns:
+            bool: True jeśli proxy działa i został zajęty
+        """
+        if not self._start_proxy_on_demand():
+            return False
+        self._proxy_refcount += 1
+        self._proxy_idle_deadline = None
+        return True
+
+    def _release_proxy(self):
+        """Zwalnia proxy - ostatni użytkownik zostawia go na PROXY_IDLE_TTL_SECONDS"""
+        self._proxy_refcount = max(0, self._proxy_refcount - 1)
+        if self._proxy_refcount == 0 and self.proxy_running:
+            self._proxy_idle_deadline = time.monotonic() + self.PROXY_IDLE_TTL_SECONDS
+
+    def _reap_idle_proxy(self):
+        """Zatrzymuje proxy, jeśli nikt go nie używa, a TTL bezczynności minął"""
+        deadline = self._proxy_idle_deadline
+        if self._proxy_refcount == 0 and deadline is not None and time.monotonic() >= deadline:
+            logger.info("🛑 Zatrzymywanie bezczynnego Tesla HTTP Proxy (TTL minął)")
+            self._stop_proxy()
+
     def _test_proxy_connection(self) -> bool:
         """
         Testuje połączenie z Tesla HTTP Proxy
@@ -3687,18 +4705,9 @@ class CloudTeslaMonitor:
             bool: True jeśli proxy odpowiada
         """
         try:
-            import requests
-            
-            proxy_host = os.getenv('TESLA_HTTP_PROXY_HOST', 'localhost')
-            proxy_port = os.getenv('TESLA_HTTP_PROXY_PORT', '4443')
-            proxy_url = f"https://{proxy_host}:{proxy_port}"
             
-            # Test połączenia z timeout'em i bez weryfikacji SSL (self-signed cert)
-            response = requests.get(
-                f"{proxy_url}/api/1/vehicles",
-                timeout=10,
-                verify=False  # Tesla HTTP Proxy używa self-signed cert
-            )
+            # Test połączenia z timeout'em przez sesję keep-alive (bez weryfikacji self-signed cert)
+            response = self._proxy_http.get(f"{self.PROXY_URL}/api/1/vehicles", timeout=self.PROXY_PROBE_TIMEOUT)
             
             if response.status_code in [200, 401, 403]:  # 200=OK, 401/403=auth error ale proxy działa
                 return True
@@ -3723,18 +4732,12 @@ class CloudTeslaMonitor:
             proxy_port: Port proxy (np. 4443)
         """
         try:
-            import requests
-            import ssl
             
             proxy_url = f"https://{proxy_host}:{proxy_port}"
             logger.info(f"🔗 Testuję połączenie z Tesla HTTP Proxy: {proxy_url}")
             
-            # Test połączenia z timeout'em i bez weryfikacji SSL (self-signed cert)
-            response = requests.get(
-                f"{proxy_url}/api/1/vehicles",
-                timeout=10,
-                verify=False  # Tesla HTTP Proxy używa self-signed cert
-            )
+            # Test połączenia z timeout'em przez sesję keep-alive (bez weryfikacji self-signed cert)
+            response = self._proxy_http.get(f"{proxy_url}/api/1/vehicles", timeout=self.PROXY_PROBE_TIMEOUT)
             
             if response.status_code in [200, 401, 403]:  # 200=OK, 401/403=auth error ale proxy działa
                 logger.info(f"✅ Tesla HTTP Proxy odpowiada (status: {response.status_code})")
@@ -3755,34 +4758,67 @@ class CloudTeslaMonitor:
         """Zwraca klienta Firestore dla Worker Service"""
         return self.firestore_client
 
+    FIRESTORE_BATCH_LIMIT = 500  # limit operacji w jednym WriteBatch Firestore
+
+    def _commit_firestore_updates(self, updates: List[Tuple[Any, Dict[str, Any]]]) -> int:
+        """
+        Aktualizuje dokumenty Firestore wsadowo - jeden commit na FIRESTORE_BATCH_LIMIT operacji
+        zamiast osobnego update() (round-trip) per dokument
+        
+        Args:
+            updates: Pary (referencja dokumentu, pola do aktualizacji) - kolejność zachowana
+            
+        Returns:
+            int: Liczba zatwierdzonych aktualizacji (początkowe elementy listy; reszta
+                 po błędzie commitu nie została zapisana)
+        """
+        committed = 0
+        for start in range(0, len(updates), self.FIRESTORE_BATCH_LIMIT):
+            chunk = updates[start:start + self.FIRESTORE_BATCH_LIMIT]
+            try:
+                batch = self.firestore_client.batch()
+                for ref, fields in chunk:
+                    batch.update(ref, fields)
+                batch.commit()
+            except Exception as e:
+                logger.error(f"❌ Błąd wsadowej aktualizacji Firestore ({len(chunk)} dokumentów): {e}")
+                break
+            committed += len(chunk)
+        return committed
+
 
 
-    def _remove_old_schedules_from_tesla(self, old_schedules: List[Dict], vehicle_vin: str) -> bool:
+    def _remove_old_schedules_from_tesla(self, old_schedules: List[Dict], vehicle_vin: str) -> int:
         """
         Usuwa konkretne harmonogramy ładowania z pojazdu Tesla
         NOWA WERSJA: bez logiki charge_stop - usuwa tylko podane harmonogramy
         
+        Komendy idą sekwencyjnie przez jedno połączenie keep-alive do proxy:
+        pojazd i tak wykonuje komendy po kolei, a równoległe wysyłanie (wątki,
+        asyncio/HTTP/2) kończy się HTTP 429 z Fleet API, nie krótszym czasem.
+        
         Args:
             old_schedules: Lista starych harmonogramów do usunięcia
             vehicle_vin: VIN pojazdu
             
         Returns:
-            bool: True jeśli usunięto wszystkie harmonogramy pomyślnie
+            int: Liczba potwierdzonych usunięć (wszystkie usunięte gdy == len(old_schedules))
         """
+        success_count = 0
         try:
             if not old_schedules:
                 logger.info(f"📍 Brak harmonogramów do usunięcia dla {vehicle_vin[-4:]}")
-                return True
+                return 0
 
             # OPTYMALIZACJA: Jeden wake_up na początku sekwencji zamiast przed każdą komendą
             logger.info(f"🔄 Budzenie pojazdu przed usunięciem {len(old_schedules)} harmonogramów...")
-            use_proxy = bool(hasattr(self.tesla_controller.fleet_api, 'proxy_url') and self.tesla_controller.fleet_api.proxy_url)
+            use_proxy = self.tesla_controller.uses_proxy
             if not self.tesla_controller.wake_up_vehicle(use_proxy=use_proxy):
                 logger.warning(f"⚠️ Wake_up nie powiodło się - kontynuuję mimo to (pojazd może być już online)")
 
             # Usuń podane harmonogramy
             logger.info(f"🗑️ Usuwanie {len(old_schedules)} starych harmonogramów...")
-            success_count = 0
+            failed_ids = []
 
             for schedule in old_schedules:
                 schedule_id = schedule.get('id')
@@ -3802,43 +4838,43 @@ class CloudTeslaMonitor:
                             logger.info(f"✅ Usunięto stary harmonogram ID: {schedule_id}")
                         else:
                             logger.error(f"❌ Błąd usuwania starego harmonogramu ID: {schedule_id}")
-                            
-                            # Sprawdź czy harmonogram nadal istnieje.
-                            # Przy błędzie odczytu (None) załóż ostrożnie, że istnieje —
-                            # NIE wolno liczyć nieusuniętego okna jako sukces.
-                            current_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
-                            still_exists = current_schedules is None or any(s.get('id') == schedule_id for s in current_schedules)
-                            if still_exists:
-                                logger.error(f"🔍 Stary harmonogram {schedule_id} nadal istnieje w Tesla")
-                            else:
-                                logger.info(f"🤔 Stary harmonogram {schedule_id} nie istnieje w Tesla - może został już usunięty")
-                                success_count += 1  # Traktuj jako sukces
+                            failed_ids.append(schedule_id)
                             
                     except Exception as remove_error:
                         logger.error(f"💥 Wyjątek podczas usuwania starego harmonogramu ID {schedule_id}: {remove_error}")
                         logger.error(f"💡 Typ błędu: {type(remove_error).__name__}")
                         
-                        # Sprawdź czy to błąd autoryzacji
-                        if "401" in str(remove_error) or "unauthorized" in str(remove_error).lower():
-                            logger.error(f"🚫 Błąd autoryzacji - sprawdź tokeny Tesla")
-                        elif "412" in str(remove_error) or "not supported" in str(remove_error).lower():
-                            logger.error(f"🚫 Komenda nie obsługiwana - sprawdź czy Tesla HTTP Proxy działa")
-                        elif "timeout" in str(remove_error).lower():
-                            logger.error(f"⏰ Timeout - Tesla API może być przeciążone")
+                        hint = _command_error_hint(remove_error)
+                        if hint:
+                            logger.error(hint)
                 else:
                     logger.error(f"❌ Stary harmonogram bez ID - pomijam")
             
+            # Sprawdź czy nieudanie usunięte harmonogramy nadal istnieją.
+            # OPTYMALIZACJA: jeden odczyt po całej serii zamiast odczytu po każdym błędzie.
+            # Przy błędzie odczytu (None) załóż ostrożnie, że istnieją —
+            # NIE wolno liczyć nieusuniętego okna jako sukces.
+            if failed_ids:
+                current_schedules = self._get_home_schedules_from_tesla(vehicle_vin)
+                remaining_ids = None if current_schedules is None else {s.get('id') for s in current_schedules}
+                for schedule_id in failed_ids:
+                    if remaining_ids is None or schedule_id in remaining_ids:
+                        logger.error(f"🔍 Stary harmonogram {schedule_id} nadal istnieje w Tesla")
+                    else:
+                        logger.info(f"🤔 Stary harmonogram {schedule_id} nie istnieje w Tesla - może został już usunięty")
+                        success_count += 1  # Traktuj jako sukces
+            
             logger.info(f"🗑️ Usunięto {success_count}/{len(old_schedules)} starych harmonogramów")
             
             # Jeśli nie udało się usunąć wszystkich, ale udało się przynajmniej część
             if success_count > 0 and success_count < len(old_schedules):
                 logger.warning(f"⚠️ Częściowy sukces usuwania starych harmonogramów ({success_count}/{len(old_schedules)})")
                 
-            return success_count == len(old_schedules)
+            return success_count
             
         except Exception as e:
             logger.error(f"Błąd usuwania starych harmonogramów: {e}")
-            return False
+            return success_count
 
 def main():
     """Główna funkcja uruchamiająca monitor"""
@@ -3849,10 +4885,8 @@ def main():
         monitor = CloudTeslaMonitor()
         logger.info("✅ Instancja CloudTeslaMonitor utworzona pomyślnie")
     except Exception as init_error:
-        logger.error(f"💥 KRYTYCZNY błąd tworzenia monitora: {init_error}")
-        logger.error(f"💥 Typ błędu: {type(init_error).__name__}")
-        import traceback
-        logger.error(f"💥 Stack trace: {traceback.format_exc()}")
+        logger.error("💥 KRYTYCZNY błąd tworzenia monitora: %s (%s)", init_error, type(init_error).__name__,
+                     exc_info=True)
         return 1
     
     try:
@@ -3860,10 +4894,7 @@ def main():
         monitor.start_monitoring()
         logger.info("✅ Monitoring zakończony normalnie")
     except Exception as e:
-        logger.error(f"💥 KRYTYCZNY błąd uruchamiania monitora: {e}")
-        logger.error(f"💥 Typ błędu: {type(e).__name__}")
-        import traceback
-        logger.error(f"💥 Stack trace: {traceback.format_exc()}")
+        logger.error("💥 KRYTYCZNY błąd uruchamiania monitora: %s (%s)", e, type(e).__name__, exc_info=True)
         return 1
     
     logger.info("🏁 === KONIEC TESLA MONITOR ===")
@@ -3875,17 +4906,14 @@ if __name__ == "__main__":
         exit_code = main()
         logger.info(f"🏁 Aplikacja kończy działanie z kodem: {exit_code}")
         
-        # Loguj dlaczego aplikacja się kończy
-        import traceback
-        logger.info("🔍 Aplikacja kończy się z:")
-        for line in traceback.format_stack():
-            logger.info(f"🔍   {line.strip()}")
+        # Loguj dlaczego aplikacja się kończy - tylko w DEBUG (poziom loggera jest
+        # przełącznikiem; w produkcji bez przechodzenia i formatowania stosu)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Aplikacja kończy się z:\n%s", ''.join(traceback.format_stack()))
             
         logger.info(f"⚡ Wywołuję exit({exit_code})")
         exit(exit_code)
     except Exception as final_error:
-        logger.error(f"💥 FINAŁOWY błąd aplikacji: {final_error}")
-        import traceback
-        logger.error(f"💥 Stack trace: {traceback.format_exc()}")
+        logger.error("💥 FINAŁOWY błąd aplikacji: %s", final_error, exc_info=True)
         logger.info("⚡ Wywołuję exit(1) przez błąd")
         exit(1) 
\ No newline at end of file
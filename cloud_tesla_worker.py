@@ -19,7 +19,6 @@ import json
 import logging
 import time
 from datetime import datetime, timezone, timedelta
-import pytz
 from typing import Dict, Any, Optional, List
 import gspread
 from google.oauth2.service_account import Credentials
@@ -33,7 +32,8 @@ try:
         CloudTeslaMonitor,
         HealthCheckHandler,
         get_secret,
-        _log_simple_status
+        _log_simple_status,
+        _WARSAW_TZ
     )
     from tesla_controller import ChargeSchedule
 except ImportError as e:
@@ -125,6 +125,8 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
     def _handle_health_check(self):
         """Health check dla Worker Service"""
         try:
+            # Ścieżka bezczynna - zatrzymaj proxy pozostawiony ciepły po ostatniej operacji
+            self.monitor._reap_idle_proxy()
             warsaw_time = self.monitor._get_warsaw_time()
             
             response = {
@@ -237,8 +239,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             token_expires_at = getattr(self.monitor.tesla_controller.fleet_api, 'token_expires_at', None)
             remaining_minutes = None
             if token_expires_at:
-                from datetime import timezone as dt_timezone
-                remaining_seconds = (token_expires_at - datetime.now(dt_timezone.utc)).total_seconds()
+                remaining_seconds = (token_expires_at - datetime.now(timezone.utc)).total_seconds()
                 remaining_minutes = max(0, int(remaining_seconds / 60))
             
             response = {
@@ -431,16 +432,14 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                 if hasattr(self.monitor, 'proxy_running') and self.monitor.proxy_running:
                     logger.info(f"{time_str} ✅ Tesla HTTP Proxy już działa")
                 else:
-                    # Uruchom proxy on-demand
-                    if hasattr(self.monitor, '_start_proxy_on_demand'):
-                        proxy_started = self.monitor._start_proxy_on_demand()
-                        if proxy_started:
-                            logger.info(f"{time_str} ✅ Tesla HTTP Proxy uruchomiony on-demand")
-                        else:
-                            logger.warning(f"{time_str} ⚠️ Nie udało się uruchomić Tesla HTTP Proxy")
-                            logger.warning(f"{time_str} 💡 Worker będzie działać tylko z Fleet API")
+                    # Uruchom proxy on-demand - zwolniony od razu zostaje ciepły
+                    # (TTL bezczynności) i cykl zajmuje go bez ponownego startu
+                    if self.monitor._acquire_proxy():
+                        self.monitor._release_proxy()
+                        logger.info(f"{time_str} ✅ Tesla HTTP Proxy uruchomiony on-demand")
                     else:
-                        logger.warning(f"{time_str} ⚠️ Monitor nie obsługuje _start_proxy_on_demand")
+                        logger.warning(f"{time_str} ⚠️ Nie udało się uruchomić Tesla HTTP Proxy")
+                        logger.warning(f"{time_str} 💡 Worker będzie działać tylko z Fleet API")
             
             logger.info(f"{time_str} ✅ Worker przygotowany do wykonania cyklu")
             return True
@@ -513,8 +512,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                     # Sprawdź czas wygaśnięcia odświeżonego tokenu
                     remaining_minutes = None
                     if token_expires_at:
-                        from datetime import timezone as dt_timezone
-                        remaining_seconds = (token_expires_at - datetime.now(dt_timezone.utc)).total_seconds()
+                        remaining_seconds = (token_expires_at - datetime.now(timezone.utc)).total_seconds()
                         remaining_minutes = max(0, int(remaining_seconds / 60))
                     
                     response = {
@@ -832,8 +830,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                 
                 remaining_minutes = None
                 if token_expires_at:
-                    from datetime import timezone as dt_timezone
-                    remaining_seconds = (token_expires_at - datetime.now(dt_timezone.utc)).total_seconds()
+                    remaining_seconds = (token_expires_at - datetime.now(timezone.utc)).total_seconds()
                     remaining_minutes = max(0, int(remaining_seconds / 60))
                 
                 execution_time = (datetime.now(timezone.utc) - start_time).total_seconds()
@@ -1077,7 +1074,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             proxy_started = False
             if self.monitor.smart_proxy_mode and self.monitor.proxy_available:
                 logger.info(f"🚀 [SPECIAL] Uruchamianie Tesla HTTP Proxy dla wake_up...")
-                proxy_started = self.monitor._start_proxy_on_demand()
+                proxy_started = self.monitor._acquire_proxy()
                 if not proxy_started:
                     logger.error(f"❌ [SPECIAL] Nie udało się uruchomić Tesla HTTP Proxy")
                     logger.error(f"❌ [SPECIAL] Bez proxy wybudzenie może nie działać poprawnie")
@@ -1087,7 +1084,12 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             
             # Wybudź pojazd z proxy (potrzebny dla komend harmonogramów)
             logger.info(f"🔄 [SPECIAL] Budzenie pojazdu {selected_vin[-4:]} {'przez Tesla HTTP Proxy' if proxy_started else 'bezpośrednio Fleet API'}")
-            wake_success = self.monitor.tesla_controller.wake_up_vehicle(use_proxy=proxy_started)
+            try:
+                wake_success = self.monitor.tesla_controller.wake_up_vehicle(use_proxy=proxy_started)
+            finally:
+                # Proxy zostaje ciepły (TTL bezczynności) dla wysłania harmonogramu
+                if proxy_started:
+                    self.monitor._release_proxy()
             
             if wake_success:
                 logger.info(f"✅ [SPECIAL] Pojazd {selected_vin[-4:]} wybudzony pomyślnie")
@@ -1128,7 +1130,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             target_datetime = None
             if target_datetime_str:
                 try:
-                    target_datetime = datetime.fromisoformat(target_datetime_str.replace('Z', '+00:00'))
+                    target_datetime = datetime.fromisoformat(target_datetime_str)
                 except Exception as e:
                     logger.warning(f"⚠️ [SPECIAL] Błąd parsowania target_datetime: {e}")
                     target_datetime = target_datetime_str  # Fallback do string
@@ -1208,7 +1210,6 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                     client.delete_job(name=full_job_name)
                     logger.info(f"🗑️ [SPECIAL] Usunięty stary job: {job_name}")
                     # Krótkie opóźnienie po usunięciu
-                    import time
                     time.sleep(1)
                 except Exception as delete_error:
                     logger.warning(f"⚠️ [SPECIAL] Błąd usuwania starego job: {delete_error}")
@@ -1287,7 +1288,6 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                     client.delete_job(name=full_job_name)
                     logger.info(f"🗑️ [SPECIAL] Usunięty stary cleanup job: {job_name}")
                     # Krótkie opóźnienie po usunięciu
-                    import time
                     time.sleep(1)
                 except Exception as delete_error:
                     logger.warning(f"⚠️ [SPECIAL] Błąd usuwania starego cleanup job: {delete_error}")
@@ -1380,7 +1380,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             
             if smart_proxy_mode and proxy_available:
                 logger.info(f"🚀 [SPECIAL] Uruchamianie Tesla HTTP Proxy on-demand...")
-                proxy_started = self.monitor._start_proxy_on_demand()
+                proxy_started = self.monitor._acquire_proxy()
                 if not proxy_started:
                     logger.error(f"❌ [SPECIAL] Nie udało się uruchomić Tesla HTTP Proxy")
                     logger.error(f"❌ [SPECIAL] PRZYCZYNA: Bez proxy komendy set_charge_limit i add_charge_schedule będą odrzucane")
@@ -1478,13 +1478,9 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             
             finally:
                 # === CLEANUP === (NAPRAWKA: Dodane z _send_special_charging_to_vehicle)
-                # KROK 7: Zatrzymaj Tesla HTTP Proxy po zakończeniu
-                if proxy_started and hasattr(self.monitor, '_stop_proxy'):
-                    try:
-                        self.monitor._stop_proxy()
-                        logger.info(f"🛑 [SPECIAL] Tesla HTTP Proxy zatrzymany")
-                    except Exception as cleanup_error:
-                        logger.warning(f"⚠️ [SPECIAL] Błąd zatrzymywania proxy: {cleanup_error}")
+                # KROK 7: Zwolnij Tesla HTTP Proxy po zakończeniu (zatrzymanie po TTL bezczynności)
+                if proxy_started:
+                    self.monitor._release_proxy()
                 
                 # Przywróć TeslaController do bezpośredniego Fleet API
                 if hasattr(self.monitor.tesla_controller, 'fleet_api') and hasattr(self.monitor.tesla_controller.fleet_api, 'proxy_url'):
@@ -1746,7 +1742,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             smart_proxy_mode = os.getenv('TESLA_SMART_PROXY_MODE') == 'true'
             proxy_available = os.getenv('TESLA_PROXY_AVAILABLE') == 'true'
             if smart_proxy_mode and proxy_available:
-                proxy_started = self.monitor._start_proxy_on_demand()
+                proxy_started = self.monitor._acquire_proxy()
                 if proxy_started and hasattr(self.monitor.tesla_controller.fleet_api, 'proxy_url'):
                     proxy_host = os.getenv('TESLA_HTTP_PROXY_HOST', 'localhost')
                     proxy_port = os.getenv('TESLA_HTTP_PROXY_PORT', '4443')
@@ -1771,11 +1767,8 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                         removal_ok = False
                         logger.error(f"❌ [SPECIAL] Nie udało się usunąć harmonogramu ID={schedule_id}")
             finally:
-                if proxy_started and hasattr(self.monitor, '_stop_proxy'):
-                    try:
-                        self.monitor._stop_proxy()
-                    except Exception as stop_error:
-                        logger.warning(f"⚠️ [SPECIAL] Błąd zatrzymywania proxy: {stop_error}")
+                if proxy_started:
+                    self.monitor._release_proxy()
 
             if not restore_ok:
                 logger.error(f"🚨 [SPECIAL] ALERT: nie przywrócono charge limit {original_limit}% dla {vin[-4:]}")
@@ -1892,9 +1885,9 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                 # istotnie zmienić (jazda/ładowanie), plan liczony od nich to fikcja
                 ts = data.get('timestamp')
                 try:
-                    ts_dt = datetime.fromisoformat(str(ts).replace('Z', '+00:00'))
+                    ts_dt = datetime.fromisoformat(str(ts))
                     if ts_dt.tzinfo is None:
-                        ts_dt = pytz.timezone('Europe/Warsaw').localize(ts_dt)
+                        ts_dt = ts_dt.replace(tzinfo=_WARSAW_TZ)
                     if now - ts_dt > max_age:
                         logger.info(f"📚 [SPECIAL] Wpis baterii z {ts} starszy niż 24h - pomijam")
                         continue
@@ -2175,9 +2168,7 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                     target_datetime = datetime.strptime(target_datetime_str, '%Y-%m-%d %H:%M')
                     
                     # Ustaw timezone na Warsaw
-                    import pytz
-                    warsaw_tz = pytz.timezone('Europe/Warsaw')
-                    target_datetime = warsaw_tz.localize(target_datetime)
+                    target_datetime = target_datetime.replace(tzinfo=_WARSAW_TZ)
                     
                     # Sprawdź czy target_datetime jest w przyszłości
                     if target_datetime <= current_time:
@@ -2717,11 +2708,14 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
             int: Liczba wyczyszczonych sessions
         """
         try:
-            from google.cloud import firestore
-            import pytz
-            
-            db = firestore.Client()
-            current_time = datetime.now(pytz.timezone('Europe/Warsaw'))
+            # OPTYMALIZACJA: współdzielony klient Firestore monitora (bez nowego kanału gRPC per wywołanie)
+            db = self.monitor._get_firestore_client()
+            if db is None:
+                logger.warning("⚠️ [CLEANUP] Brak klienta Firestore - pomijam czyszczenie sessions")
+                return 0
+            # OPTYMALIZACJA: wspólna strefa ZoneInfo z cloud_tesla_monitor (bez pytz)
+            warsaw_tz = _WARSAW_TZ
+            current_time = datetime.now(warsaw_tz)
             
             logger.info(f"🧹 [CLEANUP] Rozpoczynam czyszczenie przeterminowanych special charging sessions")
             logger.info(f"🧹 [CLEANUP] Aktualny czas Warsaw: {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -2735,7 +2729,8 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
 
             logger.info(f"🧹 [CLEANUP] Znaleziono {len(active_sessions)} aktywnych/zaplanowanych sessions do sprawdzenia")
 
-            cleaned_count = 0
+            # OPTYMALIZACJA: oznaczenia COMPLETED zbierane i zapisywane wsadowo (WriteBatch)
+            pending_updates = []
             zombie_sessions = []
 
             for session_doc in active_sessions:
@@ -2751,18 +2746,15 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                     
                     # Parse charging_end time
                     try:
-                        if charging_end_str.endswith('Z'):
-                            charging_end_str = charging_end_str.replace('Z', '+00:00')
-                        
+                        # Python 3.11+ fromisoformat obsługuje sufiks 'Z'
                         charging_end = datetime.fromisoformat(charging_end_str)
                         
                         # Ensure timezone awareness
                         if charging_end.tzinfo is None:
-                            warsaw_tz = pytz.timezone('Europe/Warsaw')
-                            charging_end = warsaw_tz.localize(charging_end)
+                            charging_end = charging_end.replace(tzinfo=warsaw_tz)
                         
                         # Convert to Warsaw timezone for comparison
-                        charging_end_warsaw = charging_end.astimezone(pytz.timezone('Europe/Warsaw'))
+                        charging_end_warsaw = charging_end.astimezone(warsaw_tz)
                         
                         # Add safety buffer of 2 hours after charging end
                         cleanup_time = charging_end_warsaw + timedelta(hours=2)
@@ -2771,22 +2763,18 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                         
                         if current_time > cleanup_time:
                             # Session przeterminowana - oznacz jako COMPLETED
-                            session_doc.reference.update({
+                            pending_updates.append((session_doc.reference, {
                                 'status': 'COMPLETED',
                                 'completed_at': current_time.isoformat(),
                                 'completion_reason': 'auto_expired_daily_cleanup',
                                 'cleanup_time': cleanup_time.isoformat(),
                                 'cleaned_by': 'worker_daily_check'
-                            })
-                            
-                            cleaned_count += 1
+                            }))
                             zombie_sessions.append({
                                 'session_id': session_id,
                                 'charging_end': charging_end_warsaw.strftime('%Y-%m-%d %H:%M'),
                                 'hours_overdue': round((current_time - charging_end_warsaw).total_seconds() / 3600, 1)
                             })
-                            
-                            logger.info(f"🧹 [CLEANUP] ✅ Session {session_id} oznaczony jako COMPLETED (przeterminowany o {round((current_time - charging_end_warsaw).total_seconds() / 3600, 1)}h)")
                         else:
                             logger.info(f"🧹 [CLEANUP] ✅ Session {session_id} nadal aktywny (kończy się za {round((cleanup_time - current_time).total_seconds() / 3600, 1)}h)")
                         
@@ -2799,9 +2787,13 @@ class WorkerHealthCheckHandler(BaseHTTPRequestHandler):
                     logger.warning(f"⚠️ [CLEANUP] Błąd przetwarzania session {session_doc.id}: {session_error}")
                     continue
             
+            cleaned_count = self.monitor._commit_firestore_updates(pending_updates) if pending_updates else 0
+            if cleaned_count < len(pending_updates):
+                logger.error(f"❌ [CLEANUP] Zapisano {cleaned_count}/{len(pending_updates)} oznaczeń COMPLETED (reszta w następnym sprawdzeniu)")
+            
             if cleaned_count > 0:
                 logger.info(f"🧹 [CLEANUP] ✅ SUKCES: Wyczyszczono {cleaned_count} zombie sessions")
-                for zombie in zombie_sessions:
+                for zombie in zombie_sessions[:cleaned_count]:
                     logger.info(f"🧹 [CLEANUP]   - {zombie['session_id']}: zakończone {zombie['charging_end']}, przeterminowane o {zombie['hours_overdue']}h")
             else:
                 logger.info(f"🧹 [CLEANUP] ✅ Brak zombie sessions - wszystkie aktywne sessions są aktualne")
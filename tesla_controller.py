@@ -30,7 +30,20 @@ load_dotenv()
 
 console = Console()
 
-@dataclass
+# Endpointy vehicle_data potrzebne do statusu pojazdu - jedno żądanie zamiast kilku
+# (location_data uzupełnia drive_state o współrzędne GPS)
+VEHICLE_STATUS_ENDPOINTS = "charge_state;drive_state;location_data;vehicle_state"
+
+# Wszystkie dni tygodnia w formacie komendy add_charge_schedule. Komenda przyjmuje
+# string ("All", "Weekdays", "Monday,Tuesday"); maska bitowa (127) pojawia się tylko
+# w odpowiedziach charge_schedule_data - patrz days_of_week_to_string
+ALL_DAYS = "All"
+
+# OPTYMALIZACJA: gotowe napisy HH:MM dla każdej minuty doby (minutes_to_time w pętlach logowania)
+_MINUTES_TO_TIME = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(1440))
+
+# OPTYMALIZACJA: slots=True - bez __dict__ per instancja (harmonogram tworzony per slot planu)
+@dataclass(slots=True)
 class ChargeSchedule:
     """Klasa reprezentująca harmonogram ładowania"""
     id: Optional[int] = None
@@ -39,7 +52,7 @@ class ChargeSchedule:
     end_time: Optional[int] = None    # minuty od północy
     start_enabled: bool = False
     end_enabled: bool = False
-    days_of_week: str = "All"
+    days_of_week: str = ALL_DAYS
     lat: float = 0.0
     lon: float = 0.0
     one_time: bool = False
@@ -192,6 +205,7 @@ class TeslaController:
         
         self.fleet_api = None
         self.vehicles = []
+        self._vin_index: Dict[str, int] = {}  # VIN -> indeks w self.vehicles (budowany w connect)
         self.current_vehicle = None
         self.private_key = None
         
@@ -282,6 +296,7 @@ class TeslaController:
             # Pobieranie listy pojazdów przez Fleet API
             console.print("[yellow]📋 Pobieranie listy pojazdów...[/yellow]")
             self.vehicles = self.fleet_api.get_vehicles()
+            self._vin_index = {v.get('vin'): i for i, v in enumerate(self.vehicles or [])}
             
             if not self.vehicles:
                 console.print("[red]❌ Nie znaleziono żadnych pojazdów na koncie.[/red]")
@@ -416,6 +431,23 @@ class TeslaController:
         else:
             console.print(f"[red]Nieprawidłowy indeks pojazdu: {index}[/red]")
             return False
+
+    def select_vehicle_by_vin(self, vin: str) -> bool:
+        """
+        Wybiera pojazd o podanym VIN (pierwszy pojazd, jeśli VIN nie występuje na koncie)
+        
+        Args:
+            vin: VIN pojazdu
+            
+        Returns:
+            bool: True jeśli wybór udany
+        """
+        return self.select_vehicle(self._vin_index.get(vin, 0))
+    
+    @property
+    def uses_proxy(self) -> bool:
+        """Czy klient Fleet API kieruje komendy przez Tesla HTTP Proxy (fleet_api=None przed connect)"""
+        return bool(getattr(self.fleet_api, 'proxy_url', None))
     
     def wake_up_vehicle(self, use_proxy: bool = False) -> bool:
         """
@@ -505,6 +537,18 @@ class TeslaController:
         except Exception:
             return None
 
+    def is_online_light(self) -> bool:
+        """
+        Lekkie sprawdzenie czy wybrany pojazd jest online.
+        Używa listy pojazdów (/vehicles) - bez płatnego vehicle_data i bez budzenia.
+
+        Returns:
+            bool: True jeśli pojazd raportuje stan 'online'
+        """
+        if not self.current_vehicle:
+            return False
+        return self._refresh_vehicle_state() == 'online'
+
     def get_all_vehicles(self) -> List[Dict]:
         """
         Zwraca listę wszystkich pojazdów (kompatybilność z Worker Service)
@@ -514,12 +558,16 @@ class TeslaController:
         """
         return self.vehicles if hasattr(self, 'vehicles') and self.vehicles else []
     
-    def get_vehicle_status(self, vin: str = None) -> Optional[Dict[str, Any]]:
+    def get_vehicle_status(self, vin: str = None, endpoints: str = None) -> Optional[Dict[str, Any]]:
         """
         Pobiera podstawowe parametry pojazdu używając Fleet API z obsługą błędów autoryzacji
         BEZ BUDZENIA pojazdu gdy jest offline - sprawdza tylko stan taki jaki jest
         Gdy pojazd jest ONLINE - może "dotknąć" budzenia i pobrać pełne dane
         
+        Args:
+            vin: Nieużywany (pojazd z select_vehicle)
+            endpoints: Endpointy vehicle_data (domyślnie VEHICLE_STATUS_ENDPOINTS)
+        
         Returns:
             Dict zawierający status pojazdu
         """
@@ -553,18 +601,10 @@ class TeslaController:
 
             # Pojazd jest ONLINE - pobierz pełne dane pojazdu (bez komendy wake)
             
-            # Pobierz standardowe dane pojazdu
-            vehicle_data = self.fleet_api.get_vehicle_data(vehicle_id)
-            
-            # Pobierz dane lokalizacji (wymagają specjalnego parametru location_data)
-            location_data = self.fleet_api.get_vehicle_data(vehicle_id, "location_data")
-            
-            # Użyj danych lokalizacji jeśli dostępne
-            if location_data.get('drive_state', {}).get('latitude') is not None:
-                # Połącz dane - użyj drive_state z location_data dla GPS
-                vehicle_data['drive_state'] = location_data.get('drive_state', {})
-            else:
-                pass  # Brak danych GPS z API
+            # OPTYMALIZACJA: jedno żądanie vehicle_data z jawną listą endpointów zamiast
+            # osobnych odczytów danych standardowych i location_data (dane GPS w drive_state
+            # wymagają location_data) - każde wywołanie vehicle_data jest płatne i limitowane
+            vehicle_data = self.fleet_api.get_vehicle_data(vehicle_id, endpoints or VEHICLE_STATUS_ENDPOINTS)
             
             if not vehicle_data:
                 console.print("[red]Nie udało się pobrać danych pojazdu.[/red]")
@@ -874,7 +914,7 @@ class TeslaController:
         
         try:
             # Sprawdź czy proxy jest dostępny
-            use_proxy = bool(hasattr(self.fleet_api, 'proxy_url') and self.fleet_api.proxy_url)
+            use_proxy = self.uses_proxy
 
             if not self.wake_up_vehicle(use_proxy=use_proxy):
                 return False
@@ -919,6 +959,9 @@ class TeslaController:
         Returns:
             str: Czas w formacie HH:MM
         """
+        if 0 <= minutes < 1440:
+            return _MINUTES_TO_TIME[minutes]
+        # Poza dobą (np. end_time > 1440 ze starego formatu konwertera) - np. "25:00"
         hours = minutes // 60
         mins = minutes % 60
         return f"{hours:02d}:{mins:02d}"
@@ -982,7 +1025,7 @@ class TeslaController:
         
         try:
             # Sprawdź czy proxy jest dostępny (używamy dla wake_up i komendy)
-            use_proxy = bool(hasattr(self.fleet_api, 'proxy_url') and self.fleet_api.proxy_url)
+            use_proxy = self.uses_proxy
 
             # Wybudź pojazd z tym samym ustawieniem proxy co komenda (chyba że skip_wake=True)
             if not skip_wake:
@@ -1051,7 +1094,7 @@ class TeslaController:
         
         try:
             # Sprawdź czy proxy jest dostępny
-            use_proxy = bool(hasattr(self.fleet_api, 'proxy_url') and self.fleet_api.proxy_url)
+            use_proxy = self.uses_proxy
 
             if not self.wake_up_vehicle(use_proxy=use_proxy):
                 return False
@@ -1094,7 +1137,7 @@ class TeslaController:
 
         try:
             # Sprawdź czy proxy jest dostępny
-            use_proxy = bool(hasattr(self.fleet_api, 'proxy_url') and self.fleet_api.proxy_url)
+            use_proxy = self.uses_proxy
 
             if not self.wake_up_vehicle(use_proxy=use_proxy):
                 # Błąd odczytu (None), nie "brak harmonogramów" ([])
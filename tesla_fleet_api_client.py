@@ -6,9 +6,14 @@ Tesla Fleet API Client - Obsługa Fleet API z podpisanymi komendami
 import os
 import json
 import time
+import random
 import base64
 import hashlib
+import functools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry as UrllibRetry
+from urllib.parse import quote
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from cryptography.hazmat.primitives import hashes, serialization
@@ -53,6 +58,14 @@ class TeslaAuthenticationError(Exception):
             return 'invalid_grant' in error_msg or 'unauthorized' in error_msg
         return self.status_code == 403
 
+class TeslaRateLimitError(Exception):
+    """Wyjątek dla HTTP 429 z Tesla API (retry_after: sekundy z nagłówka Retry-After lub None)"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = 429
+        self.retry_after = retry_after
+
 class TeslaFleetAPIClient:
     """Klient Tesla Fleet API z obsługą podpisanych komend"""
     
@@ -96,6 +109,11 @@ class TeslaFleetAPIClient:
         self.token_expires_at = None
         self.private_key = None
         
+        # OPTYMALIZACJA: warunkowe GET (ETag / If-None-Match) - za flagą, bo obsługa
+        # nagłówków cache zależy od endpointu Fleet API. ścieżka -> (ETag, odpowiedź)
+        self.conditional_get = os.getenv('TESLA_CONDITIONAL_GET', 'false').lower() == 'true'
+        self._etag_cache: Dict[str, tuple] = {}
+        
         # Ładowanie klucza prywatnego
         self._load_private_key()
         
@@ -173,7 +191,7 @@ class TeslaFleetAPIClient:
             }
             
             console.print("[yellow]🔄 Wymiana kodu autoryzacji na token...[/yellow]")
-            response = requests.post(self.token_url, data=data, timeout=30)
+            response = self._http.post(self.token_url, data=data, timeout=30)
             
             if response.status_code == 400:
                 try:
@@ -444,7 +462,7 @@ class TeslaFleetAPIClient:
             }
             
             console.print("[yellow]🔄 Odświeżanie tokena dostępu...[/yellow]")
-            response = requests.post(self.token_url, data=data, timeout=30)
+            response = self._http.post(self.token_url, data=data, timeout=30)
             
             if response.status_code == 401:
                 console.print("[red]🚫 Refresh token jest nieważny - wymagana ponowna autoryzacja[/red]")
@@ -580,6 +598,23 @@ class TeslaFleetAPIClient:
         
         return status
     
+    @functools.cached_property
+    def _http(self) -> requests.Session:
+        """
+        Współdzielona sesja HTTP (keep-alive) dla Fleet API, Tesla HTTP Proxy
+        i endpointu tokenów OAuth.
+
+        Kolejne komendy (np. seria add_charge_schedule) używają tego samego
+        połączenia TLS zamiast zestawiać nowe przy każdym żądaniu. Retry urllib3
+        tylko przy nawiązywaniu połączenia - komendy nie są idempotentne.
+        """
+        session = requests.Session()
+        # Pula per host: Fleet API, proxy (localhost) i serwer autoryzacji
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                              max_retries=UrllibRetry(total=2, connect=2, read=0, status=0, backoff_factor=0.5))
+        session.mount('https://', adapter)
+        return session
+
     def _make_signed_request(self, method: str, path: str, data: Dict = None, retry_auth: bool = True, use_proxy: bool = False) -> Dict:
         """
         Tworzy i wysyła podpisane żądanie do Tesla Fleet API lub przez proxy
@@ -624,10 +659,17 @@ class TeslaFleetAPIClient:
             'Content-Type': 'application/json'
         }
         
+        cached = None
+        conditional = method == 'GET' and self.conditional_get
+        if conditional:
+            cached = self._etag_cache.get(url)
+            if cached:
+                headers['If-None-Match'] = cached[0]
+        
         try:
             console.print(f"Wysyłanie żądania {method} {path} {url_info}")
             
-            response = requests.request(
+            response = self._http.request(
                 method,
                 url,
                 headers=headers,
@@ -636,6 +678,10 @@ class TeslaFleetAPIClient:
                 verify=verify_ssl
             )
 
+            # 304 Not Modified - dane bez zmian, zwróć zapamiętaną odpowiedź bez parsowania
+            if cached and response.status_code == 304:
+                return cached[1]
+
             # Debugging: wyświetl odpowiedź
             # console.print(f"Odpowiedź ({response.status_code}): {response.text}")
 
@@ -675,6 +721,16 @@ class TeslaFleetAPIClient:
                 
                 raise TeslaAuthenticationError(error_msg, status_code=403, error_data=error_data)
             
+            elif response.status_code == 429:
+                # Limit żądań - wołający decyduje o ponowieniu (tylko komendy idempotentne)
+                retry_after = response.headers.get('Retry-After')
+                try:
+                    retry_after = float(retry_after) if retry_after is not None else None
+                except ValueError:
+                    retry_after = None  # format HTTP-date - wołający użyje własnego backoffu
+                console.print(f"[yellow]⏳ Limit żądań Tesla API (429): {method} {path}, Retry-After={retry_after}[/yellow]")
+                raise TeslaRateLimitError(f"HTTP 429: limit żądań dla {path}", retry_after=retry_after)
+            
             elif response.status_code >= 400:
                 # Inne błędy HTTP - szczegółowe logowanie
                 try:
@@ -690,10 +746,15 @@ class TeslaFleetAPIClient:
                     console.print(f"[red]📄 Odpowiedź: {response.text[:300]}[/red]")
             
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if conditional:
+                etag = response.headers.get('ETag')
+                if etag:
+                    self._etag_cache[url] = (etag, result)
+            return result
             
-        except TeslaAuthenticationError:
-            # Przepuść błędy autoryzacji bez modyfikacji
+        except (TeslaAuthenticationError, TeslaRateLimitError):
+            # Przepuść błędy autoryzacji i limitu żądań bez modyfikacji
             raise
         except requests.exceptions.SSLError as e:
             if use_proxy:
@@ -770,7 +831,8 @@ class TeslaFleetAPIClient:
         try:
             path = f'/api/1/vehicles/{vehicle_id}/vehicle_data'
             if endpoints:
-                path += f'?endpoints={endpoints}'
+                # Lista endpointów rozdzielona ';' musi być zakodowana (%3B)
+                path += f'?endpoints={quote(endpoints, safe="")}'
             response = self._make_signed_request('GET', path)
             return response.get('response', {})
         except TeslaAuthenticationError as e:
@@ -990,10 +1052,31 @@ class TeslaFleetAPIClient:
             console.print(f"[red]Błąd dodawania harmonogramu ładowania: {e}[/red]")
             return False
     
+    RATE_LIMIT_RETRIES = 2               # ponowienia komendy idempotentnej po HTTP 429
+    RATE_LIMIT_BACKOFF_MAX_SECONDS = 30  # górny limit oczekiwania (także dla Retry-After)
+
+    def _rate_limit_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """
+        Czas oczekiwania przed ponowieniem po HTTP 429
+        
+        Args:
+            attempt: Numer ponowienia (od 0)
+            retry_after: Wartość Retry-After z odpowiedzi (None - backoff wykładniczy z jitterem)
+            
+        Returns:
+            float: Sekundy oczekiwania (najwyżej RATE_LIMIT_BACKOFF_MAX_SECONDS)
+        """
+        if retry_after is not None:
+            return min(self.RATE_LIMIT_BACKOFF_MAX_SECONDS, max(0.0, retry_after))
+        return min(self.RATE_LIMIT_BACKOFF_MAX_SECONDS, 2.0 ** attempt) * (0.5 + random.random() / 2)
+
     def remove_charge_schedule(self, vehicle_id: str, schedule_id: int, use_proxy: bool = False) -> bool:
         """
         Usuwa harmonogram ładowania
         WAŻNE: Ta komenda musi być wysłana przez Tesla HTTP Proxy
+        
+        Usunięcie po ID jest idempotentne (brak harmonogramu = sukces), więc po
+        HTTP 429 komenda jest ponawiana z backoffem (najwyżej RATE_LIMIT_RETRIES razy).
         """
         try:
             data = {'id': schedule_id}
@@ -1002,8 +1085,18 @@ class TeslaFleetAPIClient:
             if not use_proxy:
                 console.print("[yellow]OSTRZEŻENIE: remove_charge_schedule wymaga proxy. Wymuszono użycie proxy.[/yellow]")
                 use_proxy = True
-                
-            resp = self._make_signed_request('POST', f'/api/1/vehicles/{vehicle_id}/command/remove_charge_schedule', data, use_proxy=use_proxy)
+            
+            path = f'/api/1/vehicles/{vehicle_id}/command/remove_charge_schedule'
+            for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+                try:
+                    resp = self._make_signed_request('POST', path, data, use_proxy=use_proxy)
+                    break
+                except TeslaRateLimitError as rate_error:
+                    if attempt == self.RATE_LIMIT_RETRIES:
+                        raise
+                    delay = self._rate_limit_delay(attempt, rate_error.retry_after)
+                    console.print(f"[yellow]⏳ Ponowienie remove_charge_schedule za {delay:.1f}s[/yellow]")
+                    time.sleep(delay)
             ok, reason = self._command_result(resp, 'remove_charge_schedule')
             if not ok and any(p in reason.lower() for p in self._ALREADY_SATISFIED_REASONS):
                 # Harmonogram już nie istnieje (np. wykonany one_time) — cel osiągnięty
@@ -1523,7 +1616,7 @@ class TeslaFleetAPIClient:
                 }
                 
                 console.print("[yellow]🔄 [MIGRACJA] Generowanie nowego access tokenu z legacy refresh...[/yellow]")
-                response = requests.post(self.token_url, data=data, timeout=30)
+                response = self._http.post(self.token_url, data=data, timeout=30)
                 
                 if response.status_code == 401:
                     console.print("[red]❌ [MIGRACJA] Legacy refresh token nieważny[/red]")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Wspólne fixture testów jednostkowych: monitor bez konstruktora i atrapa TeslaController.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from cloud_tesla_monitor import CloudTeslaMonitor
+
+
+@pytest.fixture
+def monitor() -> CloudTeslaMonitor:
+    """Monitor bez konstruktora (bez GCP, proxy i sieci) - pola ustawia test."""
+    return CloudTeslaMonitor.__new__(CloudTeslaMonitor)
+
+
+@pytest.fixture
+def controller_stub():
+    """Fabryka atrapy TeslaController: Fleet API bez proxy, udane wake_up, format HH:MM."""
+
+    def make(**attrs) -> SimpleNamespace:
+        defaults = dict(
+            fleet_api=SimpleNamespace(proxy_url=None),
+            uses_proxy=False,
+            wake_up_vehicle=lambda use_proxy=False: True,
+            minutes_to_time=lambda minutes: f"{minutes // 60:02d}:{minutes % 60:02d}",
+        )
+        defaults.update(attrs)
+        return SimpleNamespace(**defaults)
+
+    return make
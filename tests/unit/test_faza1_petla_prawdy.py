@@ -6,9 +6,13 @@ Testy jednostkowe Fazy 1 — "pętla zwrotna prawdy":
 - hash harmonogramu zatwierdzany dopiero po sukcesie
 - retry-budget (3 próby + cooldown) dla aplikacji harmonogramu
 - rekoncyliacja po treści (idempotencja retry)
+- klient Fleet API: warunkowe GET (ETag), ponowienia po HTTP 429, klasyfikacja błędów komend
+- synchronizacja i reset harmonogramów HOME w pojeździe
 """
 
+import logging
 import os
+import random
 import sys
 import time
 import types
@@ -16,9 +20,10 @@ import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
+import cloud_tesla_monitor
 from tesla_fleet_api_client import TeslaFleetAPIClient
 from cloud_tesla_monitor import CloudTeslaMonitor
-from tesla_controller import ChargeSchedule
+from tesla_controller import ChargeSchedule, TeslaController
 
 
 # ========== Helpery ==========
@@ -209,5 +214,327 @@ class TestReconciliation:
         assert m._schedule_content_matches(vehicle_schedule, self._desired(120, 300, enabled=True)) is False
 
 
+# ========== 6. Klient Fleet API: warunkowe GET i limit zapytań ==========
+
+class TestConditionalGet:
+    def _client(self, monkeypatch, responses):
+        import tesla_fleet_api_client as fleet
+        client = fleet.TeslaFleetAPIClient.__new__(fleet.TeslaFleetAPIClient)
+        client.base_url = "https://fleet.example"
+        client.proxy_url = None
+        client.access_token = "token"
+        client.conditional_get = True
+        client._etag_cache = {}
+        monkeypatch.setattr(client, '_ensure_valid_token', lambda: True)
+        sent = []
+
+        def fake_request(method, url, headers, **kwargs):
+            sent.append(dict(headers))
+            return responses.pop(0)
+        client._http = types.SimpleNamespace(request=fake_request)
+        return client, sent
+
+    @staticmethod
+    def _response(status, payload=None, etag=None):
+        return types.SimpleNamespace(status_code=status, headers={'ETag': etag} if etag else {},
+                               json=lambda: payload, raise_for_status=lambda: None)
+
+    def test_304_zwraca_zapamietana_odpowiedz(self, monkeypatch):
+        payload = {'response': {'charge_state': {'battery_level': 70}}}
+        client, sent = self._client(monkeypatch, [
+            self._response(200, payload, etag='"v1"'),
+            self._response(304),
+        ])
+        path = '/api/1/vehicles/VIN/vehicle_data'
+        assert client._make_signed_request('GET', path) == payload
+        assert client._make_signed_request('GET', path) == payload
+        assert 'If-None-Match' not in sent[0]
+        assert sent[1]['If-None-Match'] == '"v1"'
+
+
+class TestRemoveScheduleRateLimit:
+    def _client(self, monkeypatch, statuses):
+        import tesla_fleet_api_client as fleet
+        client = fleet.TeslaFleetAPIClient.__new__(fleet.TeslaFleetAPIClient)
+        client.proxy_url = "https://localhost:4443"
+        client.access_token = "token"
+        client.conditional_get = False
+        monkeypatch.setattr(client, '_ensure_valid_token', lambda: True)
+        responses = [types.SimpleNamespace(status_code=status, headers=headers, reason="",
+                                     json=lambda: {'response': {'result': True}},
+                                     raise_for_status=lambda: None)
+                     for status, headers in statuses]
+        client._http = types.SimpleNamespace(request=lambda *args, **kwargs: responses.pop(0))
+        sleeps = []
+        monkeypatch.setattr(fleet.time, 'sleep', sleeps.append)
+        return client, sleeps
+
+    def test_retry_after_respektowany(self, monkeypatch):
+        client, sleeps = self._client(monkeypatch, [(429, {'Retry-After': '4'}), (200, {})])
+        assert client.remove_charge_schedule('VIN', 7, use_proxy=True) is True
+        assert sleeps == [4.0]
+
+    def test_limit_ponowien(self, monkeypatch):
+        client, sleeps = self._client(monkeypatch, [(429, {})] * 3)
+        assert client.remove_charge_schedule('VIN', 7, use_proxy=True) is False
+        assert len(sleeps) == client.RATE_LIMIT_RETRIES
+        assert all(0.5 * 2 ** i <= s <= 2 ** i for i, s in enumerate(sleeps))
+
+
+class TestCommandErrorHint:
+    def test_klasyfikacja(self):
+        hint = cloud_tesla_monitor._command_error_hint
+        assert hint(Exception("HTTP 401")) == hint(Exception("Unauthorized")) == cloud_tesla_monitor._HINT_AUTH
+        assert hint(Exception("412 Precondition")) == hint(Exception("Command NOT SUPPORTED")) \
+            == cloud_tesla_monitor._HINT_UNSUPPORTED
+        assert hint(Exception("Read Timeout")).startswith("⏰")
+        assert hint(Exception("HTTP 500")) is None
+
+    def test_priorytet_przy_wielu_slowach_kluczowych(self):
+        hint = cloud_tesla_monitor._command_error_hint
+        assert hint(Exception("Read timeout after 412 Precondition")) == cloud_tesla_monitor._HINT_UNSUPPORTED
+        assert hint(Exception("timeout; 412; HTTP 401 Unauthorized")) == cloud_tesla_monitor._HINT_AUTH
+
+
+# ========== 7. Hash planu i różnica harmonogramów ==========
+
+class TestScheduleHashMemo:
+    @staticmethod
+    def _plan(*slots):
+        return {'data': {'chargingSchedule': [
+            {'start_time': s, 'end_time': e, 'charge_amount': a} for s, e, a in slots]}}
+
+    def test_ten_sam_plan_bez_ponownego_hashowania(self, monitor, monkeypatch):
+        plan = self._plan(("2025-06-02T23:00", "2025-06-03T01:00", 10.0))
+        first = monitor._generate_schedule_hash(plan)
+        calls = []
+        monkeypatch.setattr(cloud_tesla_monitor.json, 'dumps',
+                            lambda *a, **k: calls.append(a) or "")
+        assert monitor._generate_schedule_hash(plan) == first
+        assert calls == []
+
+    def test_zmiana_slotu_zmienia_hash(self, monitor):
+        a = monitor._generate_schedule_hash(self._plan(("2025-06-02T23:00", "2025-06-03T01:00", 10.0)))
+        b = monitor._generate_schedule_hash(self._plan(("2025-06-02T23:00", "2025-06-03T01:00", 12.0)))
+        assert a != b
+        # kolejność slotów w odpowiedzi API nie wpływa na hash
+        x = monitor._generate_schedule_hash(self._plan(("1", "2", 1), ("3", "4", 2)))
+        y = monitor._generate_schedule_hash(self._plan(("3", "4", 2), ("1", "2", 1)))
+        assert x == y
+
+
+class TestScheduleDiffSets:
+    def test_zgodnosc_z_porownaniem_parami(self, monitor):
+        rng = random.Random(7)
+        for _ in range(200):
+            desired = [ChargeSchedule(start_time=rng.choice([60, 120]), end_time=rng.choice([90, 180]),
+                                      enabled=rng.random() < 0.8, one_time=rng.random() < 0.5)
+                       for _ in range(rng.randint(0, 4))]
+            vehicle = []
+            for i in range(rng.randint(0, 4)):
+                v = {'id': i, 'start_time': rng.choice([60, 120]), 'end_time': rng.choice([90, 180]),
+                     'enabled': rng.random() < 0.8}
+                if rng.random() < 0.5:
+                    v['one_time'] = rng.random() < 0.5
+                vehicle.append(v)
+            assert monitor._missing_in_vehicle(vehicle, desired) == [
+                s for s in desired if not any(monitor._schedule_content_matches(v, s) for v in vehicle)]
+            assert monitor._not_in_plan(vehicle, desired) == [
+                v for v in vehicle if not any(monitor._schedule_content_matches(v, s) for s in desired)]
+
+
+# ========== 8. Synchronizacja harmonogramów w pojeździe ==========
+
+class TestEmptyPlanSkipsProxy:
+    def _monitor(self, monitor, converted):
+        monitor.smart_proxy_mode = True
+        monitor.proxy_available = True
+        monitor.proxy_running = False
+        monitor.acquired = []
+        monitor._acquire_proxy = lambda: monitor.acquired.append(True) or False
+        monitor._convert_off_peak_to_tesla_schedules = lambda data, vin: converted
+        monitor._get_home_schedules_from_tesla = lambda vin: None
+        return monitor
+
+    def test_pusty_plan_bez_startu_proxy(self, monitor):
+        m = self._monitor(monitor, [])
+        assert m._manage_tesla_charging_schedules({}, 'VIN0000') is True
+        assert m.acquired == []
+
+    def test_niepusty_plan_uruchamia_proxy(self, monitor):
+        m = self._monitor(monitor, [ChargeSchedule(enabled=True, start_time=60, end_time=120)])
+        assert m._manage_tesla_charging_schedules({}, 'VIN0000') is False
+        assert m.acquired == [True]
+
+
+class TestAddSchedulesPacing:
+    def _monitor(self, monitor, controller_stub, monkeypatch, results):
+        sleeps = []
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'sleep', sleeps.append)
+        monkeypatch.setattr(cloud_tesla_monitor.random, 'uniform', lambda low, high: high)
+        answers = iter(results)
+        monitor.tesla_controller = controller_stub(
+            add_charge_schedule=lambda schedule, skip_wake=False: next(answers))
+        schedules = [ChargeSchedule(start_time=60 * h, end_time=60 * h + 30) for h in range(1, len(results) + 1)]
+        return monitor, schedules, sleeps
+
+    def test_bez_opoznien_gdy_wszystko_sie_udaje(self, monitor, controller_stub, monkeypatch):
+        m, schedules, sleeps = self._monitor(monitor, controller_stub, monkeypatch, [True, True, True])
+        m._get_home_schedules_from_tesla = lambda vin: None
+        assert m._add_schedules_to_tesla(schedules, 'VIN1') is True
+        assert sleeps == [2]  # tylko przed weryfikacją
+
+    def test_backoff_po_kolejnych_bledach(self, monitor, controller_stub, monkeypatch):
+        m, schedules, sleeps = self._monitor(monitor, controller_stub, monkeypatch, [False, False, False])
+        assert m._add_schedules_to_tesla(schedules, 'VIN1') is False
+        assert sleeps == [3, 6]
+
+
+class TestRemoveSchedulesBatchVerify:
+    def test_jeden_odczyt_kontrolny_po_serii_bledow(self, monitor, controller_stub):
+        reads = []
+        monitor.tesla_controller = controller_stub(
+            remove_charge_schedule=lambda schedule_id, skip_wake=False: schedule_id == 1)
+        monitor._get_home_schedules_from_tesla = lambda vin: reads.append(vin) or [{'id': 3}]
+        old = [{'id': 1}, {'id': 2}, {'id': 3}]
+        assert monitor._remove_old_schedules_from_tesla(old, 'VIN1') == 2
+        assert reads == ['VIN1']
+
+
+class TestDisableHomeSchedules:
+    def _monitor(self, monitor, controller_stub, schedules, calls):
+        monitor.tesla_controller = controller_stub(
+            default_latitude=52.0,
+            default_longitude=21.0,
+            wake_up_vehicle=lambda use_proxy=False: calls.append('wake') or True,
+            add_charge_schedule=lambda schedule, skip_wake=False: calls.append(schedule.id) or True,
+        )
+        monitor._get_home_schedules_from_tesla = lambda vin: schedules
+        return monitor
+
+    def test_wszystkie_wylaczone_bez_wake_up(self, monitor, controller_stub):
+        calls = []
+        m = self._monitor(monitor, controller_stub, [{'id': 1, 'enabled': False}, {'id': 2, 'enabled': False}], calls)
+        assert m._disable_home_schedules_from_tesla('VIN1') is True
+        assert calls == []
+
+    def test_wylacza_tylko_wlaczone(self, monitor, controller_stub):
+        calls = []
+        m = self._monitor(monitor, controller_stub, [{'id': 1, 'enabled': False}, {'id': 2, 'enabled': True}], calls)
+        assert m._disable_home_schedules_from_tesla('VIN1') is True
+        assert calls == ['wake', 2]
+
+
+class TestScheduleSyncSummaryRecord:
+    def test_jeden_wpis_info_z_json_fields(self, monitor, caplog):
+        monitor.smart_proxy_mode = True
+        monitor.proxy_available = True
+        monitor.proxy_running = True
+        monitor.tesla_controller = TeslaController.__new__(TeslaController)
+        monitor.tesla_controller.fleet_api = None
+        monitor._acquire_proxy = lambda: True
+        monitor._release_proxy = lambda: None
+        monitor._convert_off_peak_to_tesla_schedules = lambda data, vin: [
+            ChargeSchedule(enabled=True, start_time=60, end_time=120)]
+        monitor._get_home_schedules_from_tesla = lambda vin: []
+        monitor._get_protected_schedule_ids = lambda vin: set()
+        monitor._add_schedules_to_tesla = lambda schedules, vin: True
+        monitor._log_event = lambda *args, **kwargs: None
+        monitor._align_charging_with_plan = lambda *args: None
+        with caplog.at_level(logging.INFO, logger=cloud_tesla_monitor.__name__):
+            assert monitor._manage_tesla_charging_schedules({}, 'VIN0000') is True
+        records = [r for r in caplog.records if r.name.startswith(cloud_tesla_monitor.__name__)]
+        assert len(records) == 1
+        fields = records[0].json_fields
+        assert fields['event'] == 'schedule_sync_completed'
+        assert fields['added'] == [(60, 120)] and fields['final_schedules'] == 1
+
+    def test_final_count_tylko_z_potwierdzonymi_usunieciami(self, monitor):
+        monitor.smart_proxy_mode = True
+        monitor.proxy_available = True
+        monitor.proxy_running = True
+        monitor.tesla_controller = TeslaController.__new__(TeslaController)
+        monitor.tesla_controller.fleet_api = None
+        monitor._acquire_proxy = lambda: True
+        monitor._release_proxy = lambda: None
+        monitor._convert_off_peak_to_tesla_schedules = lambda data, vin: [
+            ChargeSchedule(enabled=True, start_time=60, end_time=120)]
+        monitor._get_home_schedules_from_tesla = lambda vin: [
+            {'id': 1, 'start_time': 300, 'end_time': 360, 'enabled': True},
+            {'id': 2, 'start_time': 400, 'end_time': 460, 'enabled': True}]
+        monitor._get_protected_schedule_ids = lambda vin: set()
+        monitor._add_schedules_to_tesla = lambda schedules, vin: True
+        monitor._remove_old_schedules_from_tesla = lambda old, vin: 1
+        events = []
+        monitor._log_event = lambda *args, **kwargs: events.append(kwargs['extra_data'])
+        monitor._align_charging_with_plan = lambda *args: None
+        assert monitor._manage_tesla_charging_schedules({}, 'VIN0000') is False
+        assert events[0]['removed_schedules'] == 1 and events[0]['final_schedules'] == 2
+
+
+class TestErrorExcInfo:
+    def test_blad_zarzadzania_jednym_wpisem_z_exc_info(self, monitor, caplog):
+        monitor.smart_proxy_mode = monitor.proxy_available = monitor.proxy_running = False
+
+        def boom(data, vin):
+            raise ValueError("zły plan")
+
+        monitor._convert_off_peak_to_tesla_schedules = boom
+        monitor._log_event = lambda *args, **kwargs: None
+        with caplog.at_level(logging.ERROR, logger=cloud_tesla_monitor.__name__):
+            assert monitor._manage_tesla_charging_schedules({}, 'VIN0000') is False
+        records = [r for r in caplog.records if r.name.startswith(cloud_tesla_monitor.__name__)]
+        assert len(records) == 1
+        assert records[0].exc_info[0] is ValueError
+
+
+class TestSelectVehicleByVin:
+    def test_wybor_po_vin_i_fallback_na_pierwszy(self):
+        c = TeslaController.__new__(TeslaController)
+        c.vehicles = [{'vin': 'VIN_A'}, {'vin': 'VIN_B'}]
+        c._vin_index = {'VIN_A': 0, 'VIN_B': 1}
+        assert c.select_vehicle_by_vin('VIN_B') is True
+        assert c.current_vehicle['vin'] == 'VIN_B'
+        assert c.select_vehicle_by_vin('VIN_X') is True
+        assert c.current_vehicle['vin'] == 'VIN_A'
+
+
+# ========== 9. Reset harmonogramów HOME ==========
+
+class TestResetOverlap:
+    def _monitor(self, monitor, controller_stub, schedules):
+        monitor._initialized = True
+        monitor.proxy_running = True
+        monitor.tesla_controller = controller_stub(connect=lambda: True, vehicles=[{'vin': 'VIN1234'}])
+        monitor.calls = []
+        monitor._start_proxy_on_demand = lambda: monitor.calls.append('start') or True
+        monitor._stop_proxy = lambda: monitor.calls.append('stop')
+        monitor._get_home_schedules_from_tesla = lambda vin: monitor.calls.append('fetch') or schedules
+        return monitor
+
+    def test_proxy_startuje_rownolegle_i_jest_zwalniany_bez_harmonogramow(self, monitor, controller_stub):
+        m = self._monitor(monitor, controller_stub, [])
+        result = m.reset_tesla_home_schedules()
+        assert result['success'] is True and result['schedules_found'] == 0
+        assert sorted(m.calls) == ['fetch', 'start']
+        assert m._proxy_refcount == 0 and m._proxy_idle_deadline is not None
+
+    def test_blad_odczytu_zwalnia_proxy(self, monitor, controller_stub):
+        m = self._monitor(monitor, controller_stub, None)
+        assert m.reset_tesla_home_schedules()['success'] is False
+        assert m._proxy_refcount == 0 and m._proxy_idle_deadline is not None
+
+    def test_usuwanie_sekwencyjne_bez_dodatkowych_ponowien(self, monitor, controller_stub):
+        m = self._monitor(monitor, controller_stub, [{'id': 1}, {'id': 2}, {'id': 3}])
+        m.last_tesla_schedules_home = {}
+        m._log_event = lambda *args, **kwargs: None
+        m.tesla_controller.wake_up_vehicle = lambda use_proxy=False: m.calls.append('wake') or True
+        m.tesla_controller.remove_charge_schedule = (
+            lambda schedule_id, skip_wake=False: m.calls.append(schedule_id) or schedule_id != 2)
+        result = m.reset_tesla_home_schedules()
+        assert result['schedules_removed'] == 2 and result['schedules_failed'] == 1
+        assert m.calls[m.calls.index('wake'):] == ['wake', 1, 2, 3, 'fetch']
+
+
 if __name__ == '__main__':
     sys.exit(pytest.main([__file__, '-v']))
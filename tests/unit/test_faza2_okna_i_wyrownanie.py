@@ -6,6 +6,7 @@ Testy jednostkowe Fazy 2:
   okno-strażnik 23:58-23:59 przy pustym planie
 - fallback OFF PEAK API: format ISO + okno nocne
 - klient: charge_start / charge_stop z idempotentnymi reasons
+- stan proxy kontrolera (uses_proxy) używany przy wyrównaniu
 """
 
 import os
@@ -19,7 +20,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from tesla_fleet_api_client import TeslaFleetAPIClient
 from cloud_tesla_monitor import CloudTeslaMonitor
-from tesla_controller import ChargeSchedule
+from tesla_controller import ChargeSchedule, TeslaController
 
 WARSAW = pytz.timezone('Europe/Warsaw')
 VIN = "TESTVIN1234567890"
@@ -215,7 +216,7 @@ class TestAlignCharging:
             charge_start=lambda vin, use_proxy=None: calls.append('start') or True,
             charge_stop=lambda vin, use_proxy=None: calls.append('stop') or True,
         )
-        m.tesla_controller = types.SimpleNamespace(fleet_api=fleet,
+        m.tesla_controller = types.SimpleNamespace(fleet_api=fleet, uses_proxy=True,
                                                    minutes_to_time=lambda x: str(x))
         m._log_event = lambda **kw: None
         m._has_active_special_session = lambda vin: False
@@ -286,5 +287,18 @@ class TestAlignCharging:
         assert calls == []
 
 
+# ========== 6. Proxy kontrolera (uses_proxy) ==========
+
+class TestUsesProxy:
+    def test_stan_proxy_kontrolera(self):
+        c = TeslaController.__new__(TeslaController)
+        c.fleet_api = None
+        assert c.uses_proxy is False
+        c.fleet_api = types.SimpleNamespace(proxy_url=None)
+        assert c.uses_proxy is False
+        c.fleet_api.proxy_url = "https://localhost:4443"
+        assert c.uses_proxy is True
+
+
 if __name__ == '__main__':
     sys.exit(pytest.main([__file__, '-v']))
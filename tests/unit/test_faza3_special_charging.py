@@ -3,6 +3,7 @@
 Testy jednostkowe Fazy 3 (special charging):
 - deterministyczny session_id dla need (datetime i string)
 - ochrona harmonogramów special w rekoncyliacji monitora
+- wsadowe aktualizacje Firestore przy czyszczeniu sesji
 """
 
 import os
@@ -77,5 +78,37 @@ class TestProtectedSchedulesInReconciliation:
         assert [c['id'] for c in to_remove] == [99]
 
 
+class TestFirestoreBatchUpdates:
+    def _monitor(self, monitor, fail_on_commit=None):
+        commits = []
+
+        class Batch:
+            def __init__(self):
+                self.ops = []
+
+            def update(self, ref, fields):
+                self.ops.append(ref)
+
+            def commit(self):
+                if len(commits) == fail_on_commit:
+                    raise RuntimeError("unavailable")
+                commits.append(self.ops)
+
+        monitor.__dict__['firestore_client'] = types.SimpleNamespace(batch=Batch)
+        return monitor, commits
+
+    def test_podzial_na_commity_po_limicie(self, monitor, monkeypatch):
+        monkeypatch.setattr(CloudTeslaMonitor, 'FIRESTORE_BATCH_LIMIT', 2)
+        m, commits = self._monitor(monitor)
+        assert m._commit_firestore_updates([(i, {}) for i in range(5)]) == 5
+        assert commits == [[0, 1], [2, 3], [4]]
+
+    def test_blad_commitu_zwraca_zapisany_prefiks(self, monitor, monkeypatch):
+        monkeypatch.setattr(CloudTeslaMonitor, 'FIRESTORE_BATCH_LIMIT', 2)
+        m, commits = self._monitor(monitor, fail_on_commit=1)
+        assert m._commit_firestore_updates([(i, {}) for i in range(5)]) == 2
+        assert commits == [[0, 1]]
+
+
 if __name__ == '__main__':
     sys.exit(pytest.main([__file__, '-v']))
@@ -3,19 +3,25 @@
 Testy jednostkowe Fazy 5:
 - nakładanie okien przez północ (segmentowo)
 - peak hours następnego dnia dla slotów przez północ
+- współrzędne HOME z env, czas warszawski w logach, interwał monitorowania dnia/nocy
+- nakładanie harmonogramów (sweep line), filtr HOME po odległości, format HH:MM
 """
 
+import logging
 import os
+import random
 import sys
+import types
 import pytest
 import pytz
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
+import cloud_tesla_monitor
 from cloud_tesla_monitor import CloudTeslaMonitor
 from cloud_tesla_worker import WorkerHealthCheckHandler
-from tesla_controller import ChargeSchedule
+from tesla_controller import ChargeSchedule, TeslaController
 
 WARSAW = pytz.timezone('Europe/Warsaw')
 
@@ -82,5 +88,164 @@ class TestPeakHoursNextDay:
         assert h._calculate_peak_collision(start, end) == pytest.approx(2.0)
 
 
+class TestEnvFloat:
+    def test_bledna_wspolrzedna_nie_przerywa_importu(self, monkeypatch, caplog):
+        monkeypatch.setenv('HOME_LATITUDE', '52,33')
+        with caplog.at_level('WARNING'):
+            assert cloud_tesla_monitor._env_float('HOME_LATITUDE', 52.334215) == 52.334215
+        assert 'HOME_LATITUDE' in caplog.text
+
+    def test_poprawna_wartosc_z_env(self, monkeypatch):
+        monkeypatch.setenv('HOME_LONGITUDE', '21.5')
+        assert cloud_tesla_monitor._env_float('HOME_LONGITUDE', 20.937516) == 21.5
+
+    def test_brak_zmiennej_zwraca_domyslna(self, monkeypatch):
+        monkeypatch.delenv('HOME_LONGITUDE', raising=False)
+        assert cloud_tesla_monitor._env_float('HOME_LONGITUDE', 20.937516) == 20.937516
+
+
+class TestEnvInt:
+    def test_bledna_wartosc_nie_przerywa_importu(self, monkeypatch, caplog):
+        monkeypatch.setenv('TESLA_PROXY_IDLE_TTL_SECONDS', '10m')
+        with caplog.at_level('WARNING'):
+            assert cloud_tesla_monitor._env_int('TESLA_PROXY_IDLE_TTL_SECONDS', 60) == 60
+        assert 'TESLA_PROXY_IDLE_TTL_SECONDS' in caplog.text
+
+    def test_poprawna_wartosc_z_env(self, monkeypatch):
+        monkeypatch.setenv('TESLA_VEHICLE_DATA_DAILY_BUDGET', '150')
+        assert cloud_tesla_monitor._env_int('TESLA_VEHICLE_DATA_DAILY_BUDGET', 200) == 150
+
+    def test_brak_zmiennej_zwraca_domyslna(self, monkeypatch):
+        monkeypatch.delenv('CASE_B_BACKOFF_MAX_SECONDS', raising=False)
+        assert cloud_tesla_monitor._env_int('CASE_B_BACKOFF_MAX_SECONDS', 3600) == 3600
+
+
+class TestWarsawTimeFilter:
+    def test_czas_jako_atrybut_rekordu_bez_zmiany_wiadomosci(self, caplog):
+        import re
+        with caplog.at_level('INFO', logger=cloud_tesla_monitor.tlogger.name):
+            cloud_tesla_monitor.tlogger.info("📋 Harmonogram #%s", 1)
+        record = caplog.records[-1]
+        assert record.getMessage() == "📋 Harmonogram #1"
+        assert re.fullmatch(r"\[\d{2}:\d{2}\] ", record.warsaw_time)
+        assert cloud_tesla_monitor._log_handler.format(record).endswith(f"{record.warsaw_time}📋 Harmonogram #1")
+
+    def test_formatter_bez_atrybutu_dla_zwyklego_loggera(self):
+        record = logging.LogRecord('x', logging.INFO, __file__, 1, "wiadomość", None, None)
+        assert cloud_tesla_monitor._log_handler.format(record).endswith(" - INFO - wiadomość")
+
+
+class TestIntervalLut:
+    @pytest.mark.parametrize("hour", range(24))
+    def test_tablica_zgodna_z_oknem_dziennym(self, monitor, hour):
+        monitor._get_warsaw_time = lambda: datetime(2025, 6, 2, hour, 30)
+        assert monitor._get_monitoring_schedule_interval() == (15 if 7 <= hour <= 22 else 60)
+
+    def test_podany_czas_bez_odczytu_zegara(self, monitor):
+        monitor._get_warsaw_time = lambda: pytest.fail("zegar nie powinien być odczytany")
+        assert monitor._get_monitoring_schedule_interval(datetime(2025, 6, 2, 3, 0)) == 60
+
+
+class TestSleepRespect:
+    VIN = "TESTVIN1234567890"
+
+    def _monitor(self, monitor, since):
+        monitor.last_vehicle_state = {self.VIN: {
+            'online': False, 'is_charging_ready': False, 'location_status': 'HOME',
+            'state_since': since.isoformat()}}
+        return monitor
+
+    def test_stabilny_sen_w_nocy_pomija_wybudzenie(self, monitor, monkeypatch):
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'sleep_respect', True)
+        m = self._monitor(monitor, datetime(2025, 6, 2, 21, 0))
+        assert m._should_let_vehicle_sleep({'vin': self.VIN}, datetime(2025, 6, 3, 1, 0)) is True
+
+    def test_dzien_krotki_sen_lub_wylaczona_flaga_wybudza(self, monitor, monkeypatch):
+        m = self._monitor(monitor, datetime(2025, 6, 2, 21, 0))
+        night = datetime(2025, 6, 3, 1, 0)
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'sleep_respect', False)
+        assert m._should_let_vehicle_sleep({'vin': self.VIN}, night) is False
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'sleep_respect', True)
+        assert m._should_let_vehicle_sleep({'vin': self.VIN}, datetime(2025, 6, 3, 12, 0)) is False
+        assert m._should_let_vehicle_sleep({'vin': self.VIN}, datetime(2025, 6, 2, 23, 30)) is False
+
+
+class TestOverlapSweepLine:
+    def _monitor(self, monitor, controller_stub):
+        monitor.tesla_controller = controller_stub()
+        return monitor
+
+    @staticmethod
+    def _sched(start, end):
+        return ChargeSchedule(enabled=True, start_time=start, end_time=end,
+                              start_enabled=True, end_enabled=True)
+
+    def _random_schedules(self, rng, n):
+        return [self._sched(rng.randrange(0, 1440, 15), rng.randrange(0, 1440, 15)) for _ in range(n)]
+
+    def test_zgodnosc_z_porownaniem_parami(self, monitor, controller_stub):
+        rng = random.Random(7)
+        m = self._monitor(monitor, controller_stub)
+        for _ in range(300):
+            schedules = self._random_schedules(rng, rng.randint(0, 6))
+            pairwise = any(m._schedules_overlap(a, b)
+                           for i, a in enumerate(schedules) for b in schedules[i + 1:])
+            assert m._detect_any_overlaps(schedules) is pairwise
+
+    def test_rozwiazanie_zgodne_z_zachlannym_po_priorytecie(self, monitor, controller_stub):
+        rng = random.Random(11)
+        m = self._monitor(monitor, controller_stub)
+        for _ in range(200):
+            schedules = self._random_schedules(rng, rng.randint(1, 6))
+            expected = []
+            for s in schedules:
+                if not any(m._schedules_overlap(s, accepted) for accepted in expected):
+                    expected.append(s)
+            assert m._resolve_schedule_overlaps(schedules, 'VIN') == expected
+
+    def test_okno_przez_polnoc_bez_falszywego_nakladania(self, monitor, controller_stub):
+        m = self._monitor(monitor, controller_stub)
+        assert m._detect_any_overlaps([self._sched(23 * 60, 60), self._sched(2 * 60, 5 * 60)]) is False
+
+    def test_pojedynczy_harmonogram_szybka_sciezka(self, monitor, controller_stub):
+        m = self._monitor(monitor, controller_stub)
+        single = [self._sched(23 * 60, 6 * 60)]
+        assert m._resolve_schedule_overlaps(single, 'VIN') is single
+        assert CloudTeslaMonitor._detect_any_overlaps(single) is False
+
+
+class TestHomeScheduleFilter:
+    def test_filtr_home_z_korekta_dlugosci(self, monitor):
+        schedules = [
+            {'id': 1, 'latitude': 52.0, 'longitude': 21.015},  # ~0.0092° po korekcie cos(52°)
+            {'id': 2, 'latitude': 52.015, 'longitude': 21.0},
+            {'id': 3, 'latitude': 0.0, 'longitude': 0.0},
+        ]
+        monitor.tesla_controller = types.SimpleNamespace(
+            current_vehicle={'vin': 'VIN1'},
+            get_charge_schedules=lambda: schedules,
+            default_latitude=52.0,
+            default_longitude=21.0,
+            home_radius=0.01,
+        )
+        assert [s['id'] for s in monitor._get_home_schedules_from_tesla('VIN1')] == [1]
+
+
+class TestMinutesToTimeTable:
+    def test_tablica_zgodna_z_formatem_i_poza_doba(self):
+        c = TeslaController.__new__(TeslaController)
+        assert all(c.minutes_to_time(m) == f"{m // 60:02d}:{m % 60:02d}" for m in range(1440))
+        assert c.minutes_to_time(1500) == "25:00"
+
+
+class TestFmtScheduleTime:
+    def test_minuty_i_wartosci_nieliczbowe(self, monitor):
+        monitor.tesla_controller = TeslaController.__new__(TeslaController)
+        assert monitor._fmt_schedule_time(0) == "00:00"
+        assert monitor._fmt_schedule_time(1439) == "23:59"
+        assert monitor._fmt_schedule_time('N/A') == "N/A"
+        assert monitor._fmt_schedule_time(None) == "None"
+
+
 if __name__ == '__main__':
     sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,774 @@
+#!/usr/bin/env python3
+"""
+Testy jednostkowe Fazy 6 (wydajność pętli monitora): leniwa inicjalizacja,
+bufor zdarzeń Firestore, zapis stanu do Cloud Storage, cykl życia proxy
+i harmonogram pętli continuous.
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import cloud_tesla_monitor
+from cloud_tesla_monitor import CloudTeslaMonitor, BoundedVinCache
+
+
+class TestLazyInit:
+    def _monitor(self, monkeypatch):
+        created = []
+        monkeypatch.setattr(cloud_tesla_monitor, 'TeslaController',
+                            lambda: created.append(1) or SimpleNamespace(current_vehicle=None))
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'gcp_project', None)
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'smart_proxy_mode', True)
+        return CloudTeslaMonitor(), created
+
+    def test_init_nie_tworzy_kontrolera(self, monkeypatch):
+        m, created = self._monitor(monkeypatch)
+        assert created == []
+        assert m._initialized is False
+
+    def test_pierwszy_dostep_inicjalizuje_raz(self, monkeypatch):
+        m, created = self._monitor(monkeypatch)
+        first = m.tesla_controller
+        assert m.tesla_controller is first
+        m._ensure_initialized()
+        assert created == [1]
+        assert m._initialized is True
+
+    def test_klienci_gcp_bez_projektu_to_none(self, monkeypatch):
+        m, _ = self._monitor(monkeypatch)
+        assert m.storage_client is None
+        assert m.firestore_client is None
+
+
+class TestBoundedVinCache:
+    def test_najstarszy_vin_usuwany_po_przekroczeniu_limitu(self):
+        cache = BoundedVinCache(maxsize=2)
+        cache['VIN1'] = 1
+        cache['VIN2'] = 2
+        cache['VIN3'] = 3
+        assert list(cache) == ['VIN2', 'VIN3']
+
+    def test_aktualizacja_odswieza_pozycje(self):
+        cache = BoundedVinCache({'VIN1': 1, 'VIN2': 2}, maxsize=2)
+        cache['VIN1'] = 10
+        cache['VIN3'] = 3
+        assert list(cache) == ['VIN1', 'VIN3']
+
+
+class _FakeBatch:
+    def __init__(self, store):
+        self.store = store
+        self.pending = []
+
+    def set(self, ref, data):
+        self.pending.append(data)
+
+    def commit(self, retry=None):
+        self.store.append(list(self.pending))
+
+
+class _FakeFirestore:
+    def __init__(self):
+        self.commits = []
+
+    def collection(self, name):
+        return SimpleNamespace(document=lambda: object())
+
+    def batch(self):
+        return _FakeBatch(self.commits)
+
+
+class TestLogBuffer:
+    def _monitor(self, monkeypatch):
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'gcp_project', None)
+        m = CloudTeslaMonitor()
+        m.firestore_client = _FakeFirestore()
+        return m
+
+    def test_zdarzenia_buforowane_i_zapisywane_jednym_batchem(self, monkeypatch):
+        m = self._monitor(monkeypatch)
+        m._log_event("a")
+        m._log_event("b")
+        assert m.firestore_client.commits == []
+        m._flush_log_buffer()
+        assert len(m.firestore_client.commits) == 1
+        assert [e['event_message'] for e in m.firestore_client.commits[0]] == ['a', 'b']
+
+    def test_pusty_bufor_nie_commituje(self, monkeypatch):
+        m = self._monitor(monkeypatch)
+        m._flush_log_buffer()
+        assert m.firestore_client.commits == []
+
+    def test_nieudany_zapis_wraca_do_bufora(self, monkeypatch):
+        m = self._monitor(monkeypatch)
+        m._log_event("a")
+        m._log_event("b")
+        m.firestore_client.batch = lambda: SimpleNamespace(
+            set=lambda ref, data: None,
+            commit=lambda retry=None: (_ for _ in ()).throw(RuntimeError("unavailable")))
+        m._flush_log_buffer()
+        m._log_event("c")
+        assert [e['event_message'] for _, e in m._log_buffer] == ['a', 'b', 'c']
+
+    def test_partia_porzucana_po_limicie_prob(self, monkeypatch):
+        m = self._monitor(monkeypatch)
+        m._log_event("a")
+        m.firestore_client.batch = lambda: SimpleNamespace(
+            set=lambda ref, data: None,
+            commit=lambda retry=None: (_ for _ in ()).throw(RuntimeError("unavailable")))
+        for _ in range(m.LOG_FLUSH_MAX_ATTEMPTS):
+            assert len(m._log_buffer) == 1
+            m._flush_log_buffer()
+        assert not m._log_buffer
+
+    def test_atexit_rejestrowany_raz_na_proces(self, monkeypatch):
+        registered = []
+        monkeypatch.setattr(cloud_tesla_monitor.atexit, 'register', registered.append)
+        first, second = self._monitor(monkeypatch), self._monitor(monkeypatch)
+        assert registered == []
+        assert {first, second} <= set(cloud_tesla_monitor._EXIT_FLUSH_MONITORS)
+
+    def test_wyjscie_procesu_bez_zapisu_stanu(self, monkeypatch):
+        m = self._monitor(monkeypatch)
+        m._log_event("a")
+        m._mark_state_dirty()
+        m._save_monitoring_state = lambda: pytest.fail("zapis stanu należy do stop_monitoring")
+        cloud_tesla_monitor._flush_monitors_at_exit()
+        assert len(m.firestore_client.commits) == 1
+
+    def test_bufor_cykliczny_ograniczony(self, monkeypatch):
+        monkeypatch.setattr(CloudTeslaMonitor, 'LOG_BUFFER_CAPACITY', 3)
+        monkeypatch.setattr(CloudTeslaMonitor, 'LOG_BUFFER_MAX', 100)
+        m = self._monitor(monkeypatch)
+        for message in "abcd":
+            m._log_event(message)
+        assert [e['event_message'] for _, e in m._log_buffer] == ['b', 'c', 'd']
+
+
+class TestExtractState:
+    def test_krotka_ze_statusu(self):
+        status = {'is_charging_ready': True, 'location_status': 'HOME', 'online': True}
+        assert cloud_tesla_monitor._extract_state(status) == (True, True, True)
+
+    def test_krotka_z_zapisanego_stanu_po_json(self):
+        # Po round-tripie przez JSON krotka wraca jako lista
+        assert cloud_tesla_monitor._extract_state({'_state_tuple': [True, False, True]}) == (True, False, True)
+
+    def test_pusty_stan(self):
+        assert cloud_tesla_monitor._extract_state({}) == (False, False, False)
+
+
+class TestStateDebounce:
+    def _monitor(self, monitor):
+        monitor.saves = 0
+
+        def fake_save():
+            monitor.saves += 1
+            return True
+        monitor._save_monitoring_state = fake_save
+        return monitor
+
+    def test_wiele_mutacji_jeden_zapis(self, monitor):
+        m = self._monitor(monitor)
+        m._mark_state_dirty()
+        m._mark_state_dirty()
+        m._persist_state_if_dirty(force=True)
+        m._persist_state_if_dirty(force=True)
+        assert m.saves == 1
+
+    def test_debounce_bez_force(self, monitor):
+        m = self._monitor(monitor)
+        m._mark_state_dirty()
+        m._persist_state_if_dirty(force=True)
+        m._mark_state_dirty()
+        m._persist_state_if_dirty()  # zbyt wcześnie od ostatniego zapisu
+        assert m.saves == 1
+        assert m._state_dirty is True
+
+    def test_nieudany_upload_ponawiany(self, monitor):
+        monitor.storage_client = _FakeStorage()
+        monitor.bucket_name = "bucket"
+        monitor.active_cases = {}
+        monitor.last_off_peak_schedules = {}
+        monitor.last_vehicle_state = {}
+        monitor.storage_client.bucket = lambda name: SimpleNamespace(
+            blob=lambda _name: SimpleNamespace(upload_from_file=_raise_upload))
+        monitor._mark_state_dirty()
+        monitor._persist_state_if_dirty()
+        assert monitor._state_dirty is True and monitor._last_persist == 0.0
+        monitor.storage_client = _FakeStorage()
+        monitor._persist_state_if_dirty()  # bez force - nieudany zapis nie przesunął debounce
+        assert monitor._state_dirty is False
+        assert len(monitor.storage_client.uploads) == 1
+
+
+class TestCaseBBackoff:
+    VIN = "TESTVIN1234567890"
+
+    def _monitor(self, monitor, now):
+        monitor._get_warsaw_time = lambda: now
+        monitor.active_cases = {self.VIN: cloud_tesla_monitor.VehicleMonitoringCase(
+            case_id="c1", vehicle_vin=self.VIN, start_time=now,
+            state=cloud_tesla_monitor.MonitoringState.WAITING_FOR_OFFLINE,
+            last_battery_level=60, last_check_time=now)}
+        return monitor
+
+    def _status(self, battery):
+        return {'vin': self.VIN, 'online': True, 'battery_level': battery}
+
+    def test_stabilny_stan_wydluza_backoff(self, monitor):
+        now = datetime(2025, 6, 2, 12, 0)
+        m = self._monitor(monitor, now)
+        m._process_active_cases(self._status(60), now)
+        first = m.active_cases[self.VIN].next_poll_at
+        m._process_active_cases(self._status(60), first)
+        second = m.active_cases[self.VIN].next_poll_at
+        assert second - first > first - now
+
+    def _cycle_monitor(self, monitor, now, online):
+        m = self._monitor(monitor, now)
+        m._process_active_cases(self._status(60), now)
+        m.smart_proxy_mode = False
+        m.reads = 0
+
+        def check_status(**kwargs):
+            m.reads += 1
+            return {'vin': self.VIN, 'online': online, 'battery_level': 60}
+        m._check_vehicle_status = check_status
+        m.tesla_controller = SimpleNamespace(is_online_light=lambda: online,
+                                             wake_up_vehicle=lambda use_proxy=False: False)
+        m._log_event = lambda *args, **kwargs: None
+        m.last_vehicle_state = {}
+        return m
+
+    def test_w_oknie_backoffu_cykl_bez_odczytu_statusu(self, monitor):
+        now = datetime(2025, 6, 2, 12, 0)
+        m = self._cycle_monitor(monitor, now, online=True)
+        assert m._run_monitoring_cycle_locked() == 'ok'
+        assert m.reads == 0
+
+    def test_offline_w_oknie_backoffu_konczy_przypadek(self, monitor):
+        now = datetime(2025, 6, 2, 12, 0)
+        m = self._cycle_monitor(monitor, now, online=False)
+        m._should_let_vehicle_sleep = lambda status, now: True
+        assert m._run_monitoring_cycle_locked() == 'ok'
+        assert m.reads == 1
+        assert self.VIN not in m.active_cases
+
+    def test_po_oknie_backoffu_pelny_odczyt(self, monitor):
+        now = datetime(2025, 6, 2, 12, 0)
+        m = self._cycle_monitor(monitor, now, online=True)
+        later = m.active_cases[self.VIN].next_poll_at
+        m._get_warsaw_time = lambda: later
+        assert m._case_b_poll_deferred(later) is False
+
+    def test_zmiana_stanu_zeruje_licznik(self, monitor):
+        now = datetime(2025, 6, 2, 12, 0)
+        m = self._monitor(monitor, now)
+        m._process_active_cases(self._status(60), now)
+        m._process_active_cases(self._status(61), m.active_cases[self.VIN].next_poll_at)
+        assert m.active_cases[self.VIN].consecutive_no_change == 0
+
+    def test_serializacja_zachowuje_backoff(self, monitor):
+        now = datetime(2025, 6, 2, 12, 0)
+        m = self._monitor(monitor, now)
+        m._process_active_cases(self._status(60), now)
+        case = m.active_cases[self.VIN]
+        restored = cloud_tesla_monitor.VehicleMonitoringCase.from_dict(case.to_dict())
+        assert restored.next_poll_at == case.next_poll_at
+        assert restored.consecutive_no_change == case.consecutive_no_change
+
+
+def _raise_upload(*args, **kwargs):
+    raise ConnectionError("GCS niedostępny")
+
+
+class _FakeBlob:
+    def __init__(self, uploads):
+        self.uploads = uploads
+        self.generation = None
+
+    def upload_from_file(self, f, size, content_type, if_generation_match=None):
+        self.uploads.append((f.read(), if_generation_match))
+        self.generation = len(self.uploads)
+
+
+class _FakeStorage:
+    def __init__(self):
+        self.uploads = []
+
+    def bucket(self, name):
+        return SimpleNamespace(blob=lambda _name: _FakeBlob(self.uploads))
+
+
+class TestStateUploadSkip:
+    def _monitor(self, monitor):
+        monitor.storage_client = _FakeStorage()
+        monitor.bucket_name = "bucket"
+        monitor.active_cases = {}
+        monitor.last_off_peak_schedules = {}
+        monitor.last_vehicle_state = {}
+        return monitor
+
+    def test_identyczny_stan_nie_jest_wysylany(self, monitor):
+        m = self._monitor(monitor)
+        m._save_monitoring_state()
+        m._save_monitoring_state()
+        assert len(m.storage_client.uploads) == 1
+
+    def test_zmiana_stanu_wysyla_z_generacja(self, monitor):
+        m = self._monitor(monitor)
+        m._save_monitoring_state()
+        m.last_vehicle_state["VIN"] = {'online': True}
+        m._save_monitoring_state()
+        uploads = m.storage_client.uploads
+        assert [gen for _, gen in uploads] == [0, 1]
+        assert b'"last_update"' in uploads[-1][0]
+
+    def test_konflikt_generacji_nie_jest_sukcesem(self, monitor):
+        from google.api_core import exceptions as gcp_exceptions
+        m = self._monitor(monitor)
+        m.last_vehicle_state["VIN_A"] = {'online': True}
+        attempts = []
+
+        def conflicting_upload(f, size, content_type, if_generation_match=None):
+            attempts.append(if_generation_match)
+            raise gcp_exceptions.PreconditionFailed("generation mismatch")
+        m.storage_client.bucket = lambda name: SimpleNamespace(
+            blob=lambda _name: SimpleNamespace(upload_from_file=conflicting_upload))
+        m._mark_state_dirty()
+        m._persist_state_if_dirty(force=True)
+        assert attempts == [0]
+        assert m._state_dirty is True
+        assert dict(m.last_vehicle_state) == {'VIN_A': {'online': True}}
+
+    def test_cykl_doladowuje_stan_zmieniony_przez_inna_instancje(self, monitor):
+        m = self._monitor(monitor)
+        m.last_vehicle_state["VIN_A"] = {'online': True}
+        remote = cloud_tesla_monitor._json_dumps_bytes({
+            'active_cases': {},
+            'last_off_peak_schedules': {},
+            'last_vehicle_state': {'VIN_B': {'online': False}},
+            'last_update': m._get_warsaw_time().isoformat(),
+        })
+        reads = []
+        m.storage_client.bucket = lambda name: SimpleNamespace(
+            get_blob=lambda _name: SimpleNamespace(
+                generation=7, open=lambda mode: reads.append(mode) or io.BytesIO(remote)))
+        m._refresh_monitoring_state()
+        assert m._state_generation == 7
+        assert dict(m.last_vehicle_state) == {'VIN_B': {'online': False}}
+        m._refresh_monitoring_state()  # ta sama generacja - bez ponownego pobrania
+        assert reads == ['rb']
+
+    def test_niezmieniony_stan_odswiezany_w_ciagu_doby(self, monitor, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'monotonic', lambda: clock[0])
+        m = self._monitor(monitor)
+        m.smart_proxy_mode = False
+        status = {'vin': 'VIN1234', 'online': True, 'is_charging_ready': False,
+                  'location_status': 'AWAY', 'battery_level': 60}
+        m._check_vehicle_status = lambda **kwargs: status
+        for _ in range(24 * 4):  # doba cykli co 15 min bez zmiany stanu
+            assert m._run_monitoring_cycle_locked() == 'ok'
+            m._persist_state_if_dirty(force=True)
+            clock[0] += 15 * 60
+        # pierwszy zapis + odświeżenie 'last_update' po 6, 12 i 18 h (TTL 24h nie wygasa)
+        assert len(m.storage_client.uploads) == 4
+
+
+class TestJsonBytesHelpers:
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_roundtrip_stanu(self, monkeypatch, orjson_available):
+        if orjson_available and not cloud_tesla_monitor.ORJSON_AVAILABLE:
+            pytest.skip("orjson niezainstalowany")
+        monkeypatch.setattr(cloud_tesla_monitor, 'ORJSON_AVAILABLE', orjson_available)
+        state = {'last_vehicle_state': BoundedVinCache(VIN={'online': True, 'battery_level': 80})}
+        data = cloud_tesla_monitor._json_dumps_bytes(state)
+        assert isinstance(data, bytes)
+        assert cloud_tesla_monitor._json_loads_bytes(data) == {
+            'last_vehicle_state': {'VIN': {'online': True, 'battery_level': 80}}}
+
+
+class TestProxyLifecycle:
+    def _monitor(self, monitor):
+        monitor.proxy_running = False
+        monitor.calls = []
+
+        def start():
+            monitor.calls.append('start')
+            monitor.proxy_running = True
+            return True
+        monitor._start_proxy_on_demand = start
+        monitor._stop_proxy = lambda: monitor.calls.append('stop')
+        return monitor
+
+    def test_proxy_zatrzymywany_dopiero_po_ttl(self, monitor, monkeypatch):
+        m = self._monitor(monitor)
+        assert m._acquire_proxy() and m._acquire_proxy()
+        m._release_proxy()
+        assert m._proxy_idle_deadline is None  # wciąż zajęty
+        m._release_proxy()
+        m._reap_idle_proxy()
+        assert 'stop' not in m.calls
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'monotonic',
+                            lambda: m._proxy_idle_deadline + 1)
+        m._reap_idle_proxy()
+        assert m.calls[-1] == 'stop'
+
+    def test_ponowne_zajecie_kasuje_ttl(self, monitor):
+        m = self._monitor(monitor)
+        m._acquire_proxy()
+        m._release_proxy()
+        m._acquire_proxy()
+        assert m._proxy_idle_deadline is None and m._proxy_refcount == 1
+
+    def test_cykl_zwalnia_proxy_po_zakonczeniu(self, monitor):
+        m = self._monitor(monitor)
+        m._ensure_initialized = lambda: None
+        m._acquire_cycle_lock = lambda: True
+        m._release_cycle_lock = lambda: None
+        m._refresh_monitoring_state = lambda: None
+        m._persist_state_if_dirty = lambda force=False: None
+        m._flush_log_buffer = lambda: None
+
+        def cycle():
+            m._cycle_holds_proxy = m._acquire_proxy()
+            return 'ok'
+        m._run_monitoring_cycle_locked = cycle
+        assert m.run_monitoring_cycle() == 'ok'
+        assert m._proxy_refcount == 0 and m._proxy_idle_deadline is not None
+        assert m._cycle_holds_proxy is False
+
+    def test_kolejne_cykle_uzywaja_jednego_proxy(self, monitor, monkeypatch):
+        m = self._monitor(monitor)
+        m._ensure_initialized = lambda: None
+        m._acquire_cycle_lock = lambda: True
+        m._release_cycle_lock = lambda: None
+        m._refresh_monitoring_state = lambda: None
+        m._persist_state_if_dirty = lambda force=False: None
+        m._flush_log_buffer = lambda: None
+
+        def cycle():
+            m._cycle_holds_proxy = m._acquire_proxy()
+            return 'ok'
+        m._run_monitoring_cycle_locked = cycle
+        assert m.run_monitoring_cycle() == 'ok'
+        # następny cykl schedulera po 15 min - dawno po TTL bezczynności
+        later = m._proxy_idle_deadline + 15 * 60
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'monotonic', lambda: later)
+        assert m.run_monitoring_cycle() == 'ok'
+        assert 'stop' not in m.calls and m.proxy_running
+
+
+class TestStatusCache:
+    def _monitor(self, monitor):
+        monitor.reads = 0
+
+        def get_status(**kwargs):
+            monitor.reads += 1
+            return {'vin': 'VIN1234', 'online': True, 'battery_level': 50}
+        monitor.tesla_controller = SimpleNamespace(connect=lambda: True, get_vehicle_status=get_status)
+        return monitor
+
+    def test_ttl_zwraca_status_z_cache(self, monitor):
+        m = self._monitor(monitor)
+        m._check_vehicle_status()
+        m._check_vehicle_status(ttl_s=45)
+        assert m.reads == 1
+
+    def test_force_i_domyslny_odczyt_omijaja_cache(self, monitor):
+        m = self._monitor(monitor)
+        m._check_vehicle_status()
+        m._check_vehicle_status()
+        m._check_vehicle_status(ttl_s=45, force=True)
+        assert m.reads == 3
+
+
+class TestVehicleDataBudget:
+    def test_brak_historii_zwraca_floor(self, monitor):
+        assert monitor._budget_interval_minutes(15) == 15
+
+    def test_wyczerpany_budzet_wydluza_interwal(self, monitor, monkeypatch):
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'vehicle_data_daily_budget', 200)
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'monotonic', lambda: 100000.0)
+        # 190 zapytań w ostatniej godzinie - zostało 10 na ~23h
+        monitor._vehicle_data_calls.extend(100000.0 - 3600 + i for i in range(190))
+        assert monitor._budget_interval_minutes(15) >= 23 * 60 // 10
+
+    def test_stare_wpisy_wypadaja_z_okna(self, monitor, monkeypatch):
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'monotonic', lambda: 200000.0)
+        monitor._vehicle_data_calls.extend([1.0, 2.0])
+        assert monitor._budget_interval_minutes(15) == 15
+        assert len(monitor._vehicle_data_calls) == 0
+
+    def test_odczyt_offline_nie_zuzywa_budzetu(self, monitor):
+        statuses = iter([{'vin': 'VIN1234', 'online': False}, {'vin': 'VIN1234', 'online': True}])
+        monitor.tesla_controller = SimpleNamespace(connect=lambda: True,
+                                                   get_vehicle_status=lambda **kwargs: next(statuses))
+        monitor._check_vehicle_status()
+        assert len(monitor._vehicle_data_calls) == 0
+        monitor._check_vehicle_status()
+        assert len(monitor._vehicle_data_calls) == 1
+
+
+class TestPostWakePoll:
+    def test_wczesne_wyjscie_po_online(self, monitor, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'sleep', sleeps.append)
+        answers = iter([False, True])
+        monitor.tesla_controller = SimpleNamespace(is_online_light=lambda: next(answers))
+        assert monitor._wait_until_online() is True
+        assert sleeps == [0.5, 1]
+
+    def test_limit_czasu_bez_online(self, monitor, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'sleep', sleeps.append)
+        monitor.tesla_controller = SimpleNamespace(is_online_light=lambda: False)
+        assert monitor._wait_until_online() is False
+        assert sum(sleeps) == 10
+
+
+class TestResetMarksDirty:
+    def _monitor(self, monitor):
+        monitor.last_vehicle_state = BoundedVinCache({'VIN1': {'online': True}})
+        return monitor
+
+    def test_reset_jednego_pojazdu(self, monitor):
+        m = self._monitor(monitor)
+        m.reset_vehicle_state('VIN1')
+        assert 'VIN1' not in m.last_vehicle_state
+        assert m._state_dirty is True
+
+    def test_reset_nieznanego_vin_nie_oznacza(self, monitor):
+        m = self._monitor(monitor)
+        m.reset_vehicle_state('VIN2')
+        assert m._state_dirty is False
+
+
+class TestHeartbeat:
+    def test_heartbeat_z_terminu_monotonicznego(self, monitor, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(cloud_tesla_monitor.time, 'monotonic', lambda: clock[0])
+        monitor.beats = 0
+        monitor._heartbeat_log = lambda: setattr(monitor, 'beats', monitor.beats + 1)
+        for _ in range(3 * 60):  # 3 h iteracji pętli co minutę
+            monitor._heartbeat_if_due()
+            clock[0] += 60
+        assert monitor.beats == 2
+
+    def test_heartbeat_nie_jest_zadaniem_harmonogramu(self, monitor, monkeypatch):
+        schedule = cloud_tesla_monitor.schedule
+        schedule.clear()
+        monkeypatch.setattr(monitor, '_get_monitoring_schedule_interval', lambda now=None: 15)
+        monkeypatch.setattr(monitor, '_budget_interval_minutes', lambda floor: floor)
+        try:
+            monitor.setup_schedule()
+            assert not [job for job in schedule.jobs if job.job_func.func == monitor._heartbeat_log]
+        finally:
+            schedule.clear()
+
+
+class TestShutdownSignal:
+    def _monitor(self, monitor, running):
+        monitor.is_running = running
+        monitor.stopped = 0
+        monitor.stop_monitoring = lambda: setattr(monitor, 'stopped', monitor.stopped + 1)
+        return monitor
+
+    def test_handler_tylko_zglasza_zatrzymanie(self, monitor):
+        import signal
+        m = self._monitor(monitor, running=True)
+        m._handle_shutdown_signal(signal.SIGTERM, None)
+        assert m.stopped == 0
+        assert m.is_running is False and m._stop_event.is_set()
+        m._finish_after_shutdown_signal()
+        m._finish_after_shutdown_signal()
+        assert m.stopped == 1
+
+    def test_petla_continuous_zatrzymuje_po_sygnale(self, monitor):
+        import signal
+        m = self._monitor(monitor, running=True)
+        m._start_health_server = lambda: None
+        m.setup_schedule = lambda: None
+        m.tesla_controller = SimpleNamespace(connect=lambda: False)
+        m._persist_state_if_dirty = lambda force=False: None
+        m._reap_idle_proxy = lambda: None
+        m._heartbeat_if_due = lambda: m._handle_shutdown_signal(signal.SIGTERM, None)
+        m._start_continuous_monitoring()
+        assert m.stopped == 1
+
+    def test_oczekiwanie_na_zadania_przerywane_sygnalem(self, monitor):
+        from concurrent.futures import Future
+        m = self._monitor(monitor, running=False)
+        assert m._wait_while_running(Future(), 300) is False
+
+
+class TestScheduleTags:
+    def _monitor(self, monitor, monkeypatch, intervals):
+        values = iter(intervals)
+        monkeypatch.setattr(monitor, '_get_monitoring_schedule_interval', lambda now=None: next(values))
+        monkeypatch.setattr(monitor, '_budget_interval_minutes', lambda floor: floor)
+        return monitor
+
+    def test_zmiana_interwalu_podmienia_tylko_cykl(self, monitor, monkeypatch):
+        schedule = cloud_tesla_monitor.schedule
+        schedule.clear()
+        m = self._monitor(monitor, monkeypatch, [15, 60])
+        try:
+            m.setup_schedule()
+            static_jobs = schedule.get_jobs('static')
+            m.setup_schedule()
+            assert schedule.get_jobs('static') == static_jobs
+            assert [job.interval for job in schedule.get_jobs('cycle')] == [60]
+        finally:
+            schedule.clear()
+
+    def test_sen_petli_do_najblizszego_zadania(self, monitor, monkeypatch):
+        monkeypatch.setattr(cloud_tesla_monitor.schedule, 'idle_seconds', lambda: 12.5)
+        assert monitor._loop_sleep_seconds() == 12.5
+        monkeypatch.setattr(cloud_tesla_monitor.schedule, 'idle_seconds', lambda: -3)
+        assert monitor._loop_sleep_seconds() == 1.0
+        monkeypatch.setattr(cloud_tesla_monitor.schedule, 'idle_seconds', lambda: None)
+        assert monitor._loop_sleep_seconds() == monitor.LOOP_MAX_SLEEP_SECONDS
+
+
+class TestReconnectBackoff:
+    def test_gorna_granica_rosnie_wykladniczo_do_limitu(self, monitor, monkeypatch):
+        monkeypatch.setattr(cloud_tesla_monitor.random, 'uniform', lambda low, high: high)
+        assert monitor._reconnect_delay(0) == 60
+        assert monitor._reconnect_delay(3) == 480
+        assert monitor._reconnect_delay(10) == monitor.RECONNECT_INTERVAL_SECONDS
+        assert monitor._reconnect_delay(50) == monitor.RECONNECT_INTERVAL_SECONDS
+
+    def test_pelny_jitter(self, monitor):
+        delays = {monitor._reconnect_delay(2) for _ in range(20)}
+        assert all(0 <= d <= 240 for d in delays)
+        assert len(delays) > 1
+
+
+class TestShutdownStateFlush:
+    def test_wolny_zapis_nie_blokuje_zamykania(self, monitor, monkeypatch):
+        release = threading.Event()
+        monitor.STATE_SHUTDOWN_FLUSH_TIMEOUT_SECONDS = 0.05
+        monitor.is_running = True
+        monitor.http_server = None
+        monitor._stop_proxy = lambda: None
+        monitor._remove_proxy_certs = lambda: None
+        monitor._flush_log_buffer = lambda: None
+        monitor._state_dirty = True
+        monitor._save_monitoring_state = lambda: release.wait(5)
+        started = time.monotonic()
+        monitor.stop_monitoring()
+        assert time.monotonic() - started < 1
+        assert monitor.is_running is False
+        # zapis wciąż trwa - flaga zdejmowana dopiero po udanym zapisie
+        assert monitor._state_dirty is True
+        flush_thread = next(t for t in threading.enumerate() if t.name == 'state-flush')
+        release.set()
+        flush_thread.join(1)
+        assert monitor._state_dirty is False
+
+    def test_czysty_stan_bez_zapisu(self, monitor):
+        monitor.is_running = True
+        monitor.http_server = None
+        monitor._stop_proxy = lambda: None
+        monitor._remove_proxy_certs = lambda: None
+        monitor._flush_log_buffer = lambda: None
+        monitor._save_monitoring_state = lambda: pytest.fail("stan niezmieniony - zapis zbędny")
+        monitor.stop_monitoring()
+
+
+class TestProxyCertReuse:
+    def test_zatrzymanie_proxy_zostawia_certyfikaty(self, monitor, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        for name in ('tls-key.pem', 'tls-cert.pem'):
+            (tmp_path / name).write_text('x')
+        monitor.proxy_process = None
+        monitor._stop_proxy()
+        assert (tmp_path / 'tls-key.pem').exists() and (tmp_path / 'tls-cert.pem').exists()
+        monitor._remove_proxy_certs()
+        assert not any(tmp_path.iterdir())
+
+
+class TestProxyTlsCert:
+    def test_certyfikat_localhost_z_pasujacym_kluczem(self, tmp_path):
+        from cryptography import x509
+        from cryptography.hazmat.primitives import serialization
+        key_path, cert_path = tmp_path / 'tls-key.pem', tmp_path / 'tls-cert.pem'
+        cloud_tesla_monitor._generate_proxy_tls_cert(str(key_path), str(cert_path))
+        cert = x509.load_pem_x509_certificate(cert_path.read_bytes())
+        key = serialization.load_pem_private_key(key_path.read_bytes(), password=None)
+        san = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        assert san.get_values_for_type(x509.DNSName) == ['localhost']
+        assert cert.public_key().public_numbers() == key.public_key().public_numbers()
+        assert key_path.stat().st_mode & 0o777 == 0o600
+
+
+class TestLogFlushSingleFlight:
+    def test_jeden_watek_zrzutu_naraz(self, monkeypatch):
+        monkeypatch.setattr(cloud_tesla_monitor.ENV, 'gcp_project', None)
+        monkeypatch.setattr(CloudTeslaMonitor, 'LOG_BUFFER_MAX', 1)
+        m = CloudTeslaMonitor()
+        m.firestore_client = _FakeFirestore()
+        started = []
+        monkeypatch.setattr(cloud_tesla_monitor.threading, 'Thread',
+                            lambda target, **kw: SimpleNamespace(start=lambda: started.append(target)))
+        m._log_event("a")
+        m._log_event("b")
+        assert len(started) == 1
+        started[0]()
+        assert not m._log_flush_in_flight
+        assert [e['event_message'] for e in m.firestore_client.commits[0]] == ['a', 'b']
+        m._log_event("c")
+        assert len(started) == 2
+
+
+class TestProxySockaddr:
+    def test_getaddrinfo_raz_na_instancje(self, monitor, monkeypatch):
+        calls = []
+        real = cloud_tesla_monitor.socket.getaddrinfo
+
+        def counting(*args, **kwargs):
+            calls.append(kwargs)
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(cloud_tesla_monitor.socket, 'getaddrinfo', counting)
+        monkeypatch.setattr(CloudTeslaMonitor, 'PROXY_HOST', '127.0.0.1')
+        monkeypatch.setattr(CloudTeslaMonitor, 'PROXY_PORT', '4443')
+        assert monitor._proxy_sockaddr == (cloud_tesla_monitor.socket.AF_INET, ('127.0.0.1', 4443))
+        assert monitor._proxy_sockaddr is monitor._proxy_sockaddr
+        assert len(calls) == 1
+        assert calls[0]['family'] == cloud_tesla_monitor.socket.AF_INET
+
+
+class TestPrivateKeyCheckCached:
+    def test_sukces_zapamietany_porazka_ponawiana(self, monitor, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(CloudTeslaMonitor, '_private_key_size', None)
+        assert monitor._private_key_valid() is False
+        (tmp_path / 'private-key.pem').write_text("")
+        assert monitor._private_key_valid() is False
+        (tmp_path / 'private-key.pem').write_text("KEY")
+        assert monitor._private_key_valid() is True
+        stats = []
+        monkeypatch.setattr(cloud_tesla_monitor.os, 'stat', lambda path: stats.append(path))
+        assert CloudTeslaMonitor.__new__(CloudTeslaMonitor)._private_key_valid() is True
+        assert stats == []
+
+
+class TestProxyProbeTimeout:
+    def test_rozdzielony_timeout_przez_sesje(self, monitor):
+        calls = []
+        monitor.__dict__['_proxy_http'] = SimpleNamespace(
+            get=lambda url, timeout: calls.append(timeout) or SimpleNamespace(status_code=401))
+        assert monitor._test_proxy_connection() is True
+        assert calls == [(3.05, 10)]